@@ -0,0 +1,299 @@
+"""Frame pack: frames concatenados + índice, e o ZIP gerado na hora do download.
+
+O pack guarda só os bytes de cada membro, seguidos de um índice JSON com
+nome, offset, tamanho, CRC-32 e mtime, e de um trailer ``<Q`` (offset do
+índice) + ``FPK1``. Como CRC e tamanhos já são conhecidos, o ZIP (STORED) é
+montado sem reler os dados: cabeçalhos locais, diretório central e o
+tamanho final saem do índice, e o conteúdo de cada membro é copiado do pack
+em blocos. Zip64 entra em ação só quando algum limite de 32/16 bits estoura.
+
+Toda leitura passa por um ``RangeReader`` (em produção, ``read_range`` da
+storage), então em S3 só os trechos usados são baixados.
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+MAGIC = b"FPK1"
+_TRAILER = struct.Struct("<Q4s")
+CHUNK_SIZE = 256 * 1024
+
+# limites do ZIP clássico; acima deles o membro/diretório usa Zip64
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+# valor dos campos de 32/16 bits quando o real está no registro Zip64
+_MARK32 = 0xFFFFFFFF
+_MARK16 = 0xFFFF
+
+
+# bytes do intervalo [start, end) da origem, em blocos
+RangeReader = Callable[[int, int], Iterator[bytes]]
+
+
+def file_reader(path: str) -> RangeReader:
+    def read(start: int, end: int) -> Iterator[bytes]:
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise ValueError("Frame pack truncated")
+                remaining -= len(chunk)
+                yield chunk
+
+    return read
+
+
+def read_bytes(read: RangeReader, start: int, end: int) -> bytes:
+    return b"".join(read(start, end))
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    name: str
+    # posição e tamanho dos bytes guardados (comprimidos, se method != 0)
+    offset: int
+    size: int
+    crc: int
+    mtime: int
+    # membros de um ZIP existente podem vir em deflate (8)
+    method: int = 0
+    file_size: Optional[int] = None
+
+    @property
+    def uncompressed_size(self) -> int:
+        return self.size if self.file_size is None else self.file_size
+
+
+class FramePackWriter:
+    """ArchiveWriterPort que grava um frame pack."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "wb")
+        self._entries: List[PackEntry] = []
+
+    def _add(self, arcname: str, chunks, mtime: float) -> None:
+        offset = self._file.tell()
+        crc = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            self._file.write(chunk)
+        self._entries.append(
+            PackEntry(arcname, offset, self._file.tell() - offset, crc, int(mtime))
+        )
+
+    def write(self, filename: str, arcname: str) -> None:
+        with open(filename, "rb") as src:
+            self._add(
+                arcname,
+                iter(lambda: src.read(CHUNK_SIZE), b""),
+                os.fstat(src.fileno()).st_mtime,
+            )
+
+    def writestr(self, arcname: str, data: bytes) -> None:
+        self._add(arcname, [data], time.time())
+
+    def close(self) -> None:
+        try:
+            index_offset = self._file.tell()
+            index = [[e.name, e.offset, e.size, e.crc, e.mtime] for e in self._entries]
+            self._file.write(json.dumps(index).encode("utf-8"))
+            self._file.write(_TRAILER.pack(index_offset, MAGIC))
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_index(path: str) -> List[PackEntry]:
+    return read_pack_index(file_reader(path), os.path.getsize(path))
+
+
+def read_pack_index(read: RangeReader, size: int) -> List[PackEntry]:
+    """Índice de um pack de ``size`` bytes: duas leituras, trailer e índice."""
+    if size < _TRAILER.size:
+        raise ValueError("Invalid frame pack")
+    index_offset, magic = _TRAILER.unpack(read_bytes(read, size - _TRAILER.size, size))
+    if magic != MAGIC or index_offset > size - _TRAILER.size:
+        raise ValueError("Invalid frame pack")
+    raw = read_bytes(read, index_offset, size - _TRAILER.size)
+    return [PackEntry(*row) for row in json.loads(raw)]
+
+
+def _dos_datetime(mtime: int) -> Tuple[int, int]:
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+# (offset no pack, tamanho) de um trecho de dados, ou bytes já montados
+_Part = Union[bytes, Tuple[int, int]]
+
+
+class ZipStream:
+    """ZIP equivalente aos membros dados, gerado sob demanda a partir da
+    origem lida por ``read`` (um frame pack ou um ZIP cujos membros são
+    copiados crus).
+
+    ``size`` é exato antes de qualquer byte ser lido; ``iter_bytes`` aceita
+    um intervalo [start, end) para respostas parciais."""
+
+    def __init__(self, read: RangeReader, entries: List[PackEntry]):
+        self._read = read
+        self._parts: List[_Part] = []
+        central = []
+        offset = 0
+        for entry in entries:
+            local = self._local_header(entry)
+            self._parts += [local, (entry.offset, entry.size)]
+            central.append(self._central_header(entry, offset))
+            offset += len(local) + entry.size
+        cd = b"".join(central)
+        self._parts += [cd, self._end_records(len(entries), len(cd), offset)]
+        self.size = sum(
+            len(part) if isinstance(part, bytes) else part[1] for part in self._parts
+        )
+
+    @classmethod
+    def open(cls, pack_path: str) -> "ZipStream":
+        return cls.from_reader(file_reader(pack_path), os.path.getsize(pack_path))
+
+    @classmethod
+    def from_reader(cls, read: RangeReader, size: int) -> "ZipStream":
+        return cls(read, read_pack_index(read, size))
+
+    @staticmethod
+    def _name(entry: PackEntry) -> Tuple[bytes, int]:
+        try:
+            return entry.name.encode("ascii"), 0
+        except UnicodeEncodeError:
+            # bit 11: nome em UTF-8
+            return entry.name.encode("utf-8"), 0x800
+
+    def _local_header(self, entry: PackEntry) -> bytes:
+        name, flags = self._name(entry)
+        dos_time, dos_date = _dos_datetime(entry.mtime)
+        extra = b""
+        csize, usize = entry.size, entry.uncompressed_size
+        version = 20
+        if max(csize, usize) >= ZIP64_LIMIT:
+            extra = struct.pack("<HHQQ", 1, 16, usize, csize)
+            csize = usize = _MARK32
+            version = 45
+        return (
+            struct.pack(
+                "<IHHHHHIIIHH",
+                0x04034B50,
+                version,
+                flags,
+                entry.method,
+                dos_time,
+                dos_date,
+                entry.crc,
+                csize,
+                usize,
+                len(name),
+                len(extra),
+            )
+            + name
+            + extra
+        )
+
+    def _central_header(self, entry: PackEntry, local_offset: int) -> bytes:
+        name, flags = self._name(entry)
+        dos_time, dos_date = _dos_datetime(entry.mtime)
+        fields = []
+        csize, usize = entry.size, entry.uncompressed_size
+        if max(csize, usize) >= ZIP64_LIMIT:
+            fields += [usize, csize]
+            csize = usize = _MARK32
+        if local_offset >= ZIP64_LIMIT:
+            fields.append(local_offset)
+            local_offset = _MARK32
+        extra = b""
+        version = 20
+        if fields:
+            extra = struct.pack(f"<HH{len(fields)}Q", 1, 8 * len(fields), *fields)
+            version = 45
+        return (
+            struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50,
+                (3 << 8) | version,
+                version,
+                flags,
+                entry.method,
+                dos_time,
+                dos_date,
+                entry.crc,
+                csize,
+                usize,
+                len(name),
+                len(extra),
+                0,
+                0,
+                0,
+                0o644 << 16,
+                local_offset,
+            )
+            + name
+            + extra
+        )
+
+    @staticmethod
+    def _end_records(count: int, cd_size: int, cd_offset: int) -> bytes:
+        records = b""
+        if (
+            count >= ZIP_MAX_ENTRIES
+            or cd_size >= ZIP64_LIMIT
+            or cd_offset >= ZIP64_LIMIT
+        ):
+            eocd64_offset = cd_offset + cd_size
+            records += struct.pack(
+                "<IQHHIIQQQQ",
+                0x06064B50,
+                44,
+                45,
+                45,
+                0,
+                0,
+                count,
+                count,
+                cd_size,
+                cd_offset,
+            )
+            records += struct.pack("<IIQI", 0x07064B50, 0, eocd64_offset, 1)
+            count = min(count, _MARK16)
+            cd_size = min(cd_size, _MARK32)
+            cd_offset = min(cd_offset, _MARK32)
+        return records + struct.pack(
+            "<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0
+        )
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        end = self.size if end is None else min(end, self.size)
+        pos = 0
+        for part in self._parts:
+            length = len(part) if isinstance(part, bytes) else part[1]
+            lo, hi = max(start, pos), min(end, pos + length)
+            if lo < hi:
+                if isinstance(part, bytes):
+                    yield part[lo - pos : hi - pos]
+                else:
+                    yield from self._read(part[0] + lo - pos, part[0] + hi - pos)
+            pos += length
+            if pos >= end:
+                return
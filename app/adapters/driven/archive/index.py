@@ -0,0 +1,198 @@
+"""Acesso aleatório a membros de artefatos já gravados.
+
+O índice de cada arquivo (diretório central do ZIP ou índice do frame pack)
+é lido uma vez e guardado num LRU limitado por número de arquivos; a chave
+inclui tamanho e mtime, então um artefato regravado é relido. Tudo é lido
+por faixas da storage (em S3, GET com Range): o índice custa poucas
+leituras do fim do arquivo, um frame é uma única leitura no offset do
+membro, e uma faixa de frames vira um ZIP montado sob demanda com os bytes
+crus de cada membro (sem recomprimir).
+"""
+
+import io
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from app.adapters.driven.archive.framepack import (
+    PackEntry,
+    RangeReader,
+    ZipStream,
+    read_bytes,
+    read_pack_index,
+)
+from app.domain.ports.archive import ArchiveStreamPort
+from app.domain.ports.frame_index import FrameIndexPort
+from app.domain.ports.storage import StoragePort
+
+# formatos com membros endereçáveis; tar.zst não tem offsets utilizáveis
+ZIP_FORMATS = ("zip", "zip-stored")
+PACK_FORMATS = ("zip-lazy",)
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+# bit 3: tamanhos num descritor depois dos dados, não no cabeçalho local
+_DATA_DESCRIPTOR = 0x08
+
+
+class _RangeFile(io.RawIOBase):
+    """Arquivo só-leitura sobre um ``RangeReader``; cada ``read`` é uma faixa."""
+
+    def __init__(self, read: RangeReader, size: int):
+        self._read = read
+        self._size = size
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: self._size}
+        self._pos = max(0, base[whence] + offset)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._size if size is None or size < 0 else self._pos + size
+        end = min(end, self._size)
+        if end <= self._pos:
+            return b""
+        data = read_bytes(self._read, self._pos, end)
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _data_offset(read: RangeReader, info: zipfile.ZipInfo) -> int:
+    header = read_bytes(
+        read, info.header_offset, info.header_offset + _LOCAL_HEADER.size
+    )
+    magic, name_len, extra_len = _LOCAL_HEADER.unpack(header)
+    if magic != b"PK\x03\x04":
+        raise ValueError("Invalid zip local header")
+    return info.header_offset + _LOCAL_HEADER.size + name_len + extra_len
+
+
+def _zip_entries(read: RangeReader, size: int) -> Dict[str, PackEntry]:
+    with zipfile.ZipFile(_RangeFile(read, size)) as zf:
+        infos = sorted(zf.infolist(), key=lambda i: i.header_offset)
+        cd_offset = zf.start_dir
+    entries = {}
+    for i, info in enumerate(infos):
+        if info.is_dir() or info.compress_type not in (
+            zipfile.ZIP_STORED,
+            zipfile.ZIP_DEFLATED,
+        ):
+            continue
+        if info.flag_bits & _DATA_DESCRIPTOR:
+            offset = _data_offset(read, info)
+        else:
+            # membros são contíguos: os dados terminam onde começa o próximo
+            # cabeçalho, sem ler um cabeçalho local por membro
+            end = infos[i + 1].header_offset if i + 1 < len(infos) else cd_offset
+            offset = end - info.compress_size
+            if offset < info.header_offset + _LOCAL_HEADER.size:
+                raise ValueError("Invalid zip local header")
+        entries[info.filename] = PackEntry(
+            info.filename,
+            offset,
+            info.compress_size,
+            info.CRC,
+            int(time.mktime(info.date_time + (0, 0, -1))),
+            method=info.compress_type,
+            file_size=info.file_size,
+        )
+    return entries
+
+
+class ArchiveIndex(FrameIndexPort):
+    def __init__(self, storage: StoragePort, max_archives: int = 256):
+        self.storage = storage
+        self.max_archives = max_archives
+        self._cache: "OrderedDict[Tuple[str, int, int], Dict[str, PackEntry]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def supports(self, fmt: str) -> bool:
+        return fmt in ZIP_FORMATS or fmt in PACK_FORMATS
+
+    def members(self, ref: str, fmt: str) -> Dict[str, PackEntry]:
+        if not self.supports(fmt):
+            raise ValueError(f"Frame access not supported for format: {fmt}")
+        info = self.storage.stat(ref)
+        if info is None:
+            raise KeyError("Artifact missing")
+        key = (ref, info.size, info.mtime_ns)
+        with self._lock:
+            entries = self._cache.get(key)
+            if entries is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entries
+            self.misses += 1
+        # leitura fora do lock: duas requisições simultâneas no máximo leem duas vezes
+        read = partial(self.storage.read_range, ref)
+        if fmt in PACK_FORMATS:
+            entries = {e.name: e for e in read_pack_index(read, info.size)}
+        else:
+            entries = _zip_entries(read, info.size)
+        with self._lock:
+            self._cache[key] = entries
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_archives:
+                self._cache.popitem(last=False)
+        return entries
+
+    def names(self, ref: str, fmt: str) -> List[str]:
+        return list(self.members(ref, fmt))
+
+    def read(self, ref: str, fmt: str, name: str) -> Optional[bytes]:
+        """Bytes descomprimidos de ``name``; None se não existe."""
+        entry = self.members(ref, fmt).get(name)
+        if entry is None:
+            return None
+        raw = read_bytes(
+            partial(self.storage.read_range, ref),
+            entry.offset,
+            entry.offset + entry.size,
+        )
+        if len(raw) != entry.size:
+            raise ValueError("Archive truncated")
+        data = (
+            zlib.decompress(raw, -15) if entry.method == zipfile.ZIP_DEFLATED else raw
+        )
+        # o offset de ZIPs vem do diretório central: o CRC confirma o membro
+        if zlib.crc32(data) != entry.crc:
+            raise ValueError("Archive member corrupted")
+        return data
+
+    def stream(self, ref: str, fmt: str, names: List[str]) -> ArchiveStreamPort:
+        """ZIP só com ``names`` (os que existirem), na ordem dada."""
+        members = self.members(ref, fmt)
+        return ZipStream(
+            partial(self.storage.read_range, ref),
+            [members[n] for n in names if n in members],
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "archives": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,113 @@
+import io
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass
+from typing import Callable, Optional
+from app.adapters.driven.archive.framepack import (
+    FramePackWriter,
+    RangeReader,
+    ZipStream,
+)
+from app.domain.ports.archive import ArchiverPort, ArchiveStreamPort, ArchiveWriterPort
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class TarArchiveWriter(ArchiveWriterPort):
+    def __init__(self, path: str, zstd_level: int | None = None):
+        self._file = open(path, "wb")
+        self._zst = None
+        if zstd_level is not None:
+            self._zst = zstandard.ZstdCompressor(level=zstd_level).stream_writer(
+                self._file, closefd=False
+            )
+            # "w|": escrita sequencial, sem seek no stream comprimido
+            self._tar = tarfile.open(fileobj=self._zst, mode="w|")
+        else:
+            self._tar = tarfile.open(fileobj=self._file, mode="w")
+
+    def write(self, filename: str, arcname: str) -> None:
+        self._tar.add(filename, arcname=arcname, recursive=False)
+
+    def writestr(self, arcname: str, data: bytes) -> None:
+        info = tarfile.TarInfo(arcname)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        try:
+            self._tar.close()
+            if self._zst is not None:
+                self._zst.close()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@dataclass(frozen=True)
+class ArchiveFormat:
+    extension: str
+    media_type: str
+    opener: Callable[[str], ArchiveWriterPort]
+    # formatos guardados como frame pack: o download monta o ZIP na hora
+    streamer: Optional[Callable[[RangeReader, int], ArchiveStreamPort]] = None
+
+
+def _zip(compression: int) -> Callable[[str], ArchiveWriterPort]:
+    return lambda path: zipfile.ZipFile(
+        path, mode="w", compression=compression, allowZip64=True
+    )
+
+
+ARCHIVE_FORMATS: dict[str, ArchiveFormat] = {
+    "zip": ArchiveFormat("zip", "application/zip", _zip(zipfile.ZIP_DEFLATED)),
+    # JPEG já é comprimido: STORED evita gastar CPU com deflate quase inútil
+    "zip-stored": ArchiveFormat("zip", "application/zip", _zip(zipfile.ZIP_STORED)),
+    "tar": ArchiveFormat("tar", "application/x-tar", TarArchiveWriter),
+    "zip-lazy": ArchiveFormat(
+        "fpk", "application/zip", FramePackWriter, streamer=ZipStream.from_reader
+    ),
+}
+if zstandard is not None:
+    ARCHIVE_FORMATS["tar.zst"] = ArchiveFormat(
+        "tar.zst", "application/zstd", lambda path: TarArchiveWriter(path, zstd_level=3)
+    )
+
+
+class Archiver(ArchiverPort):
+    def _get(self, fmt: str) -> ArchiveFormat:
+        try:
+            return ARCHIVE_FORMATS[fmt]
+        except KeyError:
+            raise ValueError(f"Unsupported archive format: {fmt}") from None
+
+    def formats(self) -> list[str]:
+        return list(ARCHIVE_FORMATS)
+
+    def extension(self, fmt: str) -> str:
+        return self._get(fmt).extension
+
+    def media_type(self, fmt: str) -> str:
+        return self._get(fmt).media_type
+
+    def open(self, fmt: str, path: str) -> ArchiveWriterPort:
+        return self._get(fmt).opener(path)
+
+    def streams(self, fmt: str) -> bool:
+        return self._get(fmt).streamer is not None
+
+    def stream(
+        self, fmt: str, read: RangeReader, size: int
+    ) -> Optional[ArchiveStreamPort]:
+        streamer = self._get(fmt).streamer
+        return streamer(read, size) if streamer else None
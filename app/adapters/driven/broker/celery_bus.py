@@ -1,12 +1,103 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
 from celery import Celery
-from app.domain.ports.message_bus import MessageBusPort
+from app.domain.ports.message_bus import BatchPublisherPort, MessageBusPort
+
+
+class CeleryMessageBus(MessageBusPort, BatchPublisherPort):
+    """Publicador do processo: um app Celery e um pool de producers reusados.
+
+    As conexões do pool abrem na primeira publicação e são reusadas depois; o
+    app é recriado quando o PID muda, então um filho de ``fork`` nunca usa os
+    sockets do pai.
+    ``stats()`` devolve contagens e a latência das últimas publicações.
+    """
+
+    def __init__(
+        self,
+        broker_url: str,
+        backend_url: str | None = None,
+        confirm_publish: bool = False,
+        pool_limit: Optional[int] = None,
+        latency_window: int = 1024,
+    ):
+        self._options = {}
+        if confirm_publish:
+            # py-amqp: cada publish só retorna depois do ack do broker
+            self._options["broker_transport_options"] = {"confirm_publish": True}
+        if pool_limit is not None:
+            # conexões mantidas abertas no pool de producers do processo
+            self._options["broker_pool_limit"] = pool_limit
+        self._broker_url = broker_url
+        self._backend_url = backend_url or None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._app = None
+        self.published = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=max(1, latency_window))
+        self._connect()
 
+    def _connect(self) -> Celery:
+        with self._lock:
+            if self._pid != os.getpid():
+                # não fecha o pool herdado: os sockets ainda são do processo pai
+                self._app = Celery(
+                    "video_processor_client",
+                    broker=self._broker_url,
+                    backend=self._backend_url,
+                    **self._options,
+                )
+                self._pid = os.getpid()
+            return self._app
 
-class CeleryMessageBus(MessageBusPort):
-    def __init__(self, broker_url: str, backend_url: str | None = None):
-        self._celery = Celery(
-            "video_processor_client", broker=broker_url, backend=backend_url or None
-        )
+    @property
+    def _celery(self) -> Celery:
+        if self._pid != os.getpid():
+            return self._connect()
+        return self._app
+
+    def _send(self, job_id: str, **options) -> None:
+        start = time.perf_counter()
+        try:
+            self._celery.send_task("process_video_job", args=[job_id], **options)
+        except Exception:
+            self.errors += 1
+            raise
+        self.published += 1
+        self._latencies.append(time.perf_counter() - start)
 
     def enqueue_process(self, job_id: str) -> None:
-        self._celery.send_task("process_video_job", args=[job_id])
+        self._send(job_id)
+
+    def enqueue_many(self, job_ids: List[str]) -> List[Optional[str]]:
+        errors: List[Optional[str]] = []
+        # um producer (e uma conexão) para o lote inteiro
+        with self._celery.producer_or_acquire() as producer:
+            for job_id in job_ids:
+                try:
+                    self._send(job_id, producer=producer)
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(f"{type(e).__name__}: {e}")
+        return errors
+
+    def close(self) -> None:
+        # só fecha o pool que este processo abriu
+        with self._lock:
+            if self._app is not None and self._pid == os.getpid():
+                self._app.close()
+
+    def stats(self) -> dict:
+        samples = sorted(self._latencies)
+        n = len(samples)
+        return {
+            "published": self.published,
+            "errors": self.errors,
+            "p50_ms": samples[n // 2] * 1000 if n else None,
+            "p99_ms": samples[min(n - 1, int(n * 0.99))] * 1000 if n else None,
+        }
@@ -0,0 +1,16 @@
+from app.domain.entities import OutboxMessage
+from app.domain.ports.message_bus import PROCESS_TOPIC, MessageBusPort
+from app.domain.ports.uow import UnitOfWorkPort
+
+
+class OutboxMessageBus(MessageBusPort):
+    """Grava a publicação no outbox da unidade de trabalho do serviço: o job
+    e a intenção de enfileirá-lo entram no mesmo commit, e o relay publica no
+    broker depois. Publicar duas vezes é inofensivo: o worker só processa o
+    job se conseguir o ``claim`` (QUEUED -> RUNNING)."""
+
+    def __init__(self, uow: UnitOfWorkPort):
+        self.uow = uow
+
+    def enqueue_process(self, job_id: str) -> None:
+        self.uow.outbox.add(OutboxMessage(PROCESS_TOPIC, {"job_id": job_id}))
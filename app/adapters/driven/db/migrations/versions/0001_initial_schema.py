@@ -0,0 +1,77 @@
+"""initial schema: videos e video_jobs como o antigo ``create_all`` criava
+
+Bancos criados antes das migrações (pelo antigo ``create_all``) já estão
+neste estado: marque com ``alembic stamp 0001`` e depois rode
+``alembic upgrade head``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 05:09:36.841240
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+job_status = sa.Enum("QUEUED", "RUNNING", "DONE", "ERROR", name="job_status")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "videos",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("filename", sa.String(length=255), nullable=False),
+        sa.Column("storage_ref", sa.Text(), nullable=False),
+        sa.Column("duration", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_videos_user_id", "videos", ["user_id"])
+
+    op.create_table(
+        "video_jobs",
+        sa.Column("id", sa.String(length=36), nullable=False),
+        sa.Column("video_id", sa.String(length=36), nullable=False),
+        sa.Column("user_id", sa.String(length=64), nullable=False),
+        sa.Column("status", job_status, nullable=False),
+        sa.Column("fps", sa.Integer(), nullable=False),
+        sa.Column("frame_count", sa.Integer(), nullable=False),
+        sa.Column("artifact_ref", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["video_id"], ["videos.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_video_jobs_video_id", "video_jobs", ["video_id"])
+    op.create_index("ix_video_jobs_user_id", "video_jobs", ["user_id"])
+    op.create_index("ix_video_jobs_status", "video_jobs", ["status"])
+    op.create_index("ix_video_jobs_created_at", "video_jobs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("video_jobs")
+    op.drop_table("videos")
+    # no Postgres o enum é um tipo à parte e sobrevive ao drop da tabela
+    job_status.drop(op.get_bind(), checkfirst=True)
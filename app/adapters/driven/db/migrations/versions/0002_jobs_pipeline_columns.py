@@ -0,0 +1,121 @@
+"""colunas, tabelas e status que vieram depois do schema inicial
+
+``videos.content_hash``, as colunas de extração/arquivo/progresso de
+``video_jobs``, o status ``CANCELLED`` e as tabelas ``work_leases`` e
+``outbox``.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 05:09:36.841240
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+old_status = sa.Enum("QUEUED", "RUNNING", "DONE", "ERROR", name="job_status")
+new_status = sa.Enum(
+    "QUEUED", "RUNNING", "DONE", "ERROR", "CANCELLED", name="job_status"
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # ADD VALUE não pode ser usado na mesma transação em que é criado
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE job_status ADD VALUE IF NOT EXISTS 'CANCELLED'")
+    else:
+        with op.batch_alter_table("video_jobs") as batch:
+            batch.alter_column("status", existing_type=old_status, type_=new_status)
+
+    with op.batch_alter_table("videos") as batch:
+        batch.add_column(sa.Column("content_hash", sa.String(length=64), nullable=True))
+        batch.create_index("ix_videos_content_hash", ["content_hash"])
+
+    with op.batch_alter_table("video_jobs") as batch:
+        batch.add_column(
+            sa.Column(
+                "dropped_frames", sa.Integer(), server_default="0", nullable=False
+            )
+        )
+        batch.add_column(
+            sa.Column(
+                "archive_format",
+                sa.String(length=16),
+                server_default="zip",
+                nullable=False,
+            )
+        )
+        batch.add_column(
+            sa.Column(
+                "mode", sa.String(length=16), server_default="fps", nullable=False
+            )
+        )
+        batch.add_column(sa.Column("scene_threshold", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("min_fps", sa.Float(), nullable=True))
+        batch.add_column(sa.Column("max_fps", sa.Float(), nullable=True))
+        batch.add_column(
+            sa.Column(
+                "output", sa.String(length=16), server_default="frames", nullable=False
+            )
+        )
+        batch.add_column(
+            sa.Column("progress", sa.Float(), server_default="0", nullable=False)
+        )
+        batch.add_column(sa.Column("eta_seconds", sa.Float(), nullable=True))
+
+    op.create_table(
+        "work_leases",
+        sa.Column("work_key", sa.String(length=255), nullable=False),
+        sa.Column("holder", sa.String(length=36), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("work_key"),
+    )
+
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("topic", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outbox_topic_available", "outbox", ["topic", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("outbox")
+    op.drop_table("work_leases")
+
+    with op.batch_alter_table("video_jobs") as batch:
+        for column in (
+            "eta_seconds",
+            "progress",
+            "output",
+            "max_fps",
+            "min_fps",
+            "scene_threshold",
+            "mode",
+            "archive_format",
+            "dropped_frames",
+        ):
+            batch.drop_column(column)
+
+    with op.batch_alter_table("videos") as batch:
+        batch.drop_index("ix_videos_content_hash")
+        batch.drop_column("content_hash")
+
+    # jobs cancelados não têm status equivalente no schema antigo
+    op.execute("UPDATE video_jobs SET status = 'ERROR' WHERE status = 'CANCELLED'")
+    if op.get_bind().dialect.name != "postgresql":
+        with op.batch_alter_table("video_jobs") as batch:
+            batch.alter_column("status", existing_type=new_status, type_=old_status)
+    # no Postgres um valor de enum não pode ser removido: CANCELLED fica no tipo
@@ -1,11 +1,22 @@
 # app/adapters/driven/db/models.py
 from __future__ import annotations
 
+import json
 from typing import Optional, List
 from datetime import datetime
 
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, Enum, DateTime, Text, Float, ForeignKey, func
+from sqlalchemy import (
+    String,
+    Integer,
+    Enum,
+    DateTime,
+    Text,
+    Float,
+    ForeignKey,
+    Index,
+    func,
+)
 from app.domain.entities import JobStatus
 
 
@@ -21,6 +32,10 @@ class VideoModel(Base):
     filename: Mapped[str] = mapped_column(String(255), nullable=False)
     storage_ref: Mapped[str] = mapped_column(Text, nullable=False)
     duration: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # sha256 do conteúdo; uploads idênticos compartilham o mesmo storage_ref
+    content_hash: Mapped[Optional[str]] = mapped_column(
+        String(64), index=True, nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -38,6 +53,7 @@ class VideoModel(Base):
             filename=self.filename,
             storage_ref=self.storage_ref,
             duration=self.duration,
+            content_hash=self.content_hash,
             created_at=self.created_at,
         )
 
@@ -49,6 +65,7 @@ class VideoModel(Base):
             filename=v.filename,
             storage_ref=v.storage_ref,
             duration=v.duration,
+            content_hash=v.content_hash,
         )
 
 
@@ -70,8 +87,27 @@ class JobModel(Base):
 
     fps: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     frame_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    dropped_frames: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
     artifact_ref: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    archive_format: Mapped[str] = mapped_column(
+        String(16), default="zip", server_default="zip", nullable=False
+    )
+    mode: Mapped[str] = mapped_column(
+        String(16), default="fps", server_default="fps", nullable=False
+    )
+    scene_threshold: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    min_fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    max_fps: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    output: Mapped[str] = mapped_column(
+        String(16), default="frames", server_default="frames", nullable=False
+    )
+    progress: Mapped[float] = mapped_column(
+        Float, default=0.0, server_default="0", nullable=False
+    )
+    eta_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
@@ -95,8 +131,17 @@ class JobModel(Base):
             status=self.status,
             fps=self.fps,
             frame_count=self.frame_count,
+            dropped_frames=self.dropped_frames,
             artifact_ref=self.artifact_ref,
             error=self.error,
+            archive_format=self.archive_format,
+            mode=self.mode,
+            scene_threshold=self.scene_threshold,
+            min_fps=self.min_fps,
+            max_fps=self.max_fps,
+            output=self.output,
+            progress=self.progress,
+            eta_seconds=self.eta_seconds,
             created_at=self.created_at,
             updated_at=self.updated_at,
         )
@@ -110,6 +155,70 @@ class JobModel(Base):
             status=j.status,
             fps=j.fps,
             frame_count=j.frame_count,
+            dropped_frames=j.dropped_frames,
             artifact_ref=j.artifact_ref,
             error=j.error,
+            archive_format=j.archive_format,
+            mode=j.mode,
+            scene_threshold=j.scene_threshold,
+            min_fps=j.min_fps,
+            max_fps=j.max_fps,
+            output=j.output,
+            progress=j.progress,
+            eta_seconds=j.eta_seconds,
+        )
+
+
+class LeaseModel(Base):
+    __tablename__ = "work_leases"
+
+    work_key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(36), nullable=False)
+    # UTC sem fuso: comparado com datetime.utcnow() dos workers
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    def to_entity(self):
+        from app.domain.entities import WorkLease
+
+        return WorkLease(
+            key=self.work_key, holder=self.holder, expires_at=self.expires_at
+        )
+
+
+class OutboxModel(Base):
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    topic: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # UTC sem fuso; o relay também usa como lease enquanto entrega
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (Index("ix_outbox_topic_available", "topic", "available_at"),)
+
+    def to_entity(self):
+        from app.domain.entities import OutboxMessage
+
+        return OutboxMessage(
+            id=self.id,
+            topic=self.topic,
+            payload=json.loads(self.payload),
+            attempts=self.attempts,
+            available_at=self.available_at,
+            created_at=self.created_at,
+            last_error=self.last_error,
+        )
+
+    @staticmethod
+    def from_entity(m):
+        return OutboxModel(
+            topic=m.topic,
+            payload=json.dumps(m.payload),
+            attempts=m.attempts,
+            available_at=m.available_at,
+            created_at=m.created_at,
+            last_error=m.last_error,
         )
@@ -1,10 +1,21 @@
 from sqlalchemy.orm import sessionmaker, Session
 from app.domain.ports.uow import UnitOfWorkPort
-from app.domain.ports.repository import VideoRepositoryPort, JobRepositoryPort
+from app.domain.ports.repository import (
+    VideoRepositoryPort,
+    JobRepositoryPort,
+    LeaseRepositoryPort,
+    OutboxRepositoryPort,
+)
 from app.adapters.driven.repositories.sqlalchemy_video_repo import (
     SQLAlchemyVideoRepository,
 )
 from app.adapters.driven.repositories.sqlalchemy_job_repo import SQLAlchemyJobRepository
+from app.adapters.driven.repositories.sqlalchemy_lease_repo import (
+    SQLAlchemyLeaseRepository,
+)
+from app.adapters.driven.repositories.sqlalchemy_outbox_repo import (
+    SQLAlchemyOutboxRepository,
+)
 
 
 class SQLAlchemyUnitOfWork(UnitOfWorkPort):
@@ -13,11 +24,15 @@ class SQLAlchemyUnitOfWork(UnitOfWorkPort):
         self._session: Session | None = None
         self.videos: VideoRepositoryPort | None = None
         self.jobs: JobRepositoryPort | None = None
+        self.leases: LeaseRepositoryPort | None = None
+        self.outbox: OutboxRepositoryPort | None = None
 
     def __enter__(self):
         self._session = self._session_factory()
         self.videos = SQLAlchemyVideoRepository(self._session)
         self.jobs = SQLAlchemyJobRepository(self._session)
+        self.leases = SQLAlchemyLeaseRepository(self._session)
+        self.outbox = SQLAlchemyOutboxRepository(self._session)
         return self
 
     def __exit__(self, exc_type, exc, tb):
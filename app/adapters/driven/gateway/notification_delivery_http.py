@@ -0,0 +1,54 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import httpx
+
+from app.domain.entities import OutboxMessage
+from app.domain.ports.notification import NotificationDeliveryPort
+
+logger = logging.getLogger(__name__)
+
+
+class HttpNotificationDelivery(NotificationDeliveryPort):
+    """Entrega lotes do outbox no ``POST /notify`` do notification-service.
+
+    Um único ``httpx.Client`` (keep-alive, até ``concurrency`` conexões) é
+    reaproveitado entre lotes, e os POSTs de um lote saem em paralelo. Não há
+    retry nem sleep aqui: a falha volta para o relay, que reagenda a mensagem.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 5.0,
+        concurrency: int = 16,
+        client: Optional[httpx.Client] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = max(1, concurrency)
+        self.client = client or httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+        )
+        self._pool = ThreadPoolExecutor(self.concurrency, thread_name_prefix="notify")
+
+    def _send(self, message: OutboxMessage) -> Optional[str]:
+        try:
+            resp = self.client.post(
+                f"{self.base_url}/notify",
+                json=message.payload,
+                # a entrega é pelo menos uma vez: o serviço pode deduplicar por aqui
+                headers={"Idempotency-Key": f"outbox-{message.id}"},
+            )
+        except httpx.HTTPError as e:
+            return f"{type(e).__name__}: {e}"
+        if resp.is_success:
+            return None
+        return f"HTTP {resp.status_code}"
+
+    def deliver(self, messages: List[OutboxMessage]) -> List[Optional[str]]:
+        return list(self._pool.map(self._send, messages))
@@ -0,0 +1,34 @@
+from typing import Any, Optional
+
+from app.domain.entities import OutboxMessage
+from app.domain.ports.notification import NOTIFICATION_TOPIC, NotificationPort, Status
+from app.domain.ports.uow import UnitOfWorkPort
+
+
+class OutboxNotifier(NotificationPort):
+    """Grava a notificação no outbox da mesma unidade de trabalho do serviço:
+    ela é persistida (ou descartada) junto com o status final do job, e quem
+    faz o POST é o relay (ver ``RelayOutboxService``)."""
+
+    def __init__(self, uow: UnitOfWorkPort):
+        self.uow = uow
+
+    def notify(
+        self,
+        *,
+        user_id: Any,
+        job_id: str,
+        status: Status,
+        video_url: Optional[str] = None,
+        error_message: Optional[str] = None,
+    ) -> None:
+        payload: dict[str, Any] = {
+            "user_id": user_id,
+            "job_id": job_id,
+            "status": getattr(status, "value", str(status)),
+        }
+        if video_url:
+            payload["video_url"] = video_url
+        if error_message:
+            payload["error_message"] = error_message
+        self.uow.outbox.add(OutboxMessage(NOTIFICATION_TOPIC, payload))
@@ -0,0 +1,194 @@
+"""Remoção de frames quase idênticos por hash perceptual.
+
+Os JPEGs já extraídos são redecodificados por um ffmpeg que entrega cada frame
+reduzido e em tons de cinza como ``rawvideo`` num pipe (sem depender de uma
+biblioteca de imagem). Os hashes de 64 bits são calculados em lote com NumPy e
+um frame é descartado quando fica a até ``threshold`` bits de distância de
+Hamming do último frame mantido. A memória fica limitada a ``batch_size``
+miniaturas por vez.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+from app.domain.errors import JobCancelled
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# método -> (largura, altura) da miniatura que o ffmpeg entrega
+HASH_SIZES = {"dhash": (9, 8), "phash": (32, 32)}
+
+
+def _dct_matrix(n: int):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    m[0] /= np.sqrt(2)
+    return m
+
+
+def _pack(bits) -> "np.ndarray":
+    """(n, 8, 8) bool -> (n,) uint64."""
+    packed = np.packbits(bits.reshape(len(bits), 64), axis=1)
+    return packed.view(">u8").ravel().astype(np.uint64)
+
+
+def dhash(gray) -> "np.ndarray":
+    """Gradiente horizontal: (n, 8, 9) uint8 -> (n,) uint64."""
+    g = gray.astype(np.int16)
+    return _pack(g[:, :, 1:] > g[:, :, :-1])
+
+
+def phash(gray) -> "np.ndarray":
+    """DCT 2D e mediana das 8x8 frequências baixas: (n, 32, 32) -> (n,) uint64."""
+    d = _dct_matrix(gray.shape[1])
+    coeffs = (d @ gray.astype(np.float64) @ d.T)[:, :8, :8].reshape(len(gray), 64)
+    # o DC só mede o brilho médio; fica fora da mediana
+    median = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+    return _pack((coeffs > median).reshape(len(gray), 8, 8))
+
+
+def hamming(hashes, ref: int) -> "np.ndarray":
+    return np.bitwise_count(hashes ^ np.uint64(ref))
+
+
+def keep_mask(
+    hashes, threshold: int, last: Optional[int]
+) -> Tuple[list, Optional[int]]:
+    """Quais frames do lote ficam, comparando com o último mantido (``last``,
+    que pode vir do lote anterior). Cada passo pula de uma vez a sequência de
+    frames parecidos com a referência atual."""
+    keep = [False] * len(hashes)
+    i = 0
+    while i < len(hashes):
+        if last is not None:
+            far = np.flatnonzero(hamming(hashes[i:], last) > threshold)
+            if far.size == 0:
+                break
+            i += int(far[0])
+        keep[i] = True
+        last = int(hashes[i])
+        i += 1
+    return keep, last
+
+
+class PerceptualDeduplicator:
+    """Filtro de frames para o ProcessVideoService (ver ``filter_dir``)."""
+
+    def __init__(
+        self,
+        ffmpeg_bin: str = "ffmpeg",
+        method: str = "dhash",
+        threshold: int = 4,
+        batch_size: int = 256,
+    ):
+        if np is None:
+            raise RuntimeError("Frame dedupe requires numpy")
+        if method not in HASH_SIZES:
+            raise ValueError(f"Unsupported hash method: {method}")
+        if not 0 <= threshold < 64:
+            raise ValueError("Dedupe threshold must be between 0 and 63")
+        self.ffmpeg_bin = ffmpeg_bin
+        self.method = method
+        self.threshold = threshold
+        self.batch_size = max(1, batch_size)
+
+    @property
+    def key(self) -> str:
+        return f"{self.method}{self.threshold}"
+
+    def _hash(self, gray):
+        return dhash(gray) if self.method == "dhash" else phash(gray)
+
+    def _thumbnails(
+        self, paths: List[str], cancel: Optional[threading.Event]
+    ) -> Iterator["np.ndarray"]:
+        """Lotes (n, h, w) de miniaturas, na ordem de ``paths``."""
+        width, height = HASH_SIZES[self.method]
+        cmd = [
+            self.ffmpeg_bin,
+            "-hide_banner",
+            "-v",
+            "error",
+            "-f",
+            "image2pipe",
+            "-c:v",
+            "mjpeg",
+            "-i",
+            "pipe:0",
+            "-vf",
+            f"scale={width}:{height}:flags=area,format=gray",
+            "-fps_mode",
+            "passthrough",
+            "-f",
+            "rawvideo",
+            "pipe:1",
+        ]
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+        def _feed():
+            try:
+                for path in paths:
+                    with open(path, "rb") as f:
+                        proc.stdin.write(f.read())
+            except (BrokenPipeError, OSError):
+                pass
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+
+        feeder = threading.Thread(target=_feed, daemon=True)
+        feeder.start()
+        frame_bytes = width * height
+        try:
+            while True:
+                if cancel is not None and cancel.is_set():
+                    raise JobCancelled()
+                buf = proc.stdout.read(frame_bytes * self.batch_size)
+                n = len(buf) // frame_bytes
+                if n:
+                    yield np.frombuffer(buf[: n * frame_bytes], np.uint8).reshape(
+                        n, height, width
+                    )
+                if len(buf) < frame_bytes * self.batch_size:
+                    break
+        finally:
+            proc.kill()
+            proc.wait()
+            feeder.join()
+
+    def filter_dir(
+        self, frames_dir: str, cancel: Optional[threading.Event] = None
+    ) -> int:
+        """Apaga de ``frames_dir`` os JPEGs quase idênticos ao último mantido e
+        devolve quantos saíram. Os demais mantêm o nome (e a posição no tempo)."""
+        paths = sorted(
+            os.path.join(frames_dir, f)
+            for f in os.listdir(frames_dir)
+            if f.lower().endswith((".jpg", ".jpeg"))
+        )
+        dropped = 0
+        seen = 0
+        last: Optional[int] = None
+        for batch in self._thumbnails(paths, cancel):
+            keep, last = keep_mask(self._hash(batch), self.threshold, last)
+            for path, kept in zip(paths[seen : seen + len(batch)], keep):
+                if not kept:
+                    os.remove(path)
+                    dropped += 1
+            seen += len(batch)
+        if seen != len(paths):
+            raise RuntimeError(f"Frame dedupe decoded {seen} of {len(paths)} frames")
+        return dropped
@@ -1,17 +1,117 @@
+from collections import deque
+from contextlib import contextmanager
+from fractions import Fraction
+import json
+import logging
+import os
 from pathlib import Path
 import subprocess
-from app.domain.ports.video_processor import VideoProcessorPort
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from app.adapters.driven.media.jpeg_stream import iter_jpeg_frames
+from app.adapters.driven.media.progress import ProgressTracker, start_reader
+from app.adapters.driven.media.segments import (
+    FrameTarget,
+    Segment,
+    VideoProbe,
+    plan_segments,
+    plan_sparse,
+    rescale_us,
+)
+from app.domain.entities import SheetLayout
+from app.domain.errors import JobCancelled
+from app.domain.ports.video_processor import ProgressCallback, VideoProcessorPort
+
+logger = logging.getLogger(__name__)
+
+
+def _format_us(us: int) -> str:
+    return f"{us // 1_000_000}.{us % 1_000_000:06d}"
 
 
 class FFmpegVideoProcessor(VideoProcessorPort):
-    def __init__(self, ffmpeg_bin: str = "ffmpeg", timeout_sec: int = 600):
+    def __init__(
+        self,
+        ffmpeg_bin: str = "ffmpeg",
+        timeout_sec: int = 600,
+        ffprobe_bin: str = "ffprobe",
+        workers: int = 1,
+        min_segment_sec: float = 30,
+        sparse: bool = False,
+        seek_overhead: float = 15,
+    ):
         self.ffmpeg_bin = ffmpeg_bin
         self.timeout_sec = timeout_sec
+        self.ffprobe_bin = ffprobe_bin
+        # workers > 1 divide o vídeo em segmentos extraídos em paralelo
+        self.workers = workers
+        self.min_segment_sec = min_segment_sec
+        # sparse deixa o modelo de custo escolher seek por frame em fps baixo;
+        # seek_overhead é o custo de um processo + seek em frames decodificados
+        self.sparse = sparse
+        self.seek_overhead = seek_overhead
 
-    def extract_frames(self, input_path: str, out_dir: str, fps: int = 1) -> int:
+    def extract_frames(
+        self,
+        input_path: str,
+        out_dir: str,
+        fps: int = 1,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
         out_dir_p = Path(out_dir)
         out_dir_p.mkdir(parents=True, exist_ok=True)
 
+        plan = self._plan(input_path, fps)
+        if plan is not None and plan[0] == "sparse":
+            _, probe, targets = plan
+            tracker = ProgressTracker(len(targets)) if on_progress else None
+            count = 0
+            for number, frame in self._iter_sparse(input_path, targets, cancel):
+                (out_dir_p / f"{number:08d}.jpg").write_bytes(frame)
+                count += 1
+                if tracker:
+                    tracker.update("sparse", count)
+                    tracker.report(on_progress)
+            return count
+
+        tracker = self._tracker(input_path, plan, on_progress)
+        pattern = str(out_dir_p / "%08d.jpg")
+        if plan is not None:
+            _, probe, segments = plan
+            cmds = [
+                self._segment_cmd(
+                    input_path,
+                    fps,
+                    probe,
+                    seg,
+                    ["-start_number", str(seg.first_number), pattern],
+                )
+                for seg in segments
+            ]
+        elif tracker is not None or cancel is not None:
+            cmds = [self._serial_cmd(input_path, fps, ["-y", pattern])]
+        else:
+            cmds = None
+
+        if cmds is not None:
+            with self._spawn(
+                cmds, [subprocess.DEVNULL] * len(cmds), tracker, fps, cancel
+            ) as procs:
+                for proc in procs:
+                    while True:
+                        try:
+                            proc.wait(timeout=1)
+                            break
+                        except subprocess.TimeoutExpired:
+                            if tracker:
+                                tracker.report(on_progress)
+            if tracker:
+                tracker.report(on_progress)
+            return sum(1 for _ in out_dir_p.glob("*.jpg"))
+
         cmd = [
             self.ffmpeg_bin,
             "-y",
@@ -43,3 +143,580 @@ class FFmpegVideoProcessor(VideoProcessorPort):
             raise RuntimeError(f"ffmpeg timeout após {self.timeout_sec}s") from e
 
         return sum(1 for _ in out_dir_p.glob("*.jpg"))
+
+    def extract_frames_multi(
+        self,
+        input_path: str,
+        outputs: Dict[int, str],
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[int, int]:
+        """Uma única decodificação para vários fps: ``split`` alimenta um
+        ramo ``fps`` por saída e cada ramo grava em ``outputs[fps]``.
+        Retorna a quantidade de frames por fps.
+
+        Cada ramo gera os mesmos arquivos que ``extract_frames`` com aquele
+        fps; segmentos paralelos e modo esparso não se aplicam aqui."""
+        if len(outputs) == 1:
+            ((fps, out_dir),) = outputs.items()
+            return {
+                fps: self.extract_frames(
+                    input_path, out_dir, fps=fps, on_progress=on_progress, cancel=cancel
+                )
+            }
+        rates = list(outputs)
+        labels = "".join(f"[s{i}]" for i in range(len(rates)))
+        graph = ";".join(
+            [f"[0:v]split={len(rates)}{labels}"]
+            + [f"[s{i}]fps={fps}[o{i}]" for i, fps in enumerate(rates)]
+        )
+        cmd = [
+            self.ffmpeg_bin,
+            "-y",
+            "-hide_banner",
+            "-v",
+            "error",
+            "-i",
+            input_path,
+            "-filter_complex",
+            graph,
+        ]
+        for i, fps in enumerate(rates):
+            out_dir_p = Path(outputs[fps])
+            out_dir_p.mkdir(parents=True, exist_ok=True)
+            cmd += ["-map", f"[o{i}]", "-q:v", "2", str(out_dir_p / "%08d.jpg")]
+
+        # o frame= do -progress conta a primeira saída
+        tracker = self._tracker(input_path, None, on_progress)
+        with self._spawn(
+            [cmd], [subprocess.DEVNULL], tracker, rates[0], cancel
+        ) as procs:
+            while True:
+                try:
+                    procs[0].wait(timeout=1)
+                    break
+                except subprocess.TimeoutExpired:
+                    if tracker:
+                        tracker.report(on_progress)
+        if tracker:
+            tracker.report(on_progress)
+        return {fps: sum(1 for _ in Path(outputs[fps]).glob("*.jpg")) for fps in rates}
+
+    def extract_scenes(
+        self,
+        input_path: str,
+        out_dir: str,
+        threshold: float,
+        min_fps: Optional[float] = None,
+        max_fps: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> List[float]:
+        """Um frame por mudança de cena (``scene`` > ``threshold``), mais o
+        primeiro. ``max_fps`` impõe um intervalo mínimo entre frames e
+        ``min_fps`` força um frame quando a cena fica parada por mais de
+        1/min_fps segundos. Retorna o instante (s) de cada frame gravado."""
+        out_dir_p = Path(out_dir)
+        out_dir_p.mkdir(parents=True, exist_ok=True)
+        terms = ["isnan(prev_selected_t)"]
+        if min_fps:
+            terms.append(f"gte(t-prev_selected_t\\,{1 / min_fps:.6f})")
+        scene = f"gt(scene\\,{threshold:g})"
+        if max_fps:
+            scene += f"*gte(t-prev_selected_t\\,{1 / max_fps:.6f})"
+        terms.append(scene)
+        select = f"select='gt({'+'.join(terms)}\\,0)'"
+
+        with tempfile.TemporaryDirectory() as meta_dir:
+            meta_path = os.path.join(meta_dir, "scenes.txt")
+            cmd = [
+                self.ffmpeg_bin,
+                "-y",
+                "-hide_banner",
+                "-v",
+                "error",
+                "-i",
+                input_path,
+                "-vf",
+                f"{select},metadata=mode=print:file={meta_path}",
+                "-fps_mode",
+                "passthrough",
+                "-q:v",
+                "2",
+                str(out_dir_p / "%08d.jpg"),
+            ]
+            tracker = self._tracker(input_path, None, on_progress)
+            with self._spawn(
+                [cmd], [subprocess.DEVNULL], tracker, None, cancel
+            ) as procs:
+                while True:
+                    try:
+                        procs[0].wait(timeout=1)
+                        break
+                    except subprocess.TimeoutExpired:
+                        if tracker:
+                            tracker.report(on_progress)
+            if tracker:
+                tracker.update(0, tracker.total)
+                tracker.report(on_progress)
+            timestamps = []
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding="utf-8") as meta:
+                    for line in meta:
+                        if line.startswith("frame:"):
+                            _, _, pts_time = line.rpartition("pts_time:")
+                            timestamps.append(float(pts_time))
+        return timestamps
+
+    def tile_frames(
+        self,
+        frame_paths: List[str],
+        out_dir: str,
+        layout: SheetLayout,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """Filtro ``tile``: cada frame é reduzido (mantendo o aspecto, com
+        bordas) para a célula e os mosaicos saem em ``out_dir``. O último
+        mosaico pode vir incompleto. Os frames são ligados numa sequência
+        contínua porque a lista pode ter buracos (ex. frames descartados)."""
+        out_dir_p = Path(out_dir)
+        out_dir_p.mkdir(parents=True, exist_ok=True)
+        w, h = layout.tile_width, layout.tile_height
+        with tempfile.TemporaryDirectory() as seq_dir:
+            for n, path in enumerate(frame_paths, 1):
+                os.symlink(os.path.abspath(path), os.path.join(seq_dir, f"{n:08d}.jpg"))
+            cmd = [
+                self.ffmpeg_bin,
+                "-y",
+                "-hide_banner",
+                "-v",
+                "error",
+                "-framerate",
+                "1",
+                "-i",
+                os.path.join(seq_dir, "%08d.jpg"),
+                "-vf",
+                f"scale={w}:{h}:force_original_aspect_ratio=decrease,"
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+                f"tile={layout.columns}x{layout.rows}",
+                "-fps_mode",
+                "passthrough",
+                "-q:v",
+                "2",
+                str(out_dir_p / "sheet_%04d.jpg"),
+            ]
+            with self._spawn([cmd], [subprocess.DEVNULL], cancel=cancel):
+                pass
+        return sum(1 for _ in out_dir_p.glob("sheet_*.jpg"))
+
+    def iter_frames(
+        self,
+        input_path: str,
+        fps: int = 1,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[bytes]:
+        """Gera os frames JPEG direto do stdout do ffmpeg (image2pipe), sem
+        passar por arquivos temporários.
+
+        No modo paralelo o primeiro segmento é lido ao vivo e os demais são
+        acumulados em arquivos temporários e emitidos em ordem. O progresso
+        é repassado a ``on_progress`` entre um frame e outro, nesta thread."""
+        pipe_args = ["-f", "image2pipe", "-c:v", "mjpeg", "pipe:1"]
+        plan = self._plan(input_path, fps)
+        if plan is not None and plan[0] == "sparse":
+            _, probe, targets = plan
+            tracker = ProgressTracker(len(targets))
+            for count, (_, frame) in enumerate(
+                self._iter_sparse(input_path, targets, cancel), 1
+            ):
+                yield frame
+                tracker.update("sparse", count)
+                tracker.report(on_progress)
+            return
+
+        tracker = self._tracker(input_path, plan, on_progress)
+        if plan is None:
+            cmds = [self._serial_cmd(input_path, fps, pipe_args)]
+        else:
+            _, probe, segments = plan
+            cmds = [
+                self._segment_cmd(input_path, fps, probe, seg, pipe_args)
+                for seg in segments
+            ]
+
+        def _reporting(frames: Iterator[bytes]) -> Iterator[bytes]:
+            for frame in frames:
+                yield frame
+                if tracker:
+                    tracker.report(on_progress)
+
+        spools = [tempfile.TemporaryFile() for _ in cmds[1:]]
+        stream_error = None
+        try:
+            with self._spawn(
+                cmds, [subprocess.PIPE, *spools], tracker, fps, cancel
+            ) as procs:
+                try:
+                    yield from _reporting(iter_jpeg_frames(procs[0].stdout))
+                    for proc, spool in zip(procs[1:], spools):
+                        if proc.wait() != 0:
+                            break
+                        spool.seek(0)
+                        yield from _reporting(iter_jpeg_frames(spool))
+                except ValueError as e:
+                    # stream cortado: o motivo real vem do returncode/stderr
+                    stream_error = e
+        finally:
+            for spool in spools:
+                spool.close()
+        if stream_error is not None:
+            raise RuntimeError(str(stream_error)) from stream_error
+
+    def _serial_cmd(
+        self, input_path: str, fps: int, output_args: List[str]
+    ) -> List[str]:
+        return [
+            self.ffmpeg_bin,
+            "-hide_banner",
+            "-v",
+            "error",
+            "-i",
+            input_path,
+            "-vf",
+            f"fps={fps}",
+            "-q:v",
+            "2",
+            *output_args,
+        ]
+
+    def duration(self, input_path: str) -> float:
+        """Duração do container em segundos (ffprobe, só o cabeçalho)."""
+        cmd = [
+            self.ffprobe_bin,
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            input_path,
+        ]
+        try:
+            res = subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=self.timeout_sec,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(e.stderr.strip() or "ffprobe failed") from e
+        except subprocess.TimeoutExpired as e:
+            raise RuntimeError(f"ffprobe timeout após {self.timeout_sec}s") from e
+        return float(res.stdout.strip())
+
+    def _tracker(
+        self,
+        input_path: str,
+        plan: Optional[Tuple[str, VideoProbe, list]],
+        on_progress: Optional[ProgressCallback],
+    ) -> Optional[ProgressTracker]:
+        if on_progress is None:
+            return None
+        if plan is not None:
+            return ProgressTracker(plan[1].duration_sec)
+        try:
+            return ProgressTracker(self.duration(input_path))
+        except (OSError, RuntimeError, ValueError) as e:
+            logger.warning("sem duração para o progresso: %s", e)
+            return None
+
+    def probe(self, input_path: str) -> VideoProbe:
+        """Lê time base, start_time e os pts dos keyframes do primeiro stream
+        de vídeo (só demux, sem decodificar)."""
+        cmd = [
+            self.ffprobe_bin,
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-show_entries",
+            "stream=time_base:format=start_time:packet=pts,duration,flags",
+            "-of",
+            "json",
+            input_path,
+        ]
+        try:
+            res = subprocess.run(
+                cmd,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=self.timeout_sec,
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(e.stderr.strip() or "ffprobe failed") from e
+        except subprocess.TimeoutExpired as e:
+            raise RuntimeError(f"ffprobe timeout após {self.timeout_sec}s") from e
+
+        data = json.loads(res.stdout)
+        time_base = Fraction(data["streams"][0]["time_base"])
+        start = data.get("format", {}).get("start_time")
+        start_us = int(Fraction(start) * 1_000_000) if start else 0
+        pts = []
+        keyframes = []
+        end_pts = None
+        for packet in data.get("packets", []):
+            if "pts" not in packet:
+                continue
+            pts.append(packet["pts"])
+            if "K" in packet.get("flags", ""):
+                keyframes.append(packet["pts"])
+            end = packet["pts"] + packet.get("duration", 0)
+            end_pts = end if end_pts is None else max(end_pts, end)
+        if not pts:
+            raise RuntimeError("No video packets")
+        pts.sort()
+        return VideoProbe(
+            time_base=time_base,
+            ts_offset=-rescale_us(start_us, time_base),
+            start_us=start_us,
+            first_pts=pts[0],
+            last_pts=pts[-1],
+            keyframes=keyframes,
+            frame_pts=pts,
+            end_pts=end_pts,
+        )
+
+    def _plan(
+        self, input_path: str, fps: int
+    ) -> Optional[Tuple[str, VideoProbe, List[Segment]]]:
+        """Escolhe a estratégia: ("sparse", ...), ("segments", ...) ou None
+        para o ffmpeg serial de sempre."""
+        if self.workers <= 1 and not self.sparse:
+            return None
+        try:
+            probe = self.probe(input_path)
+        except (OSError, RuntimeError, ValueError, KeyError) as e:
+            logger.warning("ffprobe falhou, extraindo em série: %s", e)
+            return None
+        if self.sparse:
+            targets = plan_sparse(probe, fps, self.seek_overhead)
+            if targets is not None:
+                logger.info(
+                    "Extraindo %s por seek (%d frames)", input_path, len(targets)
+                )
+                return "sparse", probe, targets
+        if self.workers <= 1:
+            return None
+        segments = plan_segments(probe, fps, self.workers, self.min_segment_sec)
+        if len(segments) < 2:
+            return None
+        logger.info("Extraindo %s em %d segmentos", input_path, len(segments))
+        return "segments", probe, segments
+
+    def _segment_cmd(
+        self,
+        input_path: str,
+        fps: int,
+        probe: VideoProbe,
+        seg: Segment,
+        output_args: List[str],
+    ) -> List[str]:
+        # -copyts + setpts reproduzem a linha do tempo do modo serial, para
+        # que o fps arredonde os mesmos pts; trim corta no slot do próximo
+        # segmento e passthrough impede o ffmpeg de preencher o início.
+        cmd = [self.ffmpeg_bin, "-y", "-hide_banner", "-v", "error"]
+        if seg.seek_us is not None:
+            cmd += ["-ss", _format_us(seg.seek_us)]
+        vf = f"setpts=PTS{probe.ts_offset:+d},fps={fps}"
+        if seg.end_slot is not None:
+            vf += f",trim=end_pts={seg.end_slot}"
+        return [
+            *cmd,
+            "-copyts",
+            "-i",
+            input_path,
+            "-vf",
+            vf,
+            "-fps_mode",
+            "passthrough",
+            "-q:v",
+            "2",
+            *output_args,
+        ]
+
+    def _frame_cmd(self, input_path: str, target: FrameTarget) -> List[str]:
+        # com -copyts o trim compara o pts bruto: o primeiro frame que passa
+        # é exatamente o alvo, e -frames:v 1 encerra a decodificação ali
+        cmd = [self.ffmpeg_bin, "-hide_banner", "-v", "error"]
+        if target.seek_us is not None:
+            cmd += ["-ss", _format_us(target.seek_us)]
+        return [
+            *cmd,
+            "-copyts",
+            "-i",
+            input_path,
+            "-vf",
+            f"trim=start_pts={target.pts}",
+            "-frames:v",
+            "1",
+            "-q:v",
+            "2",
+            "-f",
+            "image2pipe",
+            "-c:v",
+            "mjpeg",
+            "pipe:1",
+        ]
+
+    def _iter_sparse(
+        self,
+        input_path: str,
+        targets: List[FrameTarget],
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[Tuple[int, bytes]]:
+        """Um ffmpeg curto por frame, no máximo ``workers`` ao mesmo
+        tempo, emitidos em ordem como (número, jpeg). O cancelamento é
+        verificado entre um frame e outro."""
+        deadline = time.monotonic() + self.timeout_sec
+        pending = deque()
+        queue = iter(targets)
+
+        def _start(target: FrameTarget):
+            cmd = self._frame_cmd(input_path, target)
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            pending.append((target, proc))
+
+        try:
+            for target in queue:
+                _start(target)
+                if len(pending) >= max(1, self.workers):
+                    break
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    raise JobCancelled()
+                target, proc = pending.popleft()
+                try:
+                    out, err = proc.communicate(
+                        timeout=max(0, deadline - time.monotonic())
+                    )
+                except subprocess.TimeoutExpired as e:
+                    raise RuntimeError(
+                        f"ffmpeg timeout após {self.timeout_sec}s"
+                    ) from e
+                if proc.returncode != 0:
+                    msg = err.decode("utf-8", errors="replace").strip()
+                    raise RuntimeError(msg or "ffmpeg failed")
+                nxt = next(queue, None)
+                if nxt is not None:
+                    _start(nxt)
+                if out:
+                    yield target.number, out
+        finally:
+            for _, proc in pending:
+                if proc.poll() is None:
+                    proc.kill()
+                proc.communicate()
+
+    @contextmanager
+    def _spawn(
+        self,
+        cmds: List[List[str]],
+        stdouts: list,
+        tracker: Optional[ProgressTracker] = None,
+        fps: Optional[float] = 1,
+        cancel: Optional[threading.Event] = None,
+    ):
+        """Roda os comandos em paralelo sob um único timeout; ao sair espera
+        todos e converte falhas em RuntimeError. Com ``tracker`` cada ffmpeg
+        ganha um ``-progress pipe:N`` lido por uma thread; com ``cancel`` uma
+        thread mata todos assim que o evento é setado (JobCancelled)."""
+        stderrs = [tempfile.TemporaryFile() for _ in cmds]
+        procs = []
+        readers = []
+        timed_out = threading.Event()
+        finished = threading.Event()
+        watcher = None
+
+        def _kill_all():
+            for proc in procs:
+                if proc.poll() is None:
+                    proc.kill()
+
+        def _on_timeout():
+            timed_out.set()
+            _kill_all()
+
+        def _watch_cancel():
+            while not finished.is_set():
+                if cancel.wait(0.2):
+                    _kill_all()
+                    return
+
+        timer = threading.Timer(self.timeout_sec, _on_timeout)
+        try:
+            for i, (cmd, stdout, stderr) in enumerate(zip(cmds, stdouts, stderrs)):
+                if tracker is None:
+                    procs.append(
+                        subprocess.Popen(
+                            cmd, stdin=subprocess.DEVNULL, stdout=stdout, stderr=stderr
+                        )
+                    )
+                    continue
+                read_fd, write_fd = os.pipe()
+                try:
+                    procs.append(
+                        subprocess.Popen(
+                            [cmd[0], "-progress", f"pipe:{write_fd}", *cmd[1:]],
+                            stdin=subprocess.DEVNULL,
+                            stdout=stdout,
+                            stderr=stderr,
+                            pass_fds=(write_fd,),
+                        )
+                    )
+                except BaseException:
+                    os.close(read_fd)
+                    raise
+                finally:
+                    os.close(write_fd)
+                readers.append(start_reader(read_fd, tracker, i, fps))
+            timer.start()
+            if cancel is not None:
+                watcher = threading.Thread(target=_watch_cancel, daemon=True)
+                watcher.start()
+            yield procs
+            for proc in procs:
+                proc.wait()
+
+            if cancel is not None and cancel.is_set():
+                raise JobCancelled()
+            if timed_out.is_set():
+                raise RuntimeError(f"ffmpeg timeout após {self.timeout_sec}s")
+            for proc, stderr in zip(procs, stderrs):
+                if proc.returncode != 0:
+                    stderr.seek(0)
+                    msg = stderr.read().decode("utf-8", errors="replace").strip()
+                    raise RuntimeError(msg or "ffmpeg failed")
+        finally:
+            timer.cancel()
+            finished.set()
+            if watcher is not None:
+                watcher.join()
+            _kill_all()
+            for proc in procs:
+                proc.wait()
+                if proc.stdout is not None:
+                    proc.stdout.close()
+            for reader in readers:
+                reader.join()
+            for stderr in stderrs:
+                stderr.close()
@@ -0,0 +1,95 @@
+from typing import BinaryIO, Iterator
+
+_SOI = b"\xff\xd8"
+_EOI = 0xD9
+_SOS = 0xDA
+# marcadores sem campo de tamanho (RSTn e TEM)
+_STANDALONE = {0x01, *range(0xD0, 0xD8)}
+
+
+class JPEGStreamSplitter:
+    """Separa um stream MJPEG (image2pipe) em JPEGs individuais.
+
+    Percorre os segmentos pelo campo de tamanho e, dentro dos dados entrópicos
+    do scan, ignora `FF00` (byte stuffing) e os RSTn; assim um `FFD9` dentro de
+    um segmento (ex.: thumbnail EXIF) não corta o frame no lugar errado.
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+        self._pos = 0
+        self._in_scan = False
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self._buf += data
+        frames = []
+        while (end := self._scan()) is not None:
+            frames.append(bytes(self._buf[:end]))
+            del self._buf[:end]
+            self._pos = 0
+            self._in_scan = False
+        return frames
+
+    @property
+    def pending(self) -> int:
+        return len(self._buf)
+
+    def _scan(self):
+        buf = self._buf
+        if self._pos == 0:
+            if len(buf) < 2:
+                return None
+            if buf[:2] != _SOI:
+                raise ValueError("Stream MJPEG inválido: frame sem SOI")
+            self._pos = 2
+
+        while True:
+            if self._in_scan:
+                idx = buf.find(b"\xff", self._pos)
+                if idx == -1:
+                    self._pos = len(buf)
+                    return None
+                if idx + 1 >= len(buf):
+                    self._pos = idx
+                    return None
+                nxt = buf[idx + 1]
+                if nxt == 0x00 or 0xD0 <= nxt <= 0xD7:
+                    self._pos = idx + 2
+                    continue
+                if nxt == 0xFF:
+                    self._pos = idx + 1
+                    continue
+                self._in_scan = False
+                self._pos = idx
+                continue
+
+            pos = self._pos
+            if pos + 2 > len(buf):
+                return None
+            if buf[pos] != 0xFF:
+                raise ValueError("Stream MJPEG inválido: marcador esperado")
+            marker = buf[pos + 1]
+            if marker == 0xFF:
+                self._pos = pos + 1
+                continue
+            if marker == _EOI:
+                return pos + 2
+            if marker in _STANDALONE:
+                self._pos = pos + 2
+                continue
+            if pos + 4 > len(buf):
+                return None
+            length = (buf[pos + 2] << 8) | buf[pos + 3]
+            if pos + 2 + length > len(buf):
+                return None
+            self._pos = pos + 2 + length
+            if marker == _SOS:
+                self._in_scan = True
+
+
+def iter_jpeg_frames(stream: BinaryIO, read_size: int = 256 * 1024) -> Iterator[bytes]:
+    splitter = JPEGStreamSplitter()
+    while data := stream.read(read_size):
+        yield from splitter.feed(data)
+    if splitter.pending:
+        raise ValueError("Stream MJPEG truncado")
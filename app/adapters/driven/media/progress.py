@@ -0,0 +1,74 @@
+"""Progresso do ffmpeg via ``-progress pipe:N``.
+
+Cada processo escreve blocos ``chave=valor`` num pipe próprio; uma thread por
+pipe atualiza o :class:`ProgressTracker`, e quem chamou o processador lê o
+estado agregado na sua própria thread (ver ``report``).
+"""
+
+import threading
+import time
+from typing import Callable, Dict, IO, Hashable, Optional, Tuple
+
+from app.domain.ports.video_processor import ProgressCallback
+
+
+class ProgressTracker:
+    """Soma o trabalho feito por uma ou mais fontes e calcula % e ETA."""
+
+    def __init__(self, total: float, clock: Callable[[], float] = time.monotonic):
+        self.total = total
+        self._clock = clock
+        self._started = clock()
+        self._done: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self._reported: Optional[float] = None
+
+    def update(self, key: Hashable, done: float) -> None:
+        with self._lock:
+            self._done[key] = max(0.0, done)
+
+    def snapshot(self) -> Tuple[float, Optional[float]]:
+        """(percentual 0-100, ETA em segundos ou None enquanto não há base)."""
+        with self._lock:
+            done = sum(self._done.values())
+        fraction = min(1.0, done / self.total) if self.total > 0 else 0.0
+        if fraction <= 0:
+            return 0.0, None
+        elapsed = self._clock() - self._started
+        return fraction * 100, elapsed * (1 - fraction) / fraction
+
+    def report(self, callback: Optional[ProgressCallback]) -> None:
+        """Chama ``callback`` se o percentual mudou desde o último report."""
+        if callback is None:
+            return
+        percent, eta = self.snapshot()
+        if percent != self._reported:
+            self._reported = percent
+            callback(percent, eta)
+
+
+def read_progress(
+    stream: IO[str], tracker: ProgressTracker, key: Hashable, fps: Optional[float]
+) -> None:
+    """Consome a saída de ``-progress`` até EOF, convertendo os frames já
+    emitidos em segundos de vídeo. ``out_time`` não serve: com -copyts ele
+    não corresponde ao trecho processado do segmento. Sem ``fps`` (saída de
+    taxa variável, ex. modo cena) usa ``out_time_us``, válido sem -copyts."""
+    for line in stream:
+        name, _, value = line.strip().partition("=")
+        if fps and name == "frame" and value.isdigit():
+            tracker.update(key, int(value) / fps)
+        elif not fps and name == "out_time_us" and value.isdigit():
+            tracker.update(key, int(value) / 1_000_000)
+
+
+def start_reader(
+    fd: int, tracker: ProgressTracker, key: Hashable, fps: Optional[float]
+) -> threading.Thread:
+    def _run():
+        with open(fd, "r", encoding="utf-8", errors="replace") as stream:
+            read_progress(stream, tracker, key, fps)
+
+    thread = threading.Thread(target=_run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,160 @@
+"""Planejamento da extração de frames: segmentos paralelos e modo esparso.
+
+O filtro ``fps`` do ffmpeg atribui a cada frame de entrada o slot
+``round(pts * fps)`` (AV_ROUND_NEAR_INF) e emite, para cada slot ``n``, o último
+frame com slot <= n. Cortando o vídeo em keyframes e dando a cada segmento o
+intervalo de slots ``[n_i, n_{i+1})`` (com ``n_i`` = slot do keyframe), cada
+segmento emite exatamente os mesmos frames que a execução serial. O primeiro
+slot vem do próprio keyframe (primeiro frame após o seek); a opção
+``start_time`` do fps não serve porque arredonda relativo a ela mesma.
+
+No modo esparso o slot de cada frame já é conhecido pelo probe, então cada
+frame de saída vira um seek até o keyframe anterior e a decodificação para no
+pts escolhido, sem precisar do filtro fps.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from fractions import Fraction
+import math
+from typing import List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class VideoProbe:
+    time_base: Fraction
+    # deslocamento (em time_base) que o ffmpeg aplica sem -copyts: -start_time do arquivo
+    ts_offset: int
+    # start_time do arquivo em microssegundos (base do -ss)
+    start_us: int
+    first_pts: int
+    last_pts: int
+    keyframes: Sequence[int]
+    # pts de todos os frames, ordenados (modo esparso)
+    frame_pts: Sequence[int] = ()
+    # fim do último frame (pts + duração); é o pts de EOF que o fps enxerga
+    end_pts: Optional[int] = None
+
+    @property
+    def duration_sec(self) -> float:
+        end = self.last_pts if self.end_pts is None else self.end_pts
+        return float((end + self.ts_offset) * self.time_base)
+
+
+@dataclass(frozen=True)
+class Segment:
+    # posição do -ss em microssegundos desde o início do arquivo; None = sem seek
+    seek_us: Optional[int]
+    # slot final exclusivo; None = até o fim do vídeo
+    end_slot: Optional[int]
+    # número (1-based) do primeiro frame deste segmento na sequência final
+    first_number: int
+
+
+@dataclass(frozen=True)
+class FrameTarget:
+    # -ss até o keyframe que antecede o frame; None = desde o início
+    seek_us: Optional[int]
+    # pts (bruto, em time_base) do frame que o fps escolheria para o slot
+    pts: int
+    number: int
+
+
+def _round_near_inf(x: Fraction) -> int:
+    if x >= 0:
+        return math.floor(x + Fraction(1, 2))
+    return math.ceil(x - Fraction(1, 2))
+
+
+def rescale_us(start_us: int, time_base: Fraction) -> int:
+    """Equivalente a av_rescale_q(start_us, 1/1000000, time_base)."""
+    return _round_near_inf(Fraction(start_us, 1_000_000) / time_base)
+
+
+def frame_slot(probe: VideoProbe, pts: int, fps: int) -> int:
+    # aritmética inteira: chamado para cada frame no modo esparso
+    num = (pts + probe.ts_offset) * probe.time_base.numerator * fps
+    den = probe.time_base.denominator
+    if num >= 0:
+        return (2 * num + den) // (2 * den)
+    return -((-2 * num + den) // (2 * den))
+
+
+def _seek_us(probe: VideoProbe, keyframe_pts: int) -> int:
+    # floor garante que o -ss nunca passa do keyframe
+    return max(
+        0,
+        math.floor(keyframe_pts * probe.time_base * 1_000_000) - probe.start_us,
+    )
+
+
+def plan_segments(
+    probe: VideoProbe, fps: int, workers: int, min_segment_sec: float = 0
+) -> List[Segment]:
+    """Divide o vídeo em até ``workers`` segmentos começando em keyframes.
+
+    Retorna uma lista com um único segmento (equivalente ao serial) quando o
+    vídeo é curto demais ou não há keyframes utilizáveis."""
+    first_slot = frame_slot(probe, probe.first_pts, fps)
+    last_slot = frame_slot(probe, probe.last_pts, fps)
+    span = last_slot - first_slot
+
+    if min_segment_sec > 0:
+        workers = min(workers, int(span / (fps * min_segment_sec)) or 1)
+
+    # keyframe mais cedo de cada slot
+    by_slot = {}
+    for pts in sorted(probe.keyframes):
+        by_slot.setdefault(frame_slot(probe, pts, fps), pts)
+    candidates = sorted(s for s in by_slot if first_slot < s <= last_slot)
+
+    boundaries: List[int] = []
+    for i in range(1, workers):
+        if not candidates:
+            break
+        target = first_slot + span * i / workers
+        best = min(candidates, key=lambda s: abs(s - target))
+        if not boundaries or best > boundaries[-1]:
+            boundaries.append(best)
+
+    segments = [Segment(None, boundaries[0] if boundaries else None, 1)]
+    for i, start in enumerate(boundaries):
+        end = boundaries[i + 1] if i + 1 < len(boundaries) else None
+        segments.append(
+            Segment(_seek_us(probe, by_slot[start]), end, start - first_slot + 1)
+        )
+    return segments
+
+
+def plan_sparse(
+    probe: VideoProbe, fps: int, seek_overhead: float
+) -> Optional[List[FrameTarget]]:
+    """Um alvo por slot de saída, ou None se decodificar tudo sai mais barato.
+
+    Custo em frames decodificados: o modo completo decodifica todos; cada
+    alvo do modo esparso decodifica do seu keyframe até o frame escolhido,
+    mais ``seek_overhead`` (processo + seek) por alvo."""
+    frames = probe.frame_pts
+    if not frames or probe.end_pts is None:
+        return None
+    slots = [frame_slot(probe, pts, fps) for pts in frames]
+    keys = set(probe.keyframes)
+    key_idx = [i for i, pts in enumerate(frames) if pts in keys]
+    if not key_idx or key_idx[0] != 0:
+        return None
+
+    first_slot = slots[0]
+    end_slot = frame_slot(probe, probe.end_pts, fps)
+    budget = len(frames)
+    cost = 0.0
+    targets = []
+    for n in range(first_slot, end_slot):
+        # frame que o fps emite no slot n: o último com slot <= n
+        i = bisect_right(slots, n) - 1
+        k = key_idx[bisect_right(key_idx, i) - 1]
+        cost += i - k + 1 + seek_overhead
+        if cost >= budget:
+            return None
+        seek_us = None if k == 0 else _seek_us(probe, frames[k])
+        targets.append(FrameTarget(seek_us, frames[i], n - first_slot + 1))
+    return targets
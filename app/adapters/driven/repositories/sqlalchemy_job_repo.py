@@ -1,10 +1,10 @@
-from typing import Optional, Iterable
+from typing import List, Optional, Iterable
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import or_, select, update
 
-from app.domain.entities import VideoJob
+from app.domain.entities import JobStatus, VideoJob
 from app.domain.ports.repository import JobRepositoryPort
-from app.adapters.driven.db.models import JobModel
+from app.adapters.driven.db.models import JobModel, VideoModel
 
 
 class SQLAlchemyJobRepository(JobRepositoryPort):
@@ -18,15 +18,66 @@ class SQLAlchemyJobRepository(JobRepositoryPort):
         row = self.session.get(JobModel, job_id)
         return row.to_entity() if row else None
 
-    def update(self, j: VideoJob) -> None:
-        db_obj = self.session.get(JobModel, j.id)
-        if not db_obj:
-            return
-        db_obj.status = j.status
-        db_obj.fps = j.fps
-        db_obj.frame_count = j.frame_count
-        db_obj.artifact_ref = j.artifact_ref
-        db_obj.error = j.error
+    def update(self, j: VideoJob) -> bool:
+        stmt = update(JobModel).where(JobModel.id == j.id)
+        if j.status != JobStatus.CANCELLED:
+            # UPDATE condicional: um DELETE aceito no meio do caminho vence
+            stmt = stmt.where(JobModel.status != JobStatus.CANCELLED)
+        res = self.session.execute(
+            stmt.values(
+                status=j.status,
+                fps=j.fps,
+                frame_count=j.frame_count,
+                dropped_frames=j.dropped_frames,
+                artifact_ref=j.artifact_ref,
+                error=j.error,
+                progress=j.progress,
+                eta_seconds=j.eta_seconds,
+            )
+        )
+        return res.rowcount == 1
+
+    def update_progress(
+        self, job_id: str, progress: float, eta_seconds: Optional[float]
+    ) -> None:
+        # só as colunas de progresso: não pode sobrescrever um cancelamento
+        self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id)
+            .values(progress=progress, eta_seconds=eta_seconds)
+        )
+
+    def claim(self, job_id: str) -> bool:
+        # UPDATE condicional: só um worker vê rowcount 1
+        res = self.session.execute(
+            update(JobModel)
+            .where(JobModel.id == job_id, JobModel.status == JobStatus.QUEUED)
+            .values(status=JobStatus.RUNNING)
+        )
+        return res.rowcount == 1
+
+    def list_queued_siblings(
+        self, job_id: str, video_id: str, content_hash: Optional[str], limit: int
+    ) -> List[VideoJob]:
+        same_input = JobModel.video_id == video_id
+        if content_hash:
+            same_input = or_(
+                same_input,
+                JobModel.video_id.in_(
+                    select(VideoModel.id).where(VideoModel.content_hash == content_hash)
+                ),
+            )
+        rows = self.session.scalars(
+            select(JobModel)
+            .where(
+                JobModel.status == JobStatus.QUEUED,
+                JobModel.id != job_id,
+                same_input,
+            )
+            .order_by(JobModel.created_at)
+            .limit(limit)
+        )
+        return [r.to_entity() for r in rows]
 
     def list_by_user(self, user_id: str) -> Iterable[VideoJob]:
         rows = self.session.scalars(
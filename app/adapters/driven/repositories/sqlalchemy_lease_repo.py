@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.domain.entities import WorkLease
+from app.domain.ports.repository import LeaseRepositoryPort
+from app.adapters.driven.db.models import LeaseModel
+
+
+class SQLAlchemyLeaseRepository(LeaseRepositoryPort):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get(self, key: str) -> Optional[WorkLease]:
+        row = self.session.get(LeaseModel, key, populate_existing=True)
+        return row.to_entity() if row else None
+
+    def _insert(self, key: str, holder: str, expires_at: datetime) -> bool:
+        values = dict(work_key=key, holder=holder, expires_at=expires_at)
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            res = self.session.execute(
+                dialect_insert(LeaseModel)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=["work_key"])
+            )
+            return res.rowcount == 1
+        try:
+            with self.session.begin_nested():
+                self.session.execute(insert(LeaseModel).values(**values))
+        except IntegrityError:
+            return False
+        return True
+
+    def acquire(self, key: str, holder: str, ttl: float) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=ttl)
+        if self._insert(key, holder, expires_at):
+            return True
+        # a chave existe: só é tomada se expirou (worker morto) ou já é nossa
+        res = self.session.execute(
+            update(LeaseModel)
+            .where(
+                LeaseModel.work_key == key,
+                or_(LeaseModel.expires_at <= now, LeaseModel.holder == holder),
+            )
+            .values(holder=holder, expires_at=expires_at)
+        )
+        return res.rowcount == 1
+
+    def renew(self, key: str, holder: str, ttl: float) -> bool:
+        res = self.session.execute(
+            update(LeaseModel)
+            .where(LeaseModel.work_key == key, LeaseModel.holder == holder)
+            .values(expires_at=datetime.utcnow() + timedelta(seconds=ttl))
+        )
+        return res.rowcount == 1
+
+    def release(self, key: str, holder: str) -> None:
+        self.session.execute(
+            delete(LeaseModel).where(
+                LeaseModel.work_key == key, LeaseModel.holder == holder
+            )
+        )
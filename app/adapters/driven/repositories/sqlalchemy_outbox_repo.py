@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, update
+
+from app.domain.entities import OutboxMessage
+from app.domain.ports.repository import OutboxRepositoryPort
+from app.adapters.driven.db.models import OutboxModel
+
+
+class SQLAlchemyOutboxRepository(OutboxRepositoryPort):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, message: OutboxMessage) -> None:
+        self.session.add(OutboxModel.from_entity(message))
+
+    def claim(self, topic: str, limit: int, lease: float) -> List[OutboxMessage]:
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=lease)
+        query = (
+            select(OutboxModel)
+            .where(OutboxModel.topic == topic, OutboxModel.available_at <= now)
+            .order_by(OutboxModel.id)
+            .limit(limit)
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            # relays concorrentes pegam lotes disjuntos sem esperar um pelo outro
+            query = query.with_for_update(skip_locked=True)
+        candidates = [row.to_entity() for row in self.session.scalars(query)]
+        claimed = []
+        for message in candidates:
+            # sem SKIP LOCKED (sqlite) a troca condicional decide quem levou a linha
+            res = self.session.execute(
+                update(OutboxModel)
+                .where(
+                    OutboxModel.id == message.id,
+                    OutboxModel.available_at == message.available_at,
+                )
+                .values(available_at=until)
+            )
+            if res.rowcount == 1:
+                message.available_at = until
+                claimed.append(message)
+        return claimed
+
+    def delete(self, ids: List[int]) -> None:
+        if ids:
+            self.session.execute(delete(OutboxModel).where(OutboxModel.id.in_(ids)))
+
+    def reschedule(
+        self, message_id: int, attempts: int, available_at: datetime, error: str
+    ) -> None:
+        self.session.execute(
+            update(OutboxModel)
+            .where(OutboxModel.id == message_id)
+            .values(attempts=attempts, available_at=available_at, last_error=error)
+        )
@@ -0,0 +1,104 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple
+from app.domain.ports.artifact_cache import ArtifactCachePort
+
+logger = logging.getLogger(__name__)
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    # hardlink: a entrada do cache e o artefato do job compartilham o inode,
+    # então despejar do cache nunca quebra um download existente
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+class LocalArtifactCache(ArtifactCachePort):
+    """Cache LRU de artefatos em disco, limitado a `max_bytes`.
+
+    Cada entrada é `<key>.art` + `<key>.json`; o mtime do `.art` marca o último
+    acesso e a evicção remove primeiro as entradas mais antigas.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.art", f"{base}.json"
+
+    def fetch(self, key: str, dest_path: str) -> Optional[Tuple[int, int]]:
+        art, meta = self._paths(key)
+        try:
+            with open(meta) as f:
+                data = json.load(f)
+            # entradas sem dropped_frames são de antes da contagem: viram miss
+            counts = data["frame_count"], data["dropped_frames"]
+            _link_or_copy(art, dest_path)
+            os.utime(art)
+        except (FileNotFoundError, ValueError, KeyError):
+            self.misses += 1
+            logger.info("artifact cache miss key=%s %s", key, self.stats())
+            return None
+        self.hits += 1
+        logger.info("artifact cache hit key=%s %s", key, self.stats())
+        return counts
+
+    def put(
+        self, key: str, artifact_path: str, frame_count: int, dropped_frames: int = 0
+    ) -> None:
+        art, meta = self._paths(key)
+        tmp_dir = tempfile.mkdtemp(prefix=".put_", dir=self.cache_dir)
+        try:
+            tmp_art = os.path.join(tmp_dir, "art")
+            tmp_meta = os.path.join(tmp_dir, "meta")
+            _link_or_copy(artifact_path, tmp_art)
+            with open(tmp_meta, "w") as f:
+                json.dump(
+                    {"frame_count": frame_count, "dropped_frames": dropped_frames}, f
+                )
+            # .art antes do .json: fetch só enxerga a entrada quando está completa
+            os.replace(tmp_art, art)
+            os.replace(tmp_meta, meta)
+            os.utime(art)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if not e.name.endswith(".art"):
+                    continue
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, e.name[: -len(".art")]))
+                total += st.st_size
+
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key)[::-1]:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -1,17 +1,56 @@
+import fcntl
+import hashlib
+import json
 import os
 import shutil
 import tempfile
-from typing import BinaryIO
-from app.domain.ports.storage import StoragePort
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import BinaryIO, Iterator, Optional
+from uuid import uuid4
+from app.domain.entities import UploadSession
+from app.domain.ports.storage import (
+    StoragePort,
+    ChunkedUploadPort,
+    StoredObject,
+    StoredUpload,
+    UPLOAD_CHUNK_SIZE,
+)
 
+# áreas endereçáveis por ref; o ref é "<área>/<id>", independente do base_dir
+AREAS = ("uploads", "outputs")
 
-class LocalStorage(StoragePort):
-    def __init__(self, base_dir: str):
+
+def shard_path(root: str, item_id: str) -> str:
+    """``root/ab/cd/<id>``, com ab/cd tirados do sha256 do id: 65536 diretórios
+    folha mantêm cada um pequeno mesmo com milhões de arquivos."""
+    digest = hashlib.sha256(item_id.encode("utf-8")).hexdigest()
+    return os.path.join(root, digest[:2], digest[2:4], item_id)
+
+
+def _valid_id(item_id: str) -> bool:
+    return bool(item_id) and item_id not in (".", "..") and "/" not in item_id
+
+
+class LocalStorage(StoragePort, ChunkedUploadPort):
+    def __init__(
+        self,
+        base_dir: str,
+        *,
+        session_ttl: float = 24 * 3600,
+        max_sessions_per_user: int = 4,
+    ):
         self.base_dir = base_dir
+        # cada sessão pré-aloca o arquivo inteiro: sessões abandonadas expiram
+        # e cada usuário tem um teto de sessões abertas
+        self.session_ttl = session_ttl
+        self.max_sessions_per_user = max_sessions_per_user
         os.makedirs(self.base_dir, exist_ok=True)
         os.makedirs(self.uploads_dir, exist_ok=True)
         os.makedirs(self.outputs_dir, exist_ok=True)
         os.makedirs(self.temp_dir_root, exist_ok=True)
+        os.makedirs(self.sessions_dir, exist_ok=True)
 
     @property
     def uploads_dir(self) -> str:
@@ -25,19 +64,303 @@ class LocalStorage(StoragePort):
     def temp_dir_root(self) -> str:
         return os.path.join(self.base_dir, "temp")
 
-    def save_upload(self, file_stream: BinaryIO, filename: str) -> str:
-        path = os.path.join(self.uploads_dir, filename)
-        with open(path, "wb") as f:
-            shutil.copyfileobj(file_stream, f)
-        return path
+    @property
+    def sessions_dir(self) -> str:
+        # mesmo filesystem dos uploads: finalizar a sessão é só um rename
+        return os.path.join(self.uploads_dir, "sessions")
+
+    def _area_dir(self, area: str) -> str:
+        return os.path.join(self.base_dir, area)
+
+    def _blob_path(self, content_hash: str) -> str:
+        return shard_path(self.uploads_dir, content_hash)
+
+    def _commit_blob(self, tmp_path: str, content_hash: str, size: int) -> StoredUpload:
+        # sem contagem de referências: nenhum fluxo apaga blobs, então um blob
+        # compartilhado nunca some debaixo de outro vídeo
+        path = self._blob_path(content_hash)
+        ref = f"uploads/{content_hash}"
+        if os.path.exists(path):
+            # conteúdo repetido: descarta a cópia nova, o blob existente é reaproveitado
+            os.remove(tmp_path)
+            return StoredUpload(ref, content_hash, size, reused=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+        return StoredUpload(ref, content_hash, size)
+
+    def save_upload(self, file_stream: BinaryIO, filename: str) -> StoredUpload:
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(prefix=".upload_", dir=self.uploads_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while chunk := file_stream.read(UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            return self._commit_blob(tmp_path, digest.hexdigest(), size)
+        except BaseException:
+            # não deixa arquivo parcial para trás se o cliente cair no meio
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
 
     def save_artifact(self, local_path: str) -> str:
-        dest = os.path.join(self.outputs_dir, os.path.basename(local_path))
+        name = os.path.basename(local_path)
+        dest = shard_path(self.outputs_dir, name)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
         shutil.move(local_path, dest)
-        return dest
+        return f"outputs/{name}"
 
     def make_temp_dir(self, prefix: str) -> str:
         return tempfile.mkdtemp(prefix=f"{prefix}_", dir=self.temp_dir_root)
 
+    @staticmethod
+    def _split_ref(ref: str) -> tuple[str, str]:
+        area, _, item_id = ref.partition("/")
+        if area not in AREAS or not _valid_id(item_id):
+            raise ValueError(f"Invalid storage ref: {ref}")
+        return area, item_id
+
+    @staticmethod
+    def _is_legacy(ref: str) -> bool:
+        """Ref antigo: o caminho do arquivo no layout plano, absoluto ou
+        relativo ao diretório de trabalho (o ``STORAGE_DIR`` padrão é
+        ``./data``, então ``./data/uploads/<nome>``)."""
+        if os.path.isabs(ref):
+            return True
+        area = os.path.basename(os.path.dirname(ref))
+        return (
+            "/" in os.path.dirname(ref)
+            and area in AREAS
+            and _valid_id(os.path.basename(ref))
+        )
+
     def resolve_path(self, ref: str) -> str:
-        return ref
+        """Caminho do arquivo de um ref ``<área>/<id>``.
+
+        Refs antigos (caminho do layout plano) continuam valendo: se o arquivo
+        já foi migrado, a área e o id saem do próprio caminho. Um relativo que
+        não existe a partir do diretório atual é procurado no ``base_dir``."""
+        if self._is_legacy(ref):
+            area = os.path.basename(os.path.dirname(ref))
+            if area not in AREAS or os.path.exists(ref):
+                return ref
+            name = os.path.basename(ref)
+            flat = os.path.join(self._area_dir(area), name)
+            if not os.path.isabs(ref) and os.path.exists(flat):
+                return flat
+            return shard_path(self._area_dir(area), name)
+        area, item_id = self._split_ref(ref)
+        return shard_path(self._area_dir(area), item_id)
+
+    def stat(self, ref: str) -> Optional[StoredObject]:
+        try:
+            st = os.stat(self.resolve_path(ref))
+        except FileNotFoundError:
+            return None
+        return StoredObject(st.st_size, st.st_mtime_ns)
+
+    def read_range(self, ref: str, start: int, end: int) -> Iterator[bytes]:
+        fd = os.open(self.resolve_path(ref), os.O_RDONLY)
+        try:
+            pos = start
+            while pos < end:
+                chunk = os.pread(fd, min(UPLOAD_CHUNK_SIZE, end - pos), pos)
+                if not chunk:
+                    raise ValueError("Stored object truncated")
+                pos += len(chunk)
+                yield chunk
+        finally:
+            os.close(fd)
+
+    def _session_path(self, upload_id: str, ext: str) -> str:
+        if not upload_id.isalnum():
+            raise KeyError("Upload session not found")
+        return os.path.join(self.sessions_dir, f"{upload_id}.{ext}")
+
+    @contextmanager
+    def _session_lock(self, upload_id: str, exclusive: bool) -> Iterator[int]:
+        """flock no ``.map`` (e devolve o fd dele): chunks compartilham o lock,
+        finalizar e expirar são exclusivos."""
+        try:
+            fd = os.open(self._session_path(upload_id, "map"), os.O_RDWR)
+        except FileNotFoundError:
+            raise KeyError("Upload session not found") from None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            # quem esperou o lock pode encontrar a sessão já finalizada
+            if not os.path.exists(self._session_path(upload_id, "json")):
+                raise KeyError("Upload session not found")
+            yield fd
+        finally:
+            os.close(fd)
+
+    def _remove_session(self, upload_id: str, exts=("json", "map", "part")) -> None:
+        # o .json primeiro: sem ele a sessão deixa de existir para os outros
+        for ext in exts:
+            try:
+                os.remove(self._session_path(upload_id, ext))
+            except FileNotFoundError:
+                pass
+
+    def expire_upload_sessions(self, now: Optional[float] = None) -> int:
+        """Remove sessões sem chunk novo há mais de ``session_ttl``; devolve
+        quantas. Sessões sendo finalizadas agora ficam para a próxima."""
+        now = time.time() if now is None else now
+        last_seen: dict[str, float] = {}
+        with os.scandir(self.sessions_dir) as it:
+            for entry in it:
+                upload_id, _, ext = entry.name.partition(".")
+                if ext not in ("json", "map", "part"):
+                    continue
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                last_seen[upload_id] = max(last_seen.get(upload_id, 0), mtime)
+
+        expired = 0
+        for upload_id, mtime in last_seen.items():
+            if now - mtime <= self.session_ttl:
+                continue
+            try:
+                fd = os.open(self._session_path(upload_id, "map"), os.O_RDWR)
+            except (FileNotFoundError, KeyError):
+                # sobra de uma criação interrompida
+                self._remove_session(upload_id)
+                expired += 1
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            try:
+                self._remove_session(upload_id)
+            finally:
+                os.close(fd)
+            expired += 1
+        return expired
+
+    def _open_sessions(self, user_id: str) -> int:
+        count = 0
+        with os.scandir(self.sessions_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    with open(entry.path) as f:
+                        count += json.load(f)["user_id"] == user_id
+                except (FileNotFoundError, ValueError, KeyError):
+                    continue
+        return count
+
+    def create_upload_session(
+        self,
+        *,
+        user_id: str,
+        filename: str,
+        size: int,
+        chunk_size: int,
+        content_hash: Optional[str] = None,
+    ) -> UploadSession:
+        self.expire_upload_sessions()
+        if self._open_sessions(user_id) >= self.max_sessions_per_user:
+            raise ValueError(
+                f"Too many open upload sessions (max {self.max_sessions_per_user})"
+            )
+        session = UploadSession(
+            id=uuid4().hex,
+            user_id=user_id,
+            filename=os.path.basename(filename),
+            size=size,
+            chunk_size=chunk_size,
+            content_hash=content_hash,
+        )
+        # o hash declarado só é conferido no fim: deduplicar por ele sem receber
+        # os bytes entregaria o vídeo de outro usuário a quem souber o hash
+        fd = os.open(self._session_path(session.id, "part"), os.O_CREAT | os.O_WRONLY)
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, size)
+            else:  # pragma: no cover
+                os.ftruncate(fd, size)
+        finally:
+            os.close(fd)
+
+        # um byte por chunk; cada PUT marca só o seu byte, sem corrida entre chunks
+        with open(self._session_path(session.id, "map"), "wb") as f:
+            f.write(b"\x00" * session.total_chunks)
+
+        meta = {
+            "user_id": session.user_id,
+            "filename": session.filename,
+            "size": session.size,
+            "chunk_size": session.chunk_size,
+            "content_hash": session.content_hash,
+            "created_at": session.created_at.isoformat(),
+        }
+        meta_path = self._session_path(session.id, "json")
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        return session
+
+    def get_upload_session(self, upload_id: str) -> Optional[UploadSession]:
+        try:
+            with open(self._session_path(upload_id, "json")) as f:
+                meta = json.load(f)
+            with open(self._session_path(upload_id, "map"), "rb") as f:
+                bitmap = f.read()
+        except (FileNotFoundError, KeyError):
+            return None
+        return UploadSession(
+            id=upload_id,
+            user_id=meta["user_id"],
+            filename=meta["filename"],
+            size=meta["size"],
+            chunk_size=meta["chunk_size"],
+            received_chunks=[i for i, b in enumerate(bitmap) if b],
+            content_hash=meta.get("content_hash"),
+            created_at=datetime.fromisoformat(meta["created_at"]),
+        )
+
+    def write_upload_chunk(self, upload_id: str, index: int, data: bytes) -> None:
+        with self._session_lock(upload_id, exclusive=False) as map_fd:
+            session = self.get_upload_session(upload_id)
+            if session is None:
+                raise KeyError("Upload session not found")
+
+            offset = session.chunk_offset(index)
+            view = memoryview(data)
+            fd = os.open(self._session_path(upload_id, "part"), os.O_WRONLY)
+            try:
+                while view:
+                    written = os.pwrite(fd, view, offset)
+                    view = view[written:]
+                    offset += written
+            finally:
+                os.close(fd)
+            os.pwrite(map_fd, b"\x01", index)
+
+    def finalize_upload_session(self, upload_id: str) -> StoredUpload:
+        # exclusivo: um segundo complete ou um chunk atrasado esperam e então
+        # encontram a sessão encerrada (KeyError), nunca um arquivo pela metade
+        with self._session_lock(upload_id, exclusive=True):
+            session = self.get_upload_session(upload_id)
+            if session is None:
+                raise KeyError("Upload session not found")
+
+            part = self._session_path(upload_id, "part")
+            # dedupe só pelo hash do que o servidor de fato recebeu
+            digest = hashlib.sha256()
+            with open(part, "rb") as f:
+                while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                    digest.update(chunk)
+            content_hash = digest.hexdigest()
+            if session.content_hash and session.content_hash != content_hash:
+                raise ValueError("Content hash mismatch")
+            stored = self._commit_blob(part, content_hash, session.size)
+            self._remove_session(upload_id, ("json", "map"))
+        return stored
@@ -0,0 +1,62 @@
+"""Migração única do layout plano (``uploads/<id>``) para o particionado.
+
+Cada arquivo solto em ``uploads/`` e ``outputs/`` vai para ``ab/cd/<id>`` com
+um ``rename`` (mesmo filesystem, nada é copiado). Pode ser interrompida e
+rodada de novo: o que já está particionado é ignorado. Os refs antigos gravados
+no banco não precisam ser reescritos; ``LocalStorage.resolve_path`` os mapeia.
+
+    python -m app.adapters.driven.storage.migrate_layout ./data --dry-run
+"""
+
+import argparse
+import filecmp
+import os
+from typing import Dict
+
+from app.adapters.driven.storage.local_storage import AREAS, shard_path
+
+
+def migrate(base_dir: str, dry_run: bool = False) -> Dict[str, int]:
+    counts = {"moved": 0, "duplicates": 0, "conflicts": 0}
+    for area in AREAS:
+        root = os.path.join(base_dir, area)
+        if not os.path.isdir(root):
+            continue
+        with os.scandir(root) as it:
+            # temporários de upload começam com "."; diretórios são shards/sessões
+            entries = [
+                e for e in it if e.is_file(follow_symlinks=False) and e.name[0] != "."
+            ]
+        for entry in entries:
+            dest = shard_path(root, entry.name)
+            if os.path.exists(dest):
+                if filecmp.cmp(entry.path, dest, shallow=False):
+                    counts["duplicates"] += 1
+                    if not dry_run:
+                        os.remove(entry.path)
+                else:
+                    counts["conflicts"] += 1
+                continue
+            counts["moved"] += 1
+            if not dry_run:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.rename(entry.path, dest)
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base_dir", help="STORAGE_DIR a migrar")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    counts = migrate(args.base_dir, dry_run=args.dry_run)
+    print(
+        f"movidos={counts['moved']} duplicados={counts['duplicates']} "
+        f"conflitos={counts['conflicts']}" + (" (dry-run)" if args.dry_run else "")
+    )
+    if counts["conflicts"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""StoragePort sobre um bucket S3 (ou compatível: MinIO, Ceph RGW).
+
+Uploads e artefatos viram objetos ``<prefix><área>/<id>``, com os mesmos refs
+estáveis do LocalStorage. Arquivos maiores que ``part_size`` sobem em
+multipart, com até ``concurrency`` partes em voo (cada thread lê a sua com
+``pread``). Downloads de artefatos usam GETs com ``Range`` (``read_range``).
+
+O ffmpeg precisa de um caminho local, então ``resolve_path`` baixa o objeto
+em partes paralelas para um cache em disco limitado a ``cache_max_bytes``
+(LRU pelo mtime). O ``base_dir`` local guarda só esse cache, temporários e as
+sessões de upload em chunks, que sobem para o bucket ao serem finalizadas.
+Como as sessões ficam no disco do nó, com mais de um pod de API os chunks de
+uma sessão precisam chegar ao mesmo pod (roteamento fixo por ``upload_id``)
+ou ``<base_dir>/uploads/sessions`` precisa ser um volume compartilhado com
+suporte a ``flock``.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from app.adapters.driven.storage.local_storage import LocalStorage, shard_path
+from app.domain.ports.storage import StoredObject, StoredUpload, UPLOAD_CHUNK_SIZE
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover
+    boto3 = None
+    ClientError = None
+
+# limites do S3: partes de no mínimo 5 MiB (exceto a última), até 10000 partes
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+_NOT_FOUND = ("404", "NoSuchKey", "NotFound")
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+class S3Storage(LocalStorage):
+    def __init__(
+        self,
+        base_dir: str,
+        bucket: str,
+        *,
+        client=None,
+        endpoint_url: Optional[str] = None,
+        prefix: str = "",
+        part_size: int = 8 * 1024 * 1024,
+        concurrency: int = 8,
+        cache_max_bytes: int = 20 * 1024**3,
+        session_ttl: float = 24 * 3600,
+        max_sessions_per_user: int = 4,
+    ):
+        if part_size < MIN_PART_SIZE:
+            raise ValueError("S3 part size must be at least 5 MiB")
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("S3 storage requires boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url or None)
+        super().__init__(
+            base_dir,
+            session_ttl=session_ttl,
+            max_sessions_per_user=max_sessions_per_user,
+        )
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.rstrip("/") + "/" if prefix else ""
+        self.part_size = part_size
+        self.concurrency = max(1, concurrency)
+        self.cache_max_bytes = cache_max_bytes
+        self._evict_lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @property
+    def cache_dir(self) -> str:
+        return os.path.join(self.base_dir, "objects")
+
+    def _key(self, ref: str) -> str:
+        area, item_id = self._split_ref(ref)
+        return f"{self.prefix}{area}/{item_id}"
+
+    def _cache_path(self, ref: str) -> str:
+        area, item_id = self._split_ref(ref)
+        return shard_path(os.path.join(self.cache_dir, area), item_id)
+
+    def _parts(self, size: int) -> List[Tuple[int, int]]:
+        # objetos enormes: partes maiores para caber em MAX_PARTS
+        part = max(self.part_size, -(-size // MAX_PARTS))
+        return [(start, min(start + part, size)) for start in range(0, size, part)]
+
+    def _upload_file(self, path: str, key: str) -> None:
+        size = os.path.getsize(path)
+        if size <= self.part_size:
+            with open(path, "rb") as f:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=f)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)[
+            "UploadId"
+        ]
+        fd = os.open(path, os.O_RDONLY)
+
+        def _send(part: Tuple[int, Tuple[int, int]]) -> dict:
+            number, (start, end) = part
+            response = self.client.upload_part(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=os.pread(fd, end - start, start),
+            )
+            return {"ETag": response["ETag"], "PartNumber": number}
+
+        try:
+            with ThreadPoolExecutor(self.concurrency) as pool:
+                parts = list(pool.map(_send, enumerate(self._parts(size), 1)))
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            # partes órfãs seguem cobradas até o abort
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id
+            )
+            raise
+        finally:
+            os.close(fd)
+
+    def _download(self, key: str, dest: str, size: int) -> None:
+        fd, tmp_path = tempfile.mkstemp(prefix=".get_", dir=os.path.dirname(dest))
+
+        def _fetch(part: Tuple[int, int]) -> None:
+            start, end = part
+            body = self.client.get_object(
+                Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end - 1}"
+            )["Body"]
+            try:
+                pos = start
+                for chunk in body.iter_chunks(UPLOAD_CHUNK_SIZE):
+                    _pwrite_all(fd, chunk, pos)
+                    pos += len(chunk)
+            finally:
+                body.close()
+            if pos != end:
+                raise ValueError("S3 object truncated")
+
+        try:
+            os.ftruncate(fd, size)
+            with ThreadPoolExecutor(self.concurrency) as pool:
+                list(pool.map(_fetch, self._parts(size)))
+            os.close(fd)
+            fd = None
+            os.replace(tmp_path, dest)
+        except BaseException:
+            if fd is not None:
+                os.close(fd)
+            os.remove(tmp_path)
+            raise
+
+    def _evict(self, keep: str) -> None:
+        """Apaga as cópias menos usadas até o cache caber em ``cache_max_bytes``;
+        ``keep`` (a que acabou de ser pedida) nunca sai."""
+        with self._evict_lock:
+            files = []
+            for root, _, names in os.walk(self.cache_dir):
+                for name in names:
+                    if name.startswith("."):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    files.append((st.st_mtime_ns, st.st_size, path))
+            total = sum(size for _, size, _ in files)
+            for _, size, path in sorted(files):
+                if total <= self.cache_max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def _has_blob(self, content_hash: str) -> bool:
+        return self.stat(f"uploads/{content_hash}") is not None
+
+    def _commit_blob(self, tmp_path: str, content_hash: str, size: int) -> StoredUpload:
+        ref = f"uploads/{content_hash}"
+        try:
+            if self._has_blob(content_hash):
+                return StoredUpload(ref, content_hash, size, reused=True)
+            self._upload_file(tmp_path, self._key(ref))
+            return StoredUpload(ref, content_hash, size)
+        finally:
+            os.remove(tmp_path)
+
+    def save_artifact(self, local_path: str) -> str:
+        ref = f"outputs/{os.path.basename(local_path)}"
+        self._upload_file(local_path, self._key(ref))
+        # o worker relê o artefato logo em seguida (cache de artefatos, índice)
+        dest = self._cache_path(ref)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.move(local_path, dest)
+        self._evict(keep=dest)
+        return ref
+
+    def resolve_path(self, ref: str) -> str:
+        if self._is_legacy(ref):
+            return super().resolve_path(ref)
+        path = self._cache_path(ref)
+        try:
+            # o mtime marca o último uso para o LRU
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        info = self.stat(ref)
+        if info is None:
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._download(self._key(ref), path, info.size)
+        self._evict(keep=path)
+        return path
+
+    def stat(self, ref: str) -> Optional[StoredObject]:
+        if self._is_legacy(ref):
+            return super().stat(ref)
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(ref))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in _NOT_FOUND:
+                return None
+            raise
+        return StoredObject(
+            head["ContentLength"], int(head["LastModified"].timestamp()) * 10**9
+        )
+
+    def read_range(self, ref: str, start: int, end: int) -> Iterator[bytes]:
+        if self._is_legacy(ref):
+            yield from super().read_range(ref, start, end)
+            return
+        if end <= start:
+            return
+        body = self.client.get_object(
+            Bucket=self.bucket, Key=self._key(ref), Range=f"bytes={start}-{end - 1}"
+        )["Body"]
+        try:
+            yield from body.iter_chunks(UPLOAD_CHUNK_SIZE)
+        finally:
+            body.close()
@@ -1,35 +1,164 @@
-import io
 import os
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from fastapi.responses import FileResponse
+from functools import partial
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from app.config.settings import settings
+from app.domain.entities import DEFAULT_ARCHIVE_FORMAT, validate_extraction
+from app.domain.services.upload_session import MAX_CHUNK_SIZE
+from fastapi.responses import Response, StreamingResponse
 from app.adapters.driver.api.dependencies import CurrentUser, get_current_user
+from app.adapters.driver.api.ranges import make_etag, ranged_response
 from app.config.container import (
     get_enqueue_service,
     get_status_service,
+    get_cancel_service,
+    get_frames_service,
     get_list_jobs_service,
     get_storage,
+    get_archiver,
+    get_create_upload_service,
+    get_upload_session_service,
+    get_upload_chunk_service,
+    get_complete_upload_service,
 )
 
 router = APIRouter()
 
 
+def _archive_format(requested: str | None) -> str:
+    fmt = requested or settings.archive_format
+    if fmt not in get_archiver().formats():
+        raise HTTPException(status_code=400, detail="Unsupported archive format")
+    return fmt
+
+
+def _extraction_options(
+    mode: str = "fps",
+    scene_threshold: float | None = None,
+    min_fps: float | None = None,
+    max_fps: float | None = None,
+    output: str = "frames",
+) -> dict:
+    try:
+        validate_extraction(mode, scene_threshold, min_fps, max_fps, output)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "mode": mode,
+        "scene_threshold": scene_threshold,
+        "min_fps": min_fps,
+        "max_fps": max_fps,
+        "output": output,
+    }
+
+
 @router.post("/videos", status_code=202)
 async def enqueue_video(
     file: UploadFile = File(...),
     fps: int = 1,
+    archive_format: str | None = Query(None, alias="format"),
+    options: dict = Depends(_extraction_options),
     user: CurrentUser = Depends(get_current_user),
 ):
+    archive_format = _archive_format(archive_format)
     service = get_enqueue_service()
-    data = await file.read()
-    job_id = service(
+    # o multipart já está em um SpooledTemporaryFile (disco acima de 1 MiB);
+    # a storage consome em blocos, sem carregar o vídeo inteiro em memória
+    job_id = await run_in_threadpool(
+        service,
         user_id=user.user_id,
-        file_stream=io.BytesIO(data),
+        file_stream=file.file,
         filename=file.filename,
         fps=fps,
+        archive_format=archive_format,
+        **options,
     )
     return {"job_id": job_id, "status": "queued"}
 
 
+class UploadSessionIn(BaseModel):
+    filename: str
+    size: int
+    chunk_size: int | None = None
+    sha256: str | None = None
+
+
+@router.post("/uploads", status_code=201)
+def create_upload(body: UploadSessionIn, user: CurrentUser = Depends(get_current_user)):
+    service = get_create_upload_service()
+    try:
+        return service(
+            user_id=user.user_id,
+            filename=body.filename,
+            size=body.size,
+            chunk_size=body.chunk_size,
+            sha256=body.sha256,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/uploads/{upload_id}")
+def get_upload(upload_id: str, user: CurrentUser = Depends(get_current_user)):
+    service = get_upload_session_service()
+    try:
+        return service(upload_id=upload_id, user_id=user.user_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def put_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    user: CurrentUser = Depends(get_current_user),
+):
+    if int(request.headers.get("content-length") or 0) > MAX_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail="Chunk too large")
+    # sem Content-Length (chunked) o limite vale para o que já chegou
+    data = bytearray()
+    async for part in request.stream():
+        data += part
+        if len(data) > MAX_CHUNK_SIZE:
+            raise HTTPException(status_code=413, detail="Chunk too large")
+    service = get_upload_chunk_service()
+    try:
+        return await run_in_threadpool(
+            service, upload_id=upload_id, user_id=user.user_id, index=index, data=data
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/uploads/{upload_id}/complete", status_code=202)
+def complete_upload(
+    upload_id: str,
+    fps: int = 1,
+    archive_format: str | None = Query(None, alias="format"),
+    options: dict = Depends(_extraction_options),
+    user: CurrentUser = Depends(get_current_user),
+):
+    archive_format = _archive_format(archive_format)
+    service = get_complete_upload_service()
+    try:
+        job_id = service(
+            upload_id=upload_id,
+            user_id=user.user_id,
+            fps=fps,
+            archive_format=archive_format,
+            **options,
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"job_id": job_id, "status": "queued"}
+
+
 @router.get("/videos/{job_id}")
 def get_status(job_id: str, user: CurrentUser = Depends(get_current_user)):
     service = get_status_service()
@@ -39,6 +168,61 @@ def get_status(job_id: str, user: CurrentUser = Depends(get_current_user)):
         raise HTTPException(status_code=404, detail="Process not found")
 
 
+@router.delete("/videos/{job_id}", status_code=202)
+def cancel_job(job_id: str, user: CurrentUser = Depends(get_current_user)):
+    service = get_cancel_service()
+    try:
+        return service(job_id=job_id, user_id=user.user_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Process not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/videos/{job_id}/frames/{number}")
+def get_frame(job_id: str, number: int, user: CurrentUser = Depends(get_current_user)):
+    service = get_frames_service()
+    try:
+        data = service(job_id=job_id, user_id=user.user_id, number=number)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # o conteúdo de um artefato concluído não muda
+    return Response(
+        data,
+        media_type="image/jpeg",
+        headers={"Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
+@router.get("/videos/{job_id}/frames")
+def get_frame_range(
+    job_id: str,
+    start: int,
+    end: int,
+    user: CurrentUser = Depends(get_current_user),
+):
+    service = get_frames_service()
+    try:
+        stream = service.range(
+            job_id=job_id, user_id=user.user_id, start=start, end=end
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filename = f"frames_{job_id}_{start}-{end}.zip"
+    return StreamingResponse(
+        stream.iter_bytes(),
+        media_type="application/zip",
+        headers={
+            "Content-Length": str(stream.size),
+            "Content-Disposition": f'attachment; filename="{filename}"',
+        },
+    )
+
+
 @router.get("/videos")
 def list_jobs(user: CurrentUser = Depends(get_current_user)):
     service = get_list_jobs_service()
@@ -46,7 +230,9 @@ def list_jobs(user: CurrentUser = Depends(get_current_user)):
 
 
 @router.get("/download/{job_id}")
-def download(job_id: str, user: CurrentUser = Depends(get_current_user)):
+def download(
+    job_id: str, request: Request, user: CurrentUser = Depends(get_current_user)
+):
     status_service = get_status_service()
     try:
         data = status_service(job_id=job_id, user_id=user.user_id)
@@ -56,9 +242,39 @@ def download(job_id: str, user: CurrentUser = Depends(get_current_user)):
     if not artifact_ref:
         raise HTTPException(status_code=400, detail="ZIP not ready")
     storage = get_storage()
-    path = storage.resolve_path(artifact_ref)
-    if not os.path.exists(path):
+    archiver = get_archiver()
+    fmt = data.get("format") or DEFAULT_ARCHIVE_FORMAT
+    try:
+        media_type = archiver.media_type(fmt)
+        lazy = archiver.streams(fmt)
+    except ValueError:
+        media_type, lazy = "application/octet-stream", False
+    info = storage.stat(artifact_ref)
+    if info is None:
         raise HTTPException(status_code=404, detail="Artifact missing")
-    return FileResponse(
-        path, filename=os.path.basename(path), media_type="application/zip"
+    mtime = info.mtime_ns / 1e9
+    if lazy:
+        # ZIP montado do frame pack: determinístico, então a validação é a do pack;
+        # o pack é lido por faixas, sem baixar o artefato inteiro
+        stream = archiver.stream(
+            fmt, partial(storage.read_range, artifact_ref), info.size
+        )
+        return ranged_response(
+            request,
+            size=stream.size,
+            etag=make_etag(stream.size, info.mtime_ns, prefix="z"),
+            mtime=mtime,
+            read=stream.iter_bytes,
+            media_type=media_type,
+            filename=os.path.splitext(os.path.basename(artifact_ref))[0] + ".zip",
+        )
+    # leitura por faixa direto da storage (em S3, GET com Range)
+    return ranged_response(
+        request,
+        size=info.size,
+        etag=make_etag(info.size, info.mtime_ns),
+        mtime=mtime,
+        read=partial(storage.read_range, artifact_ref),
+        media_type=media_type,
+        filename=os.path.basename(artifact_ref),
     )
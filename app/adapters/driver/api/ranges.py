@@ -0,0 +1,158 @@
+"""Downloads com ``Range``/``If-Range`` e ``ETag``/``If-None-Match`` (RFC 9110).
+
+A resposta é montada a partir de uma função ``read(start, end)`` que entrega
+os bytes de [start, end) em blocos, então serve tanto para objetos da
+storage (``StoragePort.read_range``) quanto para ZIPs montados na hora.
+Várias faixas viram um ``multipart/byteranges`` com ``Content-Length``
+calculado antes do envio.
+"""
+
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+
+# acima disso o Range é ignorado e o arquivo vai inteiro
+MAX_RANGES = 32
+
+Reader = Callable[[int, int], Iterator[bytes]]
+
+
+def make_etag(size: int, mtime_ns: int, prefix: str = "") -> str:
+    return f'"{prefix}{size:x}-{mtime_ns:x}"'
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Faixas semiabertas [start, end) ordenadas e sem sobreposição.
+
+    None quando o cabeçalho deve ser ignorado (sintaxe inválida, unidade
+    desconhecida, faixas demais); lista vazia quando nenhuma é satisfatível."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    ranges = []
+    for part in spec.split(","):
+        first, sep, last = part.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if first:
+                start = int(first)
+                end = int(last) + 1 if last else size
+                if last and end <= start:
+                    return None
+            else:
+                # sufixo: os últimos N bytes
+                start, end = max(0, size - int(last)), size
+        except ValueError:
+            return None
+        if start < size and end > start:
+            ranges.append((start, min(end, size)))
+    if len(ranges) > MAX_RANGES:
+        return None
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _none_match(header: str, etag: str) -> bool:
+    """If-None-Match usa comparação fraca: W/"x" casa com "x"."""
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag.strip()) for tag in header.split(",")}
+
+
+def _if_range_matches(value: str, etag: str, mtime: float) -> bool:
+    value = value.strip()
+    if value.startswith(('"', "W/")):
+        # If-Range exige comparação forte
+        return value == etag
+    try:
+        return int(parsedate_to_datetime(value).timestamp()) == int(mtime)
+    except (TypeError, ValueError):
+        return False
+
+
+def ranged_response(
+    request: Request,
+    *,
+    size: int,
+    etag: str,
+    mtime: float,
+    read: Reader,
+    media_type: str,
+    filename: str,
+) -> Response:
+    headers: Dict[str, str] = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": formatdate(mtime, usegmt=True),
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and _none_match(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    ranges = None
+    range_header = request.headers.get("range")
+    if range_header is not None:
+        if_range = request.headers.get("if-range")
+        if if_range is None or _if_range_matches(if_range, etag, mtime):
+            ranges = parse_range(range_header, size)
+
+    if ranges is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(read(0, size), media_type=media_type, headers=headers)
+    if not ranges:
+        return Response(
+            status_code=416,
+            headers={"Content-Range": f"bytes */{size}", **headers},
+        )
+    if len(ranges) == 1:
+        ((start, end),) = ranges
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+        headers["Content-Length"] = str(end - start)
+        return StreamingResponse(
+            read(start, end), status_code=206, media_type=media_type, headers=headers
+        )
+
+    boundary = secrets.token_hex(16)
+    parts = [
+        (
+            (
+                f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+                f"Content-Range: bytes {start}-{end - 1}/{size}\r\n\r\n"
+            ).encode("ascii"),
+            start,
+            end,
+        )
+        for start, end in ranges
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode("ascii")
+    # cada parte depois da primeira começa com o CRLF que fecha a anterior
+    length = sum(len(head) + end - start for head, start, end in parts)
+    length += 2 * (len(parts) - 1) + len(closing)
+
+    def _multipart() -> Iterator[bytes]:
+        for i, (head, start, end) in enumerate(parts):
+            yield (b"\r\n" if i else b"") + head
+            yield from read(start, end)
+        yield closing
+
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _multipart(),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
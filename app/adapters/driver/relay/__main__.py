@@ -0,0 +1,43 @@
+"""Processo que entrega o outbox, fora da API e dos workers de vídeo.
+
+python -m app.adapters.driver.relay notifications enqueue
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from app.config.container import get_enqueue_relay, get_notification_relay, shutdown
+from app.config.settings import settings
+
+RELAYS = {"notifications": get_notification_relay, "enqueue": get_enqueue_relay}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("relays", nargs="+", choices=sorted(RELAYS))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    # um tópico por thread: um broker lento não atrasa as notificações
+    threads = [
+        threading.Thread(
+            target=RELAYS[name]().run,
+            args=(stop, settings.outbox_poll_interval_sec),
+            name=f"relay-{name}",
+        )
+        for name in dict.fromkeys(args.relays)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 from app.adapters.driver.worker.celery_app import celery_app
 from app.config.container import get_process_service
+from app.domain.errors import JobDeferred
 
 
-@celery_app.task(name="process_video_job")
+@celery_app.task(
+    name="process_video_job",
+    Request="app.adapters.driver.worker.requests:ProcessVideoRequest",
+)
 def process_video_job(job_id: str):
     service = get_process_service()
-    service(job_id=job_id)
+    try:
+        service(job_id=job_id)
+    except JobDeferred as e:
+        process_video_job.apply_async(args=[job_id], countdown=e.countdown)
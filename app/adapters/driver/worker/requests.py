@@ -0,0 +1,27 @@
+import logging
+
+from celery.worker.request import Request
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessVideoRequest(Request):
+    """Roda no processo principal do worker. No limite rígido de tempo o
+    filho é morto sem passar pelo ``except`` do serviço; aqui o job que
+    ficaria RUNNING para sempre vira ERROR."""
+
+    def on_timeout(self, soft, timeout):
+        super().on_timeout(soft, timeout)
+        if soft:
+            return
+        job_id = (self.kwargs or {}).get("job_id") or next(iter(self.args or ()), None)
+        if job_id is None:
+            return
+        from app.config.container import get_process_service
+
+        try:
+            get_process_service().abandon(
+                job_id=job_id, reason=f"Time limit exceeded ({timeout}s)"
+            )
+        except Exception:
+            logger.exception("falha ao encerrar job %s após timeout", job_id)
@@ -1,17 +1,26 @@
 from app.adapters.driver.worker.celery_app import celery_app
 from app.config.container import get_process_service
+from app.domain.errors import JobDeferred
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(name="process_video_job", bind=True)
+@celery_app.task(
+    name="process_video_job",
+    bind=True,
+    Request="app.adapters.driver.worker.requests:ProcessVideoRequest",
+)
 def process_video_job(self, job_id: str):
     logger.info("process_video_job: START %s", job_id)
     service = get_process_service()
     try:
         service(job_id=job_id)  # faz todo o trabalho e atualiza o status
         logger.info("process_video_job: DONE %s", job_id)
+    except JobDeferred as e:
+        # seguidor que cansou de esperar o líder: libera o slot e volta depois
+        logger.info("process_video_job: DEFERRED %s (%ss)", job_id, e.countdown)
+        raise self.retry(countdown=e.countdown, max_retries=None)
     except Exception:
         logger.exception("process_video_job: ERROR %s", job_id)
         raise
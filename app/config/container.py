@@ -1,50 +1,232 @@
 import os
+import threading
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.adapters.driven.gateway.customer_auth_http import CustomerAuthHttp
-from app.adapters.driven.gateway.notification_client_http import HttpNotificationClient
+from app.adapters.driven.gateway.notification_delivery_http import HttpNotificationDelivery
+from app.adapters.driven.gateway.notification_outbox import OutboxNotifier
 from app.config.settings import settings
-from app.adapters.driven.db.models import Base
 from app.adapters.driven.db.sqlalchemy_uow import SQLAlchemyUnitOfWork
 from app.adapters.driven.storage.local_storage import LocalStorage
+from app.adapters.driven.storage.artifact_cache import LocalArtifactCache
 from app.adapters.driven.broker.celery_bus import CeleryMessageBus
+from app.adapters.driven.broker.outbox_bus import OutboxMessageBus
 from app.adapters.driven.media.ffmpeg_processor import FFmpegVideoProcessor
+from app.adapters.driven.media.dedupe import PerceptualDeduplicator
+from app.adapters.driven.archive.writers import Archiver
+from app.adapters.driven.archive.index import ArchiveIndex
+from app.domain.entities import SheetLayout
+from app.domain.ports.message_bus import PROCESS_TOPIC
+from app.domain.ports.notification import NOTIFICATION_TOPIC
+from app.domain.services.cancel_job import CancelJobService
 from app.domain.services.enqueue_video import EnqueueVideoService
+from app.domain.services.frames import GetFramesService
+from app.domain.services.outbox import RelayOutboxService
 from app.domain.services.process_video import ProcessVideoService
 from app.domain.services.query_jobs import GetJobStatusService, ListJobsByUserService
+from app.domain.services.upload_session import (
+    CreateUploadSessionService,
+    GetUploadSessionService,
+    UploadChunkService,
+    CompleteUploadSessionService,
+)
 
-_engine = create_engine(settings.database_url, pool_pre_ping=True)
-_SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
-Base.metadata.create_all(bind=_engine)
+# tudo aqui é criado no primeiro uso e vive o processo inteiro: importar o
+# módulo não abre conexão nem toca no disco
+_lock = threading.Lock()
+_engine = None
+_SessionLocal = None
+
+def get_engine():
+    global _engine, _SessionLocal
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                # sem DDL aqui: o schema é das migrações (alembic upgrade head)
+                engine = create_engine(settings.database_url, pool_pre_ping=True)
+                _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+                _engine = engine
+    return _engine
 
 def get_uow():
+    get_engine()
     return SQLAlchemyUnitOfWork(_SessionLocal)
 
+_object_storage = None
+
 def get_storage():
-    return LocalStorage(settings.storage_dir)
+    global _object_storage
+    if _object_storage is not None:
+        return _object_storage
+    # por processo: sem os makedirs a cada request e, no S3, um cliente boto3
+    # (e seu pool de conexões)
+    if settings.storage_backend != "s3":
+        _object_storage = LocalStorage(settings.storage_dir, session_ttl=settings.upload_session_ttl_sec, max_sessions_per_user=settings.max_upload_sessions_per_user)
+    else:
+        # boto3 só é importado por quem usa S3
+        from app.adapters.driven.storage.s3_storage import S3Storage
+
+        _object_storage = S3Storage(
+            settings.storage_dir,
+            settings.s3_bucket,
+            endpoint_url=settings.s3_endpoint_url,
+            prefix=settings.s3_prefix,
+            part_size=settings.s3_part_size,
+            concurrency=settings.s3_concurrency,
+            cache_max_bytes=settings.s3_cache_max_bytes,
+            session_ttl=settings.upload_session_ttl_sec,
+            max_sessions_per_user=settings.max_upload_sessions_per_user,
+        )
+    return _object_storage
+
+_bus = None
 
 def get_bus():
-    return CeleryMessageBus(settings.broker_url, settings.result_backend)
+    # um publicador por processo; o próprio bus se refaz depois de um fork
+    global _bus
+    if _bus is None:
+        # confirms: o publish só conta como feito depois do ack do broker
+        _bus = CeleryMessageBus(settings.broker_url, settings.result_backend, confirm_publish=True, pool_limit=settings.broker_pool_limit)
+    return _bus
+
+_processor = None
 
 def get_processor():
-    return FFmpegVideoProcessor()
+    global _processor
+    if _processor is None:
+        _processor = FFmpegVideoProcessor(
+            workers=settings.ffmpeg_workers,
+            min_segment_sec=settings.ffmpeg_min_segment_sec,
+            sparse=settings.ffmpeg_sparse,
+        )
+    return _processor
+
+_artifact_cache = None
+
+def get_artifact_cache():
+    # instância por processo: os contadores de hit/miss sobrevivem entre tasks
+    global _artifact_cache
+    if settings.artifact_cache_max_bytes <= 0:
+        return None
+    if _artifact_cache is None:
+        _artifact_cache = LocalArtifactCache(
+            os.path.join(settings.storage_dir, "cache"), settings.artifact_cache_max_bytes
+        )
+    return _artifact_cache
+
+_frame_filter = None
+
+def get_frame_filter():
+    global _frame_filter
+    if not settings.frame_dedupe:
+        return None
+    if _frame_filter is None:
+        _frame_filter = PerceptualDeduplicator(
+            method=settings.frame_dedupe_method,
+            threshold=settings.frame_dedupe_threshold,
+            batch_size=settings.frame_dedupe_batch,
+        )
+    return _frame_filter
+
+_archiver = None
+
+def get_archiver():
+    global _archiver
+    if _archiver is None:
+        _archiver = Archiver()
+    return _archiver
+
+_archive_index = None
+
+def get_archive_index():
+    # por processo: o LRU de índices é o que poupa a releitura dos arquivos
+    global _archive_index
+    if _archive_index is None:
+        _archive_index = ArchiveIndex(get_storage(), settings.frame_index_max_archives)
+    return _archive_index
 
-def get_notifier():
-    return HttpNotificationClient()
+def get_notifier(uow):
+    # a notificação entra no outbox na mesma transação do status do job
+    return OutboxNotifier(uow)
+
+def get_notification_relay():
+    delivery = HttpNotificationDelivery(settings.notifier_url, timeout=settings.notifier_timeout, concurrency=settings.notifier_concurrency)
+    return RelayOutboxService(uow=get_uow(), topic=NOTIFICATION_TOPIC, deliver=delivery.deliver, batch_size=settings.outbox_batch_size, lease=settings.outbox_lease_sec, max_attempts=settings.notifier_max_attempts, retry_base=settings.outbox_retry_base_sec, retry_max=settings.outbox_retry_max_sec)
 
 def get_enqueue_service():
-    return EnqueueVideoService(uow=get_uow(), storage=get_storage(), bus=get_bus())
+    uow = get_uow()
+    # o job e a intenção de publicá-lo entram no mesmo commit; o relay publica
+    return EnqueueVideoService(uow=uow, storage=get_storage(), bus=OutboxMessageBus(uow))
+
+def get_enqueue_relay():
+    bus = get_bus()
+    # publicar de novo é inofensivo (claim no worker): tenta até o broker voltar
+    return RelayOutboxService(uow=get_uow(), topic=PROCESS_TOPIC, deliver=lambda messages: bus.enqueue_many([m.payload["job_id"] for m in messages]), batch_size=settings.outbox_batch_size, lease=settings.outbox_lease_sec, max_attempts=None, retry_base=settings.outbox_retry_base_sec, retry_max=settings.outbox_retry_max_sec, stats=bus.stats, stats_interval=settings.publisher_stats_interval_sec)
+
+def get_create_upload_service():
+    return CreateUploadSessionService(storage=get_storage(), max_size=settings.max_upload_size)
+
+def get_upload_session_service():
+    return GetUploadSessionService(storage=get_storage())
+
+def get_upload_chunk_service():
+    return UploadChunkService(storage=get_storage())
+
+def get_complete_upload_service():
+    return CompleteUploadSessionService(storage=get_storage(), enqueue=get_enqueue_service())
 
 def get_process_service():
-    return ProcessVideoService(uow=get_uow(), storage=get_storage(), processor=get_processor(), notifier=get_notifier())
+    uow = get_uow()
+    return ProcessVideoService(uow=uow, storage=get_storage(), processor=get_processor(), notifier=get_notifier(uow), cache=get_artifact_cache(), streaming=settings.frame_streaming, archiver=get_archiver(), progress_interval=settings.progress_interval_sec, cancel_uow=get_uow(), cancel_poll_interval=settings.cancel_poll_interval_sec, fanout_max_variants=settings.fanout_max_variants, lease_uow=get_uow() if settings.coalesce_jobs else None, lease_ttl=settings.lease_ttl_sec, coalesce_poll_interval=settings.coalesce_poll_interval_sec, coalesce_max_wait=settings.coalesce_max_wait_sec, frame_filter=get_frame_filter(), sheet_layout=SheetLayout(settings.sheet_columns, settings.sheet_rows, settings.sheet_tile_width, settings.sheet_tile_height))
+
+def get_frames_service():
+    return GetFramesService(uow=get_uow(), index=get_archive_index())
 
 def get_status_service():
     return GetJobStatusService(uow=get_uow())
 
+def get_cancel_service():
+    return CancelJobService(uow=get_uow())
+
 def get_list_jobs_service():
     return ListJobsByUserService(uow=get_uow())
 
+_auth_gateway = None
+
 def get_auth_gateway():
-    return CustomerAuthHttp(os.getenv("CUSTOMER_SERVICE_URL"))
\ No newline at end of file
+    # um httpx.Client (keep-alive) por processo, não um por requisição
+    global _auth_gateway
+    if _auth_gateway is None:
+        _auth_gateway = CustomerAuthHttp(os.getenv("CUSTOMER_SERVICE_URL"))
+    return _auth_gateway
+
+def startup():
+    """Cria agora o que o primeiro request/task criaria (API e workers)."""
+    with get_engine().connect():
+        pass
+    get_storage()
+
+def shutdown():
+    global _auth_gateway
+    if _engine is not None:
+        _engine.dispose()
+    if _bus is not None:
+        _bus.close()
+    if _auth_gateway is not None:
+        _auth_gateway.client.close()
+        _auth_gateway = None
+
+def _after_fork_in_child():
+    # prefork do Celery/gunicorn: sockets herdados são do pai; o filho larga
+    # as conexões sem fechá-las e abre as suas no primeiro uso
+    global _object_storage, _archive_index, _auth_gateway
+    if _engine is not None:
+        _engine.dispose(close=False)
+    _object_storage = None
+    # o índice lê pela storage do processo
+    _archive_index = None
+    _auth_gateway = None
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
\ No newline at end of file
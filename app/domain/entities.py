@@ -4,11 +4,20 @@ from enum import Enum
 from typing import Optional
 
 
+DEFAULT_ARCHIVE_FORMAT = "zip"
+# "fps": amostragem fixa; "scene": um frame por mudança de cena
+EXTRACTION_MODES = ("fps", "scene")
+DEFAULT_SCENE_THRESHOLD = 0.3
+# "frames": um JPEG por frame; "sheet": mosaicos (contact sheet) + index.json
+OUTPUT_PROFILES = ("frames", "sheet")
+
+
 class JobStatus(str, Enum):
     QUEUED = "queued"
     RUNNING = "running"
     DONE = "done"
     ERROR = "error"
+    CANCELLED = "cancelled"
 
 
 @dataclass
@@ -18,6 +27,7 @@ class Video:
     filename: str
     storage_ref: str
     duration: Optional[float] = None
+    content_hash: Optional[str] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
 
 
@@ -29,7 +39,123 @@ class VideoJob:
     status: JobStatus = JobStatus.QUEUED
     fps: int = 1
     frame_count: int = 0
+    # frames descartados como quase idênticos (não entram em frame_count)
+    dropped_frames: int = 0
     artifact_ref: Optional[str] = None
     error: Optional[str] = None
+    archive_format: str = DEFAULT_ARCHIVE_FORMAT
+    mode: str = "fps"
+    # só no modo cena: limiar do score (0-1) e limites opcionais de taxa
+    scene_threshold: Optional[float] = None
+    min_fps: Optional[float] = None
+    max_fps: Optional[float] = None
+    output: str = "frames"
+    # 0-100 e segundos restantes, atualizados durante a extração
+    progress: float = 0.0
+    eta_seconds: Optional[float] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+def validate_extraction(
+    mode: str,
+    scene_threshold: Optional[float] = None,
+    min_fps: Optional[float] = None,
+    max_fps: Optional[float] = None,
+    output: str = "frames",
+) -> None:
+    """Levanta ValueError para combinações inválidas de modo e parâmetros."""
+    if output not in OUTPUT_PROFILES:
+        raise ValueError(f"Unsupported output: {output}")
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unsupported mode: {mode}")
+    if mode != "scene":
+        if scene_threshold is not None or min_fps is not None or max_fps is not None:
+            raise ValueError("Scene options require mode=scene")
+        return
+    if scene_threshold is not None and not 0 < scene_threshold < 1:
+        raise ValueError("scene_threshold must be between 0 and 1")
+    for name, value in (("min_fps", min_fps), ("max_fps", max_fps)):
+        if value is not None and value <= 0:
+            raise ValueError(f"{name} must be positive")
+    if min_fps is not None and max_fps is not None and min_fps > max_fps:
+        raise ValueError("min_fps must not exceed max_fps")
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """Grade de cada contact sheet e tamanho (px) de cada célula."""
+
+    columns: int = 10
+    rows: int = 10
+    tile_width: int = 160
+    tile_height: int = 90
+
+    @property
+    def cells(self) -> int:
+        return self.columns * self.rows
+
+
+@dataclass
+class WorkLease:
+    """Posse temporária de uma unidade de trabalho (conteúdo + parâmetros)."""
+
+    key: str
+    holder: str
+    expires_at: datetime
+
+
+@dataclass
+class OutboxMessage:
+    """Intenção gravada na mesma transação do estado que a originou; um relay
+    separado a entrega depois (pelo menos uma vez)."""
+
+    topic: str
+    payload: dict
+    id: Optional[int] = None
+    attempts: int = 0
+    available_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    last_error: Optional[str] = None
+
+
+@dataclass
+class UploadSession:
+    id: str
+    user_id: str
+    filename: str
+    size: int
+    chunk_size: int
+    received_chunks: list[int] = field(default_factory=list)
+    content_hash: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    @property
+    def total_chunks(self) -> int:
+        return -(-self.size // self.chunk_size)
+
+    def chunk_offset(self, index: int) -> int:
+        return index * self.chunk_size
+
+    def chunk_length(self, index: int) -> int:
+        return min(self.chunk_size, self.size - self.chunk_offset(index))
+
+    def missing_chunks(self) -> list[int]:
+        received = set(self.received_chunks)
+        return [i for i in range(self.total_chunks) if i not in received]
+
+    def received_ranges(self) -> list[list[int]]:
+        """Faixas de bytes recebidas, semiabertas: [[inicio, fim), ...]."""
+        ranges: list[list[int]] = []
+        for i in sorted(set(self.received_chunks)):
+            start = self.chunk_offset(i)
+            end = start + self.chunk_length(i)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+        return ranges
+
+    @property
+    def is_complete(self) -> bool:
+        return not self.missing_chunks()
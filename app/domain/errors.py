@@ -3,3 +3,15 @@ class AuthError(Exception):
         super().__init__(message)
         self.message = message
         self.status_code = status_code
+
+
+class JobCancelled(Exception):
+    """O job foi cancelado enquanto estava em processamento."""
+
+
+class JobDeferred(Exception):
+    """O job voltou para a fila; quem roda a task deve reagendá-la."""
+
+    def __init__(self, countdown: float):
+        super().__init__(f"deferred for {countdown}s")
+        self.countdown = countdown
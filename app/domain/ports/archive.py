@@ -0,0 +1,35 @@
+from typing import Callable, Iterator, Optional, Protocol
+
+
+class ArchiveWriterPort(Protocol):
+    """Mesma interface de escrita do `zipfile.ZipFile`."""
+
+    def write(self, filename: str, arcname: str) -> None: ...
+    def writestr(self, arcname: str, data: bytes) -> None: ...
+    def __enter__(self): ...
+    def __exit__(self, exc_type, exc, tb): ...
+
+
+class ArchiveStreamPort(Protocol):
+    """Arquivo montado sob demanda; ``size`` é o tamanho final exato."""
+
+    size: int
+
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Bytes do intervalo [start, end) do arquivo, em blocos."""
+        ...
+
+
+class ArchiverPort(Protocol):
+    def formats(self) -> list[str]: ...
+    def extension(self, fmt: str) -> str: ...
+    def media_type(self, fmt: str) -> str: ...
+    def open(self, fmt: str, path: str) -> ArchiveWriterPort: ...
+    def streams(self, fmt: str) -> bool: ...
+    def stream(
+        self, fmt: str, read: Callable[[int, int], Iterator[bytes]], size: int
+    ) -> Optional[ArchiveStreamPort]:
+        """ZIP gerado na hora a partir do artefato de ``size`` bytes lido por
+        ``read(start, end)``; None quando o artefato já é o próprio arquivo
+        de download."""
+        ...
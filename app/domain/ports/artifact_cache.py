@@ -0,0 +1,13 @@
+from typing import Protocol, Optional, Tuple
+
+
+class ArtifactCachePort(Protocol):
+    def fetch(self, key: str, dest_path: str) -> Optional[Tuple[int, int]]:
+        """Materializa o artefato em cache em `dest_path` e devolve
+        (frame_count, dropped_frames); None quando a chave não está no cache."""
+        ...
+
+    def put(
+        self, key: str, artifact_path: str, frame_count: int, dropped_frames: int = 0
+    ) -> None: ...
+    def stats(self) -> dict: ...
@@ -0,0 +1,13 @@
+import threading
+from typing import Optional, Protocol
+
+
+class FrameFilterPort(Protocol):
+    # identifica a configuração do filtro; entra na chave do cache
+    key: str
+
+    def filter_dir(
+        self, frames_dir: str, cancel: Optional[threading.Event] = None
+    ) -> int:
+        """Remove de ``frames_dir`` os frames descartados e devolve quantos saíram."""
+        ...
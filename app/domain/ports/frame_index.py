@@ -0,0 +1,19 @@
+from typing import List, Optional, Protocol
+
+from app.domain.ports.archive import ArchiveStreamPort
+
+
+class FrameIndexPort(Protocol):
+    """Leitura de membros avulsos de um artefato sem baixá-lo inteiro.
+
+    ``ref`` é o ref do artefato na storage; um artefato que sumiu dá KeyError."""
+
+    def supports(self, fmt: str) -> bool: ...
+    def names(self, ref: str, fmt: str) -> List[str]: ...
+    def read(self, ref: str, fmt: str, name: str) -> Optional[bytes]:
+        """Conteúdo do membro ``name``; None quando não existe."""
+        ...
+
+    def stream(self, ref: str, fmt: str, names: List[str]) -> ArchiveStreamPort:
+        """ZIP só com os membros ``names``, montado sob demanda."""
+        ...
@@ -1,5 +1,15 @@
-from typing import Protocol
+from typing import List, Optional, Protocol
+
+# tópico do outbox com os jobs a publicar na fila de processamento
+PROCESS_TOPIC = "process_video_job"
 
 
 class MessageBusPort(Protocol):
     def enqueue_process(self, job_id: str) -> None: ...
+
+
+class BatchPublisherPort(Protocol):
+    def enqueue_many(self, job_ids: List[str]) -> List[Optional[str]]:
+        """Publica vários jobs de uma vez; para cada um, None se o broker
+        confirmou ou a descrição do erro."""
+        ...
@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Literal
+from typing import List, Optional, Literal, Protocol
+
+from app.domain.entities import OutboxMessage
 
 Status = Literal["success", "error"]
+# tópico das notificações no outbox
+NOTIFICATION_TOPIC = "notification"
 
 
 class NotificationPort(ABC):
@@ -17,3 +21,10 @@ class NotificationPort(ABC):
     ) -> None:
         """Dispara a notificação assíncrona. Não deve levantar exceção que quebre o fluxo do job."""
         ...
+
+
+class NotificationDeliveryPort(Protocol):
+    def deliver(self, messages: List[OutboxMessage]) -> List[Optional[str]]:
+        """Entrega um lote de notificações do outbox; para cada mensagem, None
+        se foi aceita ou a descrição do erro (o relay reagenda)."""
+        ...
@@ -1,5 +1,6 @@
-from typing import Protocol, Iterable, Optional, runtime_checkable
-from app.domain.entities import Video, VideoJob
+from datetime import datetime
+from typing import List, Protocol, Iterable, Optional, runtime_checkable
+from app.domain.entities import OutboxMessage, Video, VideoJob, WorkLease
 
 
 @runtime_checkable
@@ -12,5 +13,47 @@ class VideoRepositoryPort(Protocol):
 class JobRepositoryPort(Protocol):
     def add(self, j: VideoJob) -> None: ...
     def get(self, job_id: str) -> Optional[VideoJob]: ...
-    def update(self, j: VideoJob) -> None: ...
+    def update(self, j: VideoJob) -> bool:
+        """Grava o job; False se ele sumiu ou foi cancelado nesse meio tempo
+        (um cancelamento só é sobrescrito por outro)."""
+        ...
+
+    def update_progress(
+        self, job_id: str, progress: float, eta_seconds: Optional[float]
+    ) -> None: ...
+    def claim(self, job_id: str) -> bool:
+        """QUEUED -> RUNNING atômico; False se o job já saiu da fila."""
+        ...
+
+    def list_queued_siblings(
+        self, job_id: str, video_id: str, content_hash: Optional[str], limit: int
+    ) -> List[VideoJob]:
+        """Outros jobs na fila para o mesmo vídeo ou o mesmo conteúdo."""
+        ...
+
     def list_by_user(self, user_id: str) -> Iterable[VideoJob]: ...
+
+
+@runtime_checkable
+class LeaseRepositoryPort(Protocol):
+    def get(self, key: str) -> Optional[WorkLease]: ...
+    def acquire(self, key: str, holder: str, ttl: float) -> bool:
+        """Assume a chave se está livre, expirada ou já é de ``holder``."""
+        ...
+
+    def renew(self, key: str, holder: str, ttl: float) -> bool: ...
+    def release(self, key: str, holder: str) -> None: ...
+
+
+@runtime_checkable
+class OutboxRepositoryPort(Protocol):
+    def add(self, message: OutboxMessage) -> None: ...
+    def claim(self, topic: str, limit: int, lease: float) -> List[OutboxMessage]:
+        """Até ``limit`` mensagens disponíveis, em ordem de criação, escondidas
+        dos outros relays por ``lease`` segundos."""
+        ...
+
+    def delete(self, ids: List[int]) -> None: ...
+    def reschedule(
+        self, message_id: int, attempts: int, available_at: datetime, error: str
+    ) -> None: ...
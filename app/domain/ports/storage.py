@@ -1,8 +1,68 @@
-from typing import Protocol, BinaryIO
+from dataclasses import dataclass
+from typing import Protocol, BinaryIO, Iterator, Optional
+from app.domain.entities import UploadSession
+
+# Tamanho máximo de bloco lido do stream de upload por vez.
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    ref: str
+    content_hash: str
+    size: int
+    # True quando o conteúdo já existia e nada novo foi gravado
+    reused: bool = False
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    size: int
+    mtime_ns: int
 
 
 class StoragePort(Protocol):
-    def save_upload(self, file_stream: BinaryIO, filename: str) -> str: ...
+    def save_upload(self, file_stream: BinaryIO, filename: str) -> StoredUpload:
+        """Persiste o upload lendo `file_stream` em blocos de no máximo
+        UPLOAD_CHUNK_SIZE bytes; nunca carrega o arquivo inteiro em memória.
+        O conteúdo é endereçado pelo sha256: uploads idênticos compartilham o ref.
+        Blobs de upload são imutáveis e nunca apagados pela aplicação; quem
+        usa um blob são as linhas de ``videos`` com o mesmo ``content_hash``."""
+        ...
+
     def save_artifact(self, local_path: str) -> str: ...
     def make_temp_dir(self, prefix: str) -> str: ...
-    def resolve_path(self, ref: str) -> str: ...
+    def resolve_path(self, ref: str) -> str:
+        """Caminho local do conteúdo de `ref` (em storage remota, uma cópia em cache)."""
+        ...
+
+    def stat(self, ref: str) -> Optional[StoredObject]: ...
+
+    def read_range(self, ref: str, start: int, end: int) -> Iterator[bytes]:
+        """Bytes de [start, end) em blocos, sem trazer o objeto inteiro."""
+        ...
+
+
+class ChunkedUploadPort(Protocol):
+    def create_upload_session(
+        self,
+        *,
+        user_id: str,
+        filename: str,
+        size: int,
+        chunk_size: int,
+        content_hash: Optional[str] = None,
+    ) -> UploadSession:
+        """Reserva o arquivo de destino com `size` bytes pré-alocados. O
+        `content_hash` informado só é conferido contra os bytes recebidos."""
+        ...
+
+    def get_upload_session(self, upload_id: str) -> Optional[UploadSession]: ...
+
+    def write_upload_chunk(self, upload_id: str, index: int, data: bytes) -> None:
+        """Grava o chunk direto no seu offset; reenvio do mesmo chunk é idempotente."""
+        ...
+
+    def finalize_upload_session(self, upload_id: str) -> StoredUpload:
+        """Move o arquivo completo para os uploads (rename) e devolve o storage_ref."""
+        ...
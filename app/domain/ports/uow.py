@@ -1,10 +1,17 @@
 from typing import Protocol
-from app.domain.ports.repository import VideoRepositoryPort, JobRepositoryPort
+from app.domain.ports.repository import (
+    VideoRepositoryPort,
+    JobRepositoryPort,
+    LeaseRepositoryPort,
+    OutboxRepositoryPort,
+)
 
 
 class UnitOfWorkPort(Protocol):
     videos: VideoRepositoryPort
     jobs: JobRepositoryPort
+    leases: LeaseRepositoryPort
+    outbox: OutboxRepositoryPort
 
     def __enter__(self): ...
     def __exit__(self, exc_type, exc, tb): ...
@@ -1,5 +1,64 @@
-from typing import Protocol
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Protocol
+
+from app.domain.entities import SheetLayout
+
+# (percentual 0-100, ETA em segundos ou None); chamado na thread de quem extrai
+ProgressCallback = Callable[[float, Optional[float]], None]
 
 
 class VideoProcessorPort(Protocol):
-    def extract_frames(self, input_path: str, out_dir: str, fps: int = 1) -> int: ...
+    def extract_frames(
+        self,
+        input_path: str,
+        out_dir: str,
+        fps: int = 1,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> int: ...
+    def iter_frames(
+        self,
+        input_path: str,
+        fps: int = 1,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Iterator[bytes]:
+        """Frames JPEG em ordem, produzidos sob demanda (sem arquivos temporários).
+
+        Com ``cancel`` setado o ffmpeg é morto e a extração levanta JobCancelled."""
+        ...
+
+    def extract_frames_multi(
+        self,
+        input_path: str,
+        outputs: Dict[int, str],
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[int, int]:
+        """Vários fps numa só decodificação: grava em ``outputs[fps]`` e
+        devolve a contagem de frames de cada fps."""
+        ...
+
+    def extract_scenes(
+        self,
+        input_path: str,
+        out_dir: str,
+        threshold: float,
+        min_fps: Optional[float] = None,
+        max_fps: Optional[float] = None,
+        on_progress: Optional[ProgressCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> List[float]:
+        """Um frame por mudança de cena; devolve o instante (s) de cada um."""
+        ...
+
+    def tile_frames(
+        self,
+        frame_paths: List[str],
+        out_dir: str,
+        layout: SheetLayout,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        """Monta os frames, na ordem dada, em mosaicos ``sheet_NNNN.jpg`` de
+        ``layout.cells`` células; devolve quantos mosaicos gravou."""
+        ...
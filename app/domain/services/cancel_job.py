@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from app.domain.entities import JobStatus
+from app.domain.ports.uow import UnitOfWorkPort
+
+FINISHED_STATUSES = (JobStatus.DONE, JobStatus.ERROR)
+
+
+class CancelJobService:
+    """Marca o job como cancelado. Um job na fila é pulado pelo worker; um
+    job em execução é interrompido pelo watcher do ProcessVideoService."""
+
+    def __init__(self, uow: UnitOfWorkPort):
+        self.uow = uow
+
+    def __call__(self, *, job_id: str, user_id: str) -> dict:
+        with self.uow:
+            job = self.uow.jobs.get(job_id)
+            if not job or job.user_id != user_id:
+                raise KeyError("Job not found")
+            if job.status in FINISHED_STATUSES:
+                raise ValueError("Job already finished")
+            if job.status != JobStatus.CANCELLED:
+                job.status = JobStatus.CANCELLED
+                job.eta_seconds = None
+                job.updated_at = datetime.utcnow()
+                self.uow.jobs.update(job)
+                self.uow.commit()
+            return {"job_id": job.id, "status": job.status}
@@ -1,6 +1,12 @@
 from uuid import uuid4
-from typing import BinaryIO
-from app.domain.entities import Video, VideoJob, JobStatus
+from typing import BinaryIO, Optional
+from app.domain.entities import (
+    DEFAULT_ARCHIVE_FORMAT,
+    JobStatus,
+    Video,
+    VideoJob,
+    validate_extraction,
+)
 from app.domain.ports.uow import UnitOfWorkPort
 from app.domain.ports.storage import StoragePort
 from app.domain.ports.message_bus import MessageBusPort
@@ -13,15 +19,63 @@ class EnqueueVideoService:
         self.bus = bus
 
     def __call__(
-        self, *, user_id: str, file_stream: BinaryIO, filename: str, fps: int = 1
+        self,
+        *,
+        user_id: str,
+        file_stream: BinaryIO,
+        filename: str,
+        fps: int = 1,
+        archive_format: str = DEFAULT_ARCHIVE_FORMAT,
+        mode: str = "fps",
+        scene_threshold: Optional[float] = None,
+        min_fps: Optional[float] = None,
+        max_fps: Optional[float] = None,
+        output: str = "frames",
     ) -> str:
+        # valida antes de gravar o upload
+        validate_extraction(mode, scene_threshold, min_fps, max_fps, output)
+        stored = self.storage.save_upload(file_stream, filename)
+        return self.enqueue_stored(
+            user_id=user_id,
+            storage_ref=stored.ref,
+            filename=filename,
+            fps=fps,
+            content_hash=stored.content_hash,
+            archive_format=archive_format,
+            mode=mode,
+            scene_threshold=scene_threshold,
+            min_fps=min_fps,
+            max_fps=max_fps,
+            output=output,
+        )
+
+    def enqueue_stored(
+        self,
+        *,
+        user_id: str,
+        storage_ref: str,
+        filename: str,
+        fps: int = 1,
+        content_hash: Optional[str] = None,
+        archive_format: str = DEFAULT_ARCHIVE_FORMAT,
+        mode: str = "fps",
+        scene_threshold: Optional[float] = None,
+        min_fps: Optional[float] = None,
+        max_fps: Optional[float] = None,
+        output: str = "frames",
+    ) -> str:
+        """Cria Video + VideoJob para um upload que já está na storage."""
+        validate_extraction(mode, scene_threshold, min_fps, max_fps, output)
         video_id = str(uuid4())
         job_id = str(uuid4())
 
         with self.uow:
-            storage_ref = self.storage.save_upload(file_stream, filename)
             video = Video(
-                id=video_id, user_id=user_id, filename=filename, storage_ref=storage_ref
+                id=video_id,
+                user_id=user_id,
+                filename=filename,
+                storage_ref=storage_ref,
+                content_hash=content_hash,
             )
             self.uow.videos.add(video)
 
@@ -31,9 +85,16 @@ class EnqueueVideoService:
                 user_id=user_id,
                 status=JobStatus.QUEUED,
                 fps=fps,
+                archive_format=archive_format,
+                mode=mode,
+                scene_threshold=scene_threshold,
+                min_fps=min_fps,
+                max_fps=max_fps,
+                output=output,
             )
             self.uow.jobs.add(job)
+            # com o OutboxMessageBus a publicação entra no mesmo commit do job
+            self.bus.enqueue_process(job_id)
             self.uow.commit()
 
-        self.bus.enqueue_process(job_id)
         return job_id
@@ -0,0 +1,67 @@
+from typing import Optional, Tuple
+
+from app.domain.entities import JobStatus
+from app.domain.ports.archive import ArchiveStreamPort
+from app.domain.ports.frame_index import FrameIndexPort
+from app.domain.ports.uow import UnitOfWorkPort
+
+# frames por requisição na variante de faixa
+MAX_RANGE_FRAMES = 10_000
+
+
+def frame_name(number: int) -> str:
+    return f"{number:08d}.jpg"
+
+
+def _frame_number(name: str) -> Optional[int]:
+    stem, _, ext = name.partition(".")
+    return int(stem) if ext == "jpg" and stem.isdigit() else None
+
+
+class GetFramesService:
+    """Frames avulsos (ou uma faixa) do artefato de um job concluído."""
+
+    def __init__(self, uow: UnitOfWorkPort, index: FrameIndexPort):
+        self.uow = uow
+        self.index = index
+
+    def _artifact(self, job_id: str, user_id: str) -> Tuple[str, str]:
+        with self.uow:
+            job = self.uow.jobs.get(job_id)
+            if not job or job.user_id != user_id:
+                raise KeyError("Job not found")
+            if job.status != JobStatus.DONE or not job.artifact_ref:
+                raise ValueError("Artifact not ready")
+            if job.output != "frames":
+                raise ValueError("Frame access requires output=frames")
+            if not self.index.supports(job.archive_format):
+                raise ValueError(
+                    f"Frame access not supported for format: {job.archive_format}"
+                )
+            return job.artifact_ref, job.archive_format
+
+    def __call__(self, *, job_id: str, user_id: str, number: int) -> bytes:
+        ref, fmt = self._artifact(job_id, user_id)
+        data = self.index.read(ref, fmt, frame_name(number))
+        if data is None:
+            raise KeyError("Frame not found")
+        return data
+
+    def range(
+        self, *, job_id: str, user_id: str, start: int, end: int
+    ) -> ArchiveStreamPort:
+        """ZIP com os frames de número ``start`` a ``end`` (inclusive) que
+        existem no artefato; frames descartados simplesmente faltam."""
+        if start < 1 or end < start:
+            raise ValueError("Invalid frame range")
+        if end - start + 1 > MAX_RANGE_FRAMES:
+            raise ValueError(f"Frame range larger than {MAX_RANGE_FRAMES}")
+        ref, fmt = self._artifact(job_id, user_id)
+        names = sorted(
+            name
+            for name in self.index.names(ref, fmt)
+            if start <= (_frame_number(name) or 0) <= end
+        )
+        if not names:
+            raise KeyError("Frame not found")
+        return self.index.stream(ref, fmt, names)
@@ -0,0 +1,117 @@
+"""Relay do outbox: entrega as mensagens gravadas junto com o estado.
+
+Cada rodada reivindica um lote de um tópico (com lease, para que outros relays
+não o peguem), entrega fora de qualquer transação e, numa segunda transação,
+apaga o que foi aceito e reagenda o resto com backoff exponencial. Um relay que
+morre no meio só atrasa o lote até a lease vencer: a entrega é pelo menos uma
+vez.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from app.domain.entities import OutboxMessage
+from app.domain.ports.uow import UnitOfWorkPort
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[List[OutboxMessage]], List[Optional[str]]]
+
+
+class RelayOutboxService:
+    def __init__(
+        self,
+        uow: UnitOfWorkPort,
+        topic: str,
+        deliver: Deliver,
+        batch_size: int = 100,
+        lease: float = 60.0,
+        max_attempts: Optional[int] = 10,
+        retry_base: float = 2.0,
+        retry_max: float = 300.0,
+        stats: Optional[Callable[[], dict]] = None,
+        stats_interval: float = 60.0,
+    ):
+        self.uow = uow
+        self.topic = topic
+        self.deliver = deliver
+        self.batch_size = max(1, batch_size)
+        # tempo que um lote fica escondido enquanto é entregue
+        self.lease = lease
+        # None: tenta para sempre; senão a mensagem é descartada (com log)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        # métricas do destino (ex.: pool do publicador) logadas a cada intervalo
+        self.stats = stats
+        self.stats_interval = stats_interval
+
+    def _delay(self, attempts: int) -> float:
+        return min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+
+    def __call__(self) -> int:
+        """Uma rodada; devolve quantas mensagens foram tratadas."""
+        with self.uow:
+            messages = self.uow.outbox.claim(self.topic, self.batch_size, self.lease)
+            self.uow.commit()
+        if not messages:
+            return 0
+
+        try:
+            errors = self.deliver(messages)
+        except Exception as e:
+            logger.exception("falha ao entregar lote do outbox %s", self.topic)
+            errors = [f"{type(e).__name__}: {e}"] * len(messages)
+
+        now = datetime.utcnow()
+        finished = []
+        with self.uow:
+            for message, error in zip(messages, errors):
+                if error is None:
+                    finished.append(message.id)
+                    continue
+                attempts = message.attempts + 1
+                if self.max_attempts and attempts >= self.max_attempts:
+                    logger.error(
+                        "outbox %s: mensagem %s descartada após %d tentativas: %s",
+                        self.topic,
+                        message.id,
+                        attempts,
+                        error,
+                    )
+                    finished.append(message.id)
+                    continue
+                self.uow.outbox.reschedule(
+                    message.id,
+                    attempts,
+                    now + timedelta(seconds=self._delay(attempts)),
+                    error,
+                )
+            self.uow.outbox.delete(finished)
+            self.uow.commit()
+        return len(messages)
+
+    def _log_stats(self) -> None:
+        try:
+            logger.info("outbox %s: %s", self.topic, self.stats())
+        except Exception:
+            logger.exception("falha ao ler as métricas do outbox %s", self.topic)
+
+    def run(self, stop: threading.Event, poll_interval: float = 1.0) -> None:
+        log_stats = self.stats is not None and self.stats_interval > 0
+        next_stats = time.monotonic() + self.stats_interval
+        while not stop.is_set():
+            if log_stats and time.monotonic() >= next_stats:
+                self._log_stats()
+                next_stats = time.monotonic() + self.stats_interval
+            try:
+                handled = self()
+            except Exception:
+                logger.exception("falha no relay do outbox %s", self.topic)
+                handled = 0
+            # lote cheio: provavelmente há mais pendente, segue sem esperar
+            if handled < self.batch_size:
+                stop.wait(poll_interval)
@@ -1,13 +1,104 @@
+import json
+import logging
 import os
 import shutil
+import threading
+import time
 import zipfile
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Optional
-from app.domain.entities import JobStatus
+from typing import Dict, List, Optional, Set
+from app.domain.entities import (
+    DEFAULT_SCENE_THRESHOLD,
+    JobStatus,
+    SheetLayout,
+    Video,
+    VideoJob,
+)
+from app.domain.errors import JobCancelled, JobDeferred
 from app.domain.ports.uow import UnitOfWorkPort
 from app.domain.ports.storage import StoragePort
-from app.domain.ports.video_processor import VideoProcessorPort
+from app.domain.ports.video_processor import ProgressCallback, VideoProcessorPort
 from app.domain.ports.notification import NotificationPort
+from app.domain.ports.artifact_cache import ArtifactCachePort
+from app.domain.ports.archive import ArchiverPort, ArchiveWriterPort
+from app.domain.ports.frame_filter import FrameFilterPort
+
+logger = logging.getLogger(__name__)
+
+
+class _CancelWatcher:
+    """Consulta o status dos jobs a cada ``interval`` segundos numa thread
+    própria (com um uow só dela). ``cancelled`` acumula os jobs cancelados e
+    ``event`` arma quando todos foram: só então a decodificação é inútil.
+    Ao sair, qualquer desfecho do bloco vira JobCancelled se o evento armou."""
+
+    def __init__(self, uow: UnitOfWorkPort, job_ids: List[str], interval: float):
+        self.uow = uow
+        self.job_ids = list(job_ids)
+        self.interval = interval
+        self.cancelled: Set[str] = set()
+        self.event = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            for job_id in self.job_ids:
+                if job_id in self.cancelled:
+                    continue
+                try:
+                    with self.uow:
+                        job = self.uow.jobs.get(job_id)
+                except Exception:
+                    logger.warning("falha ao consultar cancelamento job=%s", job_id)
+                    continue
+                if job is not None and job.status == JobStatus.CANCELLED:
+                    self.cancelled.add(job_id)
+            if len(self.cancelled) == len(self.job_ids):
+                self.event.set()
+                return
+
+    def __enter__(self) -> "_CancelWatcher":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        if self.event.is_set() and not isinstance(exc, JobCancelled):
+            raise JobCancelled() from exc
+        return False
+
+
+class _LeaseKeeper:
+    """Renova a lease do líder a cada terço do ttl numa thread própria. Se o
+    worker morrer a renovação para, a lease expira e um seguidor assume."""
+
+    def __init__(self, uow: UnitOfWorkPort, key: str, holder: str, ttl: float):
+        self.uow = uow
+        self.key = key
+        self.holder = holder
+        self.ttl = ttl
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                with self.uow:
+                    if not self.uow.leases.renew(self.key, self.holder, self.ttl):
+                        logger.warning("lease %s perdida por %s", self.key, self.holder)
+                    self.uow.commit()
+            except Exception:
+                logger.warning("falha ao renovar lease %s", self.key)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
 
 
 class ProcessVideoService:
@@ -17,23 +108,458 @@ class ProcessVideoService:
         storage: StoragePort,
         processor: VideoProcessorPort,
         notifier: NotificationPort,
+        cache: Optional[ArtifactCachePort] = None,
+        streaming: bool = False,
+        archiver: Optional[ArchiverPort] = None,
+        progress_interval: float = 5.0,
+        cancel_uow: Optional[UnitOfWorkPort] = None,
+        cancel_poll_interval: float = 1.0,
+        fanout_max_variants: int = 1,
+        lease_uow: Optional[UnitOfWorkPort] = None,
+        lease_ttl: float = 30.0,
+        coalesce_poll_interval: float = 1.0,
+        coalesce_max_wait: Optional[float] = None,
+        frame_filter: Optional[FrameFilterPort] = None,
+        sheet_layout: Optional[SheetLayout] = None,
     ):
         self.uow = uow
         self.storage = storage
         self.processor = processor
         self.notifier = notifier
+        self.cache = cache
+        # streaming: frames vão do pipe do ffmpeg direto para o ZIP, sem JPEGs no disco
+        self.streaming = streaming
+        self.archiver = archiver
+        # no máximo uma gravação de progresso por intervalo (segundos)
+        self.progress_interval = progress_interval
+        # uow separado para a thread que vigia cancelamentos; None desliga
+        self.cancel_uow = cancel_uow
+        self.cancel_poll_interval = cancel_poll_interval
+        # >1: jobs na fila para o mesmo vídeo são servidos pela mesma decodificação
+        self.fanout_max_variants = fanout_max_variants
+        # uow da thread que renova a lease do líder; None desliga a coalescência
+        self.lease_uow = lease_uow
+        self.lease_ttl = lease_ttl
+        self.coalesce_poll_interval = coalesce_poll_interval
+        # seguidor que espera mais que isso devolve o job à fila (JobDeferred)
+        self.coalesce_max_wait = coalesce_max_wait
+        # etapa entre a extração e o empacotamento; exige frames em disco
+        self.frame_filter = frame_filter
+        # grade dos jobs com output="sheet"
+        self.sheet_layout = sheet_layout or SheetLayout()
+
+    def _variant(self, job: VideoJob) -> str:
+        """Parâmetros que determinam os frames extraídos."""
+        if job.mode == "scene":
+            variant = f"scene{job.scene_threshold}-{job.min_fps}-{job.max_fps}"
+        else:
+            variant = f"fps{job.fps}"
+        if job.output == "sheet":
+            layout = self.sheet_layout
+            variant += (
+                f"-sheet{layout.columns}x{layout.rows}"
+                f"-{layout.tile_width}x{layout.tile_height}"
+            )
+        if self.frame_filter is not None:
+            variant += f"-{self.frame_filter.key}"
+        return variant
+
+    def _cache_key(self, video: Video, job: VideoJob) -> Optional[str]:
+        if self.cache is None or not video.content_hash:
+            return None
+        return f"{video.content_hash}-{self._variant(job)}-{job.archive_format}"
+
+    def _artifact_name(self, job: VideoJob) -> str:
+        ext = self.archiver.extension(job.archive_format) if self.archiver else "zip"
+        return f"frames_{job.id}.{ext}"
+
+    def _open_archive(self, job: VideoJob, path: str) -> ArchiveWriterPort:
+        if self.archiver is None:
+            # sem archiver configurado: ZIP deflate, o formato histórico
+            return zipfile.ZipFile(
+                path, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True
+            )
+        return self.archiver.open(job.archive_format, path)
+
+    def _progress_writer(self, jobs: List[VideoJob]) -> ProgressCallback:
+        last_write: Optional[float] = None
+
+        def _on_progress(percent: float, eta: Optional[float]) -> None:
+            nonlocal last_write
+            now = time.monotonic()
+            if last_write is not None and now - last_write < self.progress_interval:
+                return
+            last_write = now
+            try:
+                for job in jobs:
+                    job.progress = round(percent, 1)
+                    job.eta_seconds = None if eta is None else round(eta, 1)
+                    self.uow.jobs.update_progress(job.id, job.progress, job.eta_seconds)
+                self.uow.commit()
+            except Exception:
+                # progresso é informativo: não derruba a extração
+                logger.warning("falha ao gravar progresso job=%s", jobs[0].id)
+
+        return _on_progress
+
+    def _cancel_watch(self, jobs: List[VideoJob]):
+        if self.cancel_uow is None:
+            return nullcontext(None)
+        return _CancelWatcher(
+            self.cancel_uow, [j.id for j in jobs], self.cancel_poll_interval
+        )
+
+    def _lease_key(self, video: Video, job: VideoJob) -> Optional[str]:
+        if self.lease_uow is None:
+            return None
+        source = video.content_hash or f"video-{video.id}"
+        return f"{source}-{self._variant(job)}-{job.archive_format}"
+
+    def _finish_as_follower(self, job: VideoJob, leader: VideoJob) -> None:
+        job.artifact_ref = leader.artifact_ref
+        job.frame_count = leader.frame_count
+        job.dropped_frames = leader.dropped_frames
+        job.progress = 100.0
+        job.eta_seconds = 0.0
+        job.status = JobStatus.DONE
+        job.updated_at = datetime.utcnow()
+        if not self.uow.jobs.update(job):
+            # cancelado enquanto esperava o líder
+            self.uow.commit()
+            return
+        self._notify_done(job)
+        self.uow.commit()
+        logger.info("job %s concluído com o artefato de %s", job.id, leader.id)
+
+    # notificações entram antes do commit do status final: com o OutboxNotifier
+    # as duas coisas são gravadas na mesma transação
+    def _notify_done(self, job: VideoJob) -> None:
+        self.notifier.notify(
+            user_id=job.user_id,
+            job_id=job.id,
+            status="success",
+            video_url=job.artifact_ref,
+        )
+
+    def _notify_failed(self, job: VideoJob, message: str) -> None:
+        self.notifier.notify(
+            user_id=job.user_id,
+            job_id=job.id,
+            status="error",
+            error_message=message,
+        )
+
+    def _mark_failed(self, jobs: List[VideoJob], message: str) -> None:
+        for j in jobs:
+            j.status = JobStatus.ERROR
+            j.error = message
+            j.updated_at = datetime.utcnow()
+            if self.uow.jobs.update(j):
+                self._notify_failed(j, message)
+
+    def abandon(self, *, job_id: str, reason: str) -> None:
+        """Fecha como ERROR um job que ficou RUNNING porque o processo que o
+        rodava morreu (ex.: limite rígido de tempo da task)."""
+        with self.uow:
+            job = self.uow.jobs.get(job_id)
+            if job is None or job.status != JobStatus.RUNNING:
+                return
+            self._mark_failed([job], reason)
+            self.uow.commit()
+
+    def _defer(self, job: VideoJob) -> None:
+        job.status = JobStatus.QUEUED
+        job.updated_at = datetime.utcnow()
+        if not self.uow.jobs.update(job):
+            # cancelado enquanto esperava: não há o que reagendar
+            self.uow.commit()
+            return
+        self.uow.commit()
+        logger.info("job %s volta para a fila esperando o líder", job.id)
+        raise JobDeferred(self.lease_ttl)
+
+    def _coalesce(self, job: VideoJob, key: str) -> Optional[List[VideoJob]]:
+        """Lidera ou segue o trabalho ``key``.
+
+        Seguidor: espera o líder e termina com o artefato dele. Se o líder
+        falha, é cancelado ou some (lease expirada), o seguidor assume a
+        lease e roda ele mesmo. Se a espera passa de ``coalesce_max_wait``,
+        o job volta para a fila e JobDeferred libera o slot do worker.
+        Retorna None quando o job já foi resolvido como seguidor; como líder,
+        retorna os jobs de um líder morto que passam a ser servidos junto."""
+        leader_id: Optional[str] = None
+        started = time.monotonic()
+        while True:
+            acquired = self.uow.leases.acquire(key, job.id, self.lease_ttl)
+            self.uow.commit()
+            leader = self.uow.jobs.get(leader_id) if leader_id else None
+            if leader is not None and leader.status == JobStatus.DONE:
+                # o líder terminou entre a última consulta e o acquire
+                if acquired:
+                    self.uow.leases.release(key, job.id)
+                    self.uow.commit()
+                self._finish_as_follower(job, leader)
+                return None
+            if acquired:
+                if leader is not None and leader.status == JobStatus.RUNNING:
+                    logger.warning(
+                        "lease %s expirou com %s em execução; assumindo", key, leader.id
+                    )
+                    return [leader]
+                return []
+
+            lease = self.uow.leases.get(key)
+            if lease is not None and lease.holder != leader_id:
+                leader_id = lease.holder
+                logger.info("job %s segue %s (key=%s)", job.id, leader_id, key)
+            leader = self.uow.jobs.get(leader_id) if leader_id else None
+            if leader is not None and leader.status == JobStatus.DONE:
+                self._finish_as_follower(job, leader)
+                return None
+            own = self.uow.jobs.get(job.id)
+            if own is None or own.status == JobStatus.CANCELLED:
+                return None
+            if (
+                self.coalesce_max_wait is not None
+                and time.monotonic() - started >= self.coalesce_max_wait
+            ):
+                self._defer(job)
+                return None
+            if leader is not None:
+                self.uow.jobs.update_progress(
+                    job.id, leader.progress, leader.eta_seconds
+                )
+                self.uow.commit()
+            time.sleep(self.coalesce_poll_interval)
+
+    def _claim_siblings(self, job: VideoJob, video: Video) -> List[VideoJob]:
+        """Assume jobs ainda na fila para o mesmo vídeo (ou mesmo conteúdo).
+        O claim é atômico: se outro worker levou o job antes, ele fica de fora."""
+        if self.fanout_max_variants <= 1 or job.mode != "fps":
+            return []
+        claimed = []
+        candidates = self.uow.jobs.list_queued_siblings(
+            job.id, job.video_id, video.content_hash, self.fanout_max_variants - 1
+        )
+        for sibling in candidates:
+            # o split só serve ramos de fps fixo
+            if sibling.mode == "fps" and self.uow.jobs.claim(sibling.id):
+                sibling.status = JobStatus.RUNNING
+                claimed.append(sibling)
+        if claimed:
+            self.uow.commit()
+            logger.info(
+                "job %s serve também %s", job.id, ", ".join(j.id for j in claimed)
+            )
+        return claimed
+
+    def _can_stream(self, job: VideoJob) -> bool:
+        # filtro e mosaicos precisam dos frames em disco
+        return self.streaming and self.frame_filter is None and job.output == "frames"
+
+    def _archive_sheets(
+        self,
+        job: VideoJob,
+        frames_dir: str,
+        archive_path: str,
+        times: Optional[Dict[str, float]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        """Empacota os mosaicos e um ``index.json`` com a célula e o instante
+        de cada frame. Sem ``times`` (modo fps) o instante vem do número do
+        frame: o n-ésimo slot fica em (n - 1) / fps."""
+        names = sorted(f for f in os.listdir(frames_dir) if f.lower().endswith(".jpg"))
+        sheets_dir = os.path.join(os.path.dirname(archive_path), f"sheets_{job.id}")
+        layout = self.sheet_layout
+        self.processor.tile_frames(
+            [os.path.join(frames_dir, name) for name in names],
+            sheets_dir,
+            layout,
+            cancel=cancel,
+        )
+        index = []
+        for i, name in enumerate(names):
+            cell = i % layout.cells
+            if times is not None:
+                time_sec = times[name]
+            else:
+                time_sec = (int(os.path.splitext(name)[0]) - 1) / job.fps
+            index.append(
+                {
+                    "frame": name,
+                    "time": time_sec,
+                    "sheet": f"sheet_{i // layout.cells + 1:04d}.jpg",
+                    "x": cell % layout.columns * layout.tile_width,
+                    "y": cell // layout.columns * layout.tile_height,
+                    "width": layout.tile_width,
+                    "height": layout.tile_height,
+                }
+            )
+        with self._open_archive(job, archive_path) as archive:
+            for name in sorted(os.listdir(sheets_dir)):
+                archive.write(os.path.join(sheets_dir, name), arcname=name)
+            archive.writestr("index.json", json.dumps(index).encode("utf-8"))
+
+    def _archive_dir(
+        self,
+        job: VideoJob,
+        frames_dir: str,
+        archive_path: str,
+        extra: Optional[Dict[str, bytes]] = None,
+        times: Optional[Dict[str, float]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> None:
+        if job.output == "sheet":
+            self._archive_sheets(job, frames_dir, archive_path, times, cancel)
+            return
+        with self._open_archive(job, archive_path) as archive:
+            for root, _, files in os.walk(frames_dir):
+                for f in sorted(files):
+                    if f.lower().endswith((".jpg", ".jpeg", ".png")):
+                        abs_path = os.path.join(root, f)
+                        rel_path = os.path.relpath(abs_path, frames_dir)
+                        archive.write(abs_path, arcname=rel_path)
+            for name, data in (extra or {}).items():
+                archive.writestr(name, data)
+
+    def _filter_frames(
+        self, frames_dir: str, cancel: Optional[threading.Event] = None
+    ) -> int:
+        if self.frame_filter is None:
+            return 0
+        dropped = self.frame_filter.filter_dir(frames_dir, cancel)
+        logger.info("%d frames quase idênticos descartados em %s", dropped, frames_dir)
+        return dropped
+
+    def _extract_to_files(
+        self,
+        input_path: str,
+        temp_dir: str,
+        archive_path: str,
+        job: VideoJob,
+        dropped: Dict[str, int],
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        frame_count = self.processor.extract_frames(
+            input_path,
+            temp_dir,
+            fps=job.fps,
+            on_progress=self._progress_writer([job]),
+            cancel=cancel,
+        )
+        if frame_count <= 0:
+            raise RuntimeError("No frames extracted")
+        dropped[job.id] = self._filter_frames(temp_dir, cancel)
+
+        self._archive_dir(job, temp_dir, archive_path, cancel=cancel)
+        return frame_count - dropped[job.id]
+
+    def _extract_streaming(
+        self,
+        input_path: str,
+        archive_path: str,
+        job: VideoJob,
+        cancel: Optional[threading.Event] = None,
+    ) -> int:
+        frame_count = 0
+        with self._open_archive(job, archive_path) as archive:
+            for frame in self.processor.iter_frames(
+                input_path,
+                fps=job.fps,
+                on_progress=self._progress_writer([job]),
+                cancel=cancel,
+            ):
+                frame_count += 1
+                archive.writestr(f"{frame_count:08d}.jpg", frame)
+        if frame_count <= 0:
+            raise RuntimeError("No frames extracted")
+        return frame_count
+
+    def _extract_scenes(
+        self,
+        input_path: str,
+        temp_dir: str,
+        archive_paths: Dict[str, str],
+        jobs: List[VideoJob],
+        dropped: Dict[str, int],
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, int]:
+        """Modo cena: os instantes escolhidos vão junto no arquivo, em
+        ``timestamps.json``. Todos os ``jobs`` têm os mesmos parâmetros."""
+        job = jobs[0]
+        frames_dir = os.path.join(temp_dir, "scenes")
+        timestamps = self.processor.extract_scenes(
+            input_path,
+            frames_dir,
+            job.scene_threshold or DEFAULT_SCENE_THRESHOLD,
+            min_fps=job.min_fps,
+            max_fps=job.max_fps,
+            on_progress=self._progress_writer(jobs),
+            cancel=cancel,
+        )
+        if not timestamps:
+            raise RuntimeError("No frames extracted")
+        removed = self._filter_frames(frames_dir, cancel)
+        index = [
+            {"file": f"{n:08d}.jpg", "time": t}
+            for n, t in enumerate(timestamps, 1)
+            if not removed or os.path.exists(os.path.join(frames_dir, f"{n:08d}.jpg"))
+        ]
+        extra = {"timestamps.json": json.dumps(index).encode("utf-8")}
+        times = {entry["file"]: entry["time"] for entry in index}
+        for j in jobs:
+            self._archive_dir(j, frames_dir, archive_paths[j.id], extra, times, cancel)
+            dropped[j.id] = removed
+        return {j.id: len(index) for j in jobs}
+
+    def _extract_fanout(
+        self,
+        input_path: str,
+        temp_dir: str,
+        archive_paths: Dict[str, str],
+        jobs: List[VideoJob],
+        dropped: Dict[str, int],
+        cancel: Optional[threading.Event] = None,
+    ) -> Dict[str, int]:
+        """Uma decodificação com um ramo por fps distinto; jobs com o mesmo
+        fps compartilham os frames e cada um ganha seu próprio arquivo."""
+        frames_dirs = {
+            fps: os.path.join(temp_dir, f"fps{fps}") for fps in {j.fps for j in jobs}
+        }
+        counts = self.processor.extract_frames_multi(
+            input_path,
+            frames_dirs,
+            on_progress=self._progress_writer(jobs),
+            cancel=cancel,
+        )
+        if any(counts.get(fps, 0) <= 0 for fps in frames_dirs):
+            raise RuntimeError("No frames extracted")
+        removed = {
+            fps: self._filter_frames(frames_dir, cancel)
+            for fps, frames_dir in frames_dirs.items()
+        }
+        for job in jobs:
+            self._archive_dir(
+                job, frames_dirs[job.fps], archive_paths[job.id], cancel=cancel
+            )
+            dropped[job.id] = removed[job.fps]
+        return {job.id: counts[job.fps] - removed[job.fps] for job in jobs}
 
     def __call__(self, *, job_id: str) -> None:
         with self.uow:
             job = self.uow.jobs.get(job_id)
             if not job:
                 return
-            job.status = JobStatus.RUNNING
-            self.uow.jobs.update(job)
+            if job.status != JobStatus.QUEUED:
+                # cancelado na fila ou já servido junto com outro job
+                logger.info("job %s está %s, ignorando", job_id, job.status.value)
+                return
+            if not self.uow.jobs.claim(job_id):
+                # outro worker assumiu o job entre a leitura e o claim
+                return
             self.uow.commit()
 
-        error_message: Optional[str] = None
-        final_status: JobStatus = JobStatus.ERROR
+        done: Set[str] = set()
 
         with self.uow:
             job = self.uow.jobs.get(job_id)
@@ -41,87 +567,149 @@ class ProcessVideoService:
                 return
             video = self.uow.videos.get(job.video_id)
             if not video:
-                job.status = JobStatus.ERROR
-                job.error = "Video not found"
-                self.uow.jobs.update(job)
+                self._mark_failed([job], "Video not found")
                 self.uow.commit()
-                try:
-                    self.notifier.notify(
-                        user_id=job.user_id,
-                        job_id=job.id,
-                        status="error",
-                        error_message="Video not found",
-                    )
-                except Exception:
-                    pass
                 return
 
+            lease_key = self._lease_key(video, job)
+            adopted: List[VideoJob] = []
+            if lease_key:
+                try:
+                    adopted = self._coalesce(job, lease_key)
+                except JobDeferred:
+                    raise
+                except Exception as e:
+                    # inclui o soft time limit do Celery: o job não fica RUNNING
+                    logger.exception("job %s falhou esperando o líder", job_id)
+                    self._mark_failed([job], str(e))
+                    self.uow.commit()
+                    return
+                if adopted is None:
+                    return
+            jobs = [job, *adopted, *self._claim_siblings(job, video)]
             input_path = self.storage.resolve_path(video.storage_ref)
             temp_dir = self.storage.make_temp_dir(prefix=job.id)
+            keeper = None
+            if lease_key:
+                keeper = _LeaseKeeper(self.lease_uow, lease_key, job.id, self.lease_ttl)
+                keeper.start()
 
             try:
-                frame_count = self.processor.extract_frames(
-                    input_path, temp_dir, fps=job.fps
-                )
-                if frame_count <= 0:
-                    raise RuntimeError("No frames extracted")
-
-                zip_path = os.path.join(temp_dir, f"frames_{job.id}.zip")
-                with zipfile.ZipFile(
-                    zip_path,
-                    mode="w",
-                    compression=zipfile.ZIP_DEFLATED,
-                    allowZip64=True,
-                ) as zf:
-                    for root, _, files in os.walk(temp_dir):
-                        for f in sorted(files):
-                            if f.lower().endswith((".jpg", ".jpeg", ".png")):
-                                abs_path = os.path.join(root, f)
-                                rel_path = os.path.relpath(abs_path, temp_dir)
-                                zf.write(abs_path, arcname=rel_path)
-
-                artifact_ref = self.storage.save_artifact(zip_path)
-                print("AQUI PORRA")
-                print(final_status)
-                job.frame_count = frame_count
-                job.artifact_ref = artifact_ref
-                job.status = JobStatus.DONE
-                job.updated_at = datetime.utcnow()
-                self.uow.jobs.update(job)
-                self.uow.commit()
+                archive_paths = {
+                    j.id: os.path.join(temp_dir, self._artifact_name(j)) for j in jobs
+                }
+                cache_keys = {j.id: self._cache_key(video, j) for j in jobs}
+                frame_counts: Dict[str, int] = {}
+                dropped: Dict[str, int] = {}
+                for j in jobs:
+                    key = cache_keys[j.id]
+                    hit = self.cache.fetch(key, archive_paths[j.id]) if key else None
+                    if hit is not None:
+                        frame_counts[j.id], dropped[j.id] = hit
+                cache_hits = set(frame_counts)
+                pending = [j for j in jobs if j.id not in cache_hits]
 
-                final_status = JobStatus.DONE
+                with self._cancel_watch(jobs) as watcher:
+                    cancel = watcher.event if watcher else None
+                    if pending and job.mode == "scene":
+                        frame_counts.update(
+                            self._extract_scenes(
+                                input_path,
+                                temp_dir,
+                                archive_paths,
+                                pending,
+                                dropped,
+                                cancel,
+                            )
+                        )
+                    elif len(pending) > 1:
+                        frame_counts.update(
+                            self._extract_fanout(
+                                input_path,
+                                temp_dir,
+                                archive_paths,
+                                pending,
+                                dropped,
+                                cancel,
+                            )
+                        )
+                    elif pending and self._can_stream(pending[0]):
+                        only = pending[0]
+                        frame_counts[only.id] = self._extract_streaming(
+                            input_path, archive_paths[only.id], only, cancel
+                        )
+                    elif pending:
+                        only = pending[0]
+                        frame_counts[only.id] = self._extract_to_files(
+                            input_path,
+                            temp_dir,
+                            archive_paths[only.id],
+                            only,
+                            dropped,
+                            cancel,
+                        )
+                # cancelados individualmente enquanto os irmãos seguiam
+                cancelled = watcher.cancelled if watcher else set()
+
+                for j in jobs:
+                    if j.id in cancelled:
+                        j.status = JobStatus.CANCELLED
+                        j.eta_seconds = None
+                        j.updated_at = datetime.utcnow()
+                        self.uow.jobs.update(j)
+                        continue
+                    artifact_ref = self.storage.save_artifact(archive_paths[j.id])
+                    key = cache_keys[j.id]
+                    if key and j.id not in cache_hits:
+                        try:
+                            self.cache.put(
+                                key,
+                                self.storage.resolve_path(artifact_ref),
+                                frame_counts[j.id],
+                                dropped.get(j.id, 0),
+                            )
+                        except Exception:
+                            logger.warning("falha ao gravar no cache key=%s", key)
+                    j.frame_count = frame_counts[j.id]
+                    j.dropped_frames = dropped.get(j.id, 0)
+                    j.artifact_ref = artifact_ref
+                    j.progress = 100.0
+                    j.eta_seconds = 0.0
+                    j.status = JobStatus.DONE
+                    j.updated_at = datetime.utcnow()
+                    if self.uow.jobs.update(j):
+                        done.add(j.id)
+                    else:
+                        # cancelado depois do watcher parar (ex.: no upload)
+                        logger.info("job %s cancelado antes de concluir", j.id)
+                # cancelados pelo próprio usuário: nada a notificar
+                for j in jobs:
+                    if j.id in done:
+                        self._notify_done(j)
+                self.uow.commit()
 
+            except JobCancelled:
+                logger.info("job %s cancelado durante o processamento", job_id)
+                for j in jobs:
+                    j.status = JobStatus.CANCELLED
+                    j.eta_seconds = None
+                    j.updated_at = datetime.utcnow()
+                    self.uow.jobs.update(j)
+                self.uow.commit()
             except Exception as e:
-                error_message = str(e)
-                job.status = JobStatus.ERROR
-                job.error = error_message
-                job.updated_at = datetime.utcnow()
-                self.uow.jobs.update(job)
+                self._mark_failed(jobs, str(e))
                 self.uow.commit()
             finally:
+                if keeper is not None:
+                    keeper.stop()
                 try:
                     shutil.rmtree(temp_dir, ignore_errors=True)
                 except Exception:
                     pass
-
-        try:
-            print("OpA")
-            print(final_status)
-            if final_status == JobStatus.DONE:
-                self.notifier.notify(
-                    user_id=job.user_id,
-                    job_id=job_id,
-                    status="success",
-                    video_url=artifact_ref,
-                )
-            else:
-                self.notifier.notify(
-                    user_id=job.user_id,
-                    job_id=job_id,
-                    status="error",
-                    error_message=error_message,
-                )
-        except Exception:
-            # logar um warning
-            pass
+                if lease_key:
+                    # só depois do status final: seguidores decidem por ele
+                    try:
+                        self.uow.leases.release(lease_key, job.id)
+                        self.uow.commit()
+                    except Exception:
+                        logger.warning("falha ao liberar lease %s", lease_key)
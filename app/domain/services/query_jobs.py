@@ -15,7 +15,13 @@ class GetJobStatusService:
                 "job_id": job.id,
                 "status": job.status,
                 "fps": job.fps,
+                "mode": job.mode,
+                "output": job.output,
+                "format": job.archive_format,
                 "frames": job.frame_count,
+                "dropped_frames": job.dropped_frames,
+                "progress": job.progress,
+                "eta_seconds": job.eta_seconds,
                 "artifact_ref": job.artifact_ref,
                 "error": job.error,
                 "created_at": job.created_at.isoformat(),
@@ -35,7 +41,13 @@ class ListJobsByUserService:
                     "job_id": j.id,
                     "status": j.status,
                     "fps": j.fps,
+                    "mode": j.mode,
+                    "output": j.output,
+                    "format": j.archive_format,
                     "frames": j.frame_count,
+                    "dropped_frames": j.dropped_frames,
+                    "progress": j.progress,
+                    "eta_seconds": j.eta_seconds,
                     "artifact_ref": j.artifact_ref,
                 }
                 for j in jobs
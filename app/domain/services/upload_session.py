@@ -0,0 +1,142 @@
+import re
+from typing import Optional
+from app.domain.entities import (
+    DEFAULT_ARCHIVE_FORMAT,
+    UploadSession,
+    validate_extraction,
+)
+from app.domain.ports.storage import ChunkedUploadPort
+from app.domain.services.enqueue_video import EnqueueVideoService
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_UPLOAD_SIZE = 20 * 1024**3
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _session_view(session: UploadSession) -> dict:
+    return {
+        "upload_id": session.id,
+        "filename": session.filename,
+        "size": session.size,
+        "chunk_size": session.chunk_size,
+        "total_chunks": session.total_chunks,
+        "received_ranges": session.received_ranges(),
+        "missing_chunks": session.missing_chunks(),
+        "complete": session.is_complete,
+        "sha256": session.content_hash,
+    }
+
+
+def _get_owned(storage: ChunkedUploadPort, upload_id: str, user_id: str):
+    session = storage.get_upload_session(upload_id)
+    if not session or session.user_id != user_id:
+        raise KeyError("Upload session not found")
+    return session
+
+
+class CreateUploadSessionService:
+    def __init__(
+        self, storage: ChunkedUploadPort, max_size: int = DEFAULT_MAX_UPLOAD_SIZE
+    ):
+        self.storage = storage
+        # o arquivo é pré-alocado na criação: o limite vem antes do fallocate
+        self.max_size = max_size
+
+    def __call__(
+        self,
+        *,
+        user_id: str,
+        filename: str,
+        size: int,
+        chunk_size: int | None = None,
+        sha256: str | None = None,
+    ) -> dict:
+        if size <= 0:
+            raise ValueError("size must be positive")
+        if size > self.max_size:
+            raise ValueError(f"size must be at most {self.max_size} bytes")
+        if sha256 is not None:
+            sha256 = sha256.lower()
+            if not _SHA256_RE.match(sha256):
+                raise ValueError("sha256 must be 64 hex characters")
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(
+                f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE}"
+            )
+        session = self.storage.create_upload_session(
+            user_id=user_id,
+            filename=filename,
+            size=size,
+            chunk_size=chunk_size,
+            content_hash=sha256,
+        )
+        return _session_view(session)
+
+
+class GetUploadSessionService:
+    def __init__(self, storage: ChunkedUploadPort):
+        self.storage = storage
+
+    def __call__(self, *, upload_id: str, user_id: str) -> dict:
+        return _session_view(_get_owned(self.storage, upload_id, user_id))
+
+
+class UploadChunkService:
+    def __init__(self, storage: ChunkedUploadPort):
+        self.storage = storage
+
+    def __call__(
+        self, *, upload_id: str, user_id: str, index: int, data: bytes
+    ) -> dict:
+        session = _get_owned(self.storage, upload_id, user_id)
+        if not 0 <= index < session.total_chunks:
+            raise ValueError("Chunk index out of range")
+        expected = session.chunk_length(index)
+        if len(data) != expected:
+            raise ValueError(f"Chunk {index} must have {expected} bytes")
+
+        self.storage.write_upload_chunk(upload_id, index, data)
+        session.received_chunks.append(index)
+        return _session_view(session)
+
+
+class CompleteUploadSessionService:
+    def __init__(self, storage: ChunkedUploadPort, enqueue: EnqueueVideoService):
+        self.storage = storage
+        self.enqueue = enqueue
+
+    def __call__(
+        self,
+        *,
+        upload_id: str,
+        user_id: str,
+        fps: int = 1,
+        archive_format: str = DEFAULT_ARCHIVE_FORMAT,
+        mode: str = "fps",
+        scene_threshold: Optional[float] = None,
+        min_fps: Optional[float] = None,
+        max_fps: Optional[float] = None,
+        output: str = "frames",
+    ) -> str:
+        validate_extraction(mode, scene_threshold, min_fps, max_fps, output)
+        session = _get_owned(self.storage, upload_id, user_id)
+        if not session.is_complete:
+            raise ValueError("Upload incomplete")
+
+        stored = self.storage.finalize_upload_session(upload_id)
+        return self.enqueue.enqueue_stored(
+            user_id=user_id,
+            storage_ref=stored.ref,
+            filename=session.filename,
+            fps=fps,
+            content_hash=stored.content_hash,
+            archive_format=archive_format,
+            mode=mode,
+            scene_threshold=scene_threshold,
+            min_fps=min_fps,
+            max_fps=max_fps,
+            output=output,
+        )
@@ -1,11 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from app.domain.errors import AuthError
 from app.adapters.driver.api.controllers import router as api_router
+from app.config import container
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # cada worker do uvicorn abre as conexões antes do primeiro request
+    container.startup()
+    try:
+        yield
+    finally:
+        container.shutdown()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Video Service")
+    app = FastAPI(title="Video Service", lifespan=lifespan)
 
     @app.exception_handler(AuthError)
     async def auth_error_handler(_, exc: AuthError):
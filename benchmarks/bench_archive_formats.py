@@ -0,0 +1,88 @@
+"""Compara tempo de empacotamento e tamanho final por formato de arquivo.
+
+Gera um vídeo de teste com o `testsrc2` do ffmpeg, extrai os frames uma vez e
+empacota o mesmo conjunto em cada formato suportado pelo Archiver.
+
+    python -m benchmarks.bench_archive_formats --duration 60 --fps 5
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from app.adapters.driven.archive.writers import Archiver
+from app.adapters.driven.media.ffmpeg_processor import FFmpegVideoProcessor
+
+
+def make_test_video(path: str, duration: int, size: str) -> None:
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=duration={duration}:size={size}:rate=30",
+            "-c:v",
+            "libx264",
+            "-pix_fmt",
+            "yuv420p",
+            path,
+        ],
+        check=True,
+    )
+
+
+def bench(frames_dir: str, out_dir: str, repeat: int) -> list[tuple[str, float, int]]:
+    archiver = Archiver()
+    frames = sorted(os.listdir(frames_dir))
+    rows = []
+    for fmt in archiver.formats():
+        path = os.path.join(out_dir, f"bench.{archiver.extension(fmt)}")
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with archiver.open(fmt, path) as archive:
+                for name in frames:
+                    archive.write(os.path.join(frames_dir, name), arcname=name)
+            best = min(best, time.perf_counter() - start)
+        rows.append((fmt, best, os.path.getsize(path)))
+        os.remove(path)
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=int, default=30)
+    parser.add_argument("--fps", type=int, default=5)
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if shutil.which("ffmpeg") is None:
+        raise SystemExit("ffmpeg não encontrado no PATH")
+
+    work = tempfile.mkdtemp(prefix="bench_archive_")
+    try:
+        video = os.path.join(work, "input.mp4")
+        frames_dir = os.path.join(work, "frames")
+        make_test_video(video, args.duration, args.size)
+        count = FFmpegVideoProcessor().extract_frames(video, frames_dir, fps=args.fps)
+        raw = sum(
+            os.path.getsize(os.path.join(frames_dir, f)) for f in os.listdir(frames_dir)
+        )
+        print(f"{count} frames, {raw / 1e6:.1f} MB de JPEG ({args.size})")
+        print(f"{'formato':<12}{'tempo (s)':>12}{'tamanho (MB)':>15}{'razão':>9}")
+        for fmt, secs, size in bench(frames_dir, work, args.repeat):
+            print(f"{fmt:<12}{secs:>12.3f}{size / 1e6:>15.2f}{size / raw:>9.3f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
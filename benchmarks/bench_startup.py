@@ -0,0 +1,79 @@
+"""Custo de subir um processo e de montar os serviços a cada request/task.
+
+Em processos novos (como um worker do uvicorn ou um filho do Celery), mede o
+import de ``app.main`` e do módulo de tasks; no processo atual, mede quanto
+custa cada ``get_*_service()`` depois do primeiro uso. ``--database-url``
+aponta para o Postgres de verdade (o padrão é um SQLite temporário).
+
+    python -m benchmarks.bench_startup --database-url postgresql+psycopg2://...
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _import_time(module: str, env: dict, runs: int) -> float:
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - t)"
+    )
+    samples = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+    return statistics.median(samples)
+
+
+def _per_call(factory, n: int) -> float:
+    factory()
+    start = time.perf_counter()
+    for _ in range(n):
+        factory()
+    return (time.perf_counter() - start) / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("-n", type=int, default=2000)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_startup_")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{work}/app.db"
+    os.environ["STORAGE_DIR"] = os.path.join(work, "data")
+    env = dict(os.environ)
+
+    print(f"{'import':<40}{'mediana (ms)':>14}")
+    for module in ("app.main", "app.adapters.driver.worker.tasks"):
+        print(f"{module:<40}{_import_time(module, env, args.runs) * 1e3:>14.1f}")
+
+    from app.config import container
+
+    print(f"\n{'serviço':<40}{'por chamada (µs)':>18}")
+    for name in (
+        "get_enqueue_service",
+        "get_status_service",
+        "get_upload_chunk_service",
+        "get_process_service",
+        "get_auth_gateway",
+    ):
+        per_call = _per_call(getattr(container, name), args.n)
+        print(f"{name:<40}{per_call * 1e6:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Latência de criação e busca de arquivos: diretório plano vs particionado.
+
+Cria ``--files`` arquivos vazios em cada layout (plano: ``root/<id>``;
+particionado: ``root/ab/cd/<id>``, como no LocalStorage) e mede, por operação,
+a criação e o ``stat`` de ids existentes e inexistentes. Use ``--dir`` para
+rodar no volume compartilhado de verdade.
+
+    python -m benchmarks.bench_storage_layout --files 1000000 --dir /mnt/shared
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from typing import Callable, List
+from uuid import uuid4
+
+from app.adapters.driven.storage.local_storage import shard_path
+
+
+def flat_path(root: str, item_id: str) -> str:
+    return os.path.join(root, item_id)
+
+
+def _percentiles(samples: List[float]) -> tuple[float, float, float]:
+    samples.sort()
+    n = len(samples)
+    return samples[n // 2], samples[int(n * 0.99)], samples[-1]
+
+
+def bench(
+    root: str, path_for: Callable[[str, str], str], ids: List[str], lookups: int
+) -> dict:
+    create = []
+    for item_id in ids:
+        path = path_for(root, item_id)
+        start = time.perf_counter()
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_WRONLY | os.O_EXCL)
+        except FileNotFoundError:
+            # primeiro arquivo do shard: o mkdir entra na conta da criação
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd = os.open(path, os.O_CREAT | os.O_WRONLY | os.O_EXCL)
+        os.close(fd)
+        create.append(time.perf_counter() - start)
+
+    hit, miss = [], []
+    for item_id in random.sample(ids, min(lookups, len(ids))):
+        path = path_for(root, item_id)
+        start = time.perf_counter()
+        os.stat(path)
+        hit.append(time.perf_counter() - start)
+    for _ in range(lookups):
+        path = path_for(root, uuid4().hex)
+        start = time.perf_counter()
+        os.path.exists(path)
+        miss.append(time.perf_counter() - start)
+    return {
+        "criação": _percentiles(create),
+        "busca (existe)": _percentiles(hit),
+        "busca (não existe)": _percentiles(miss),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--dir", default=None, help="onde criar os arquivos")
+    args = parser.parse_args()
+
+    ids = [uuid4().hex for _ in range(args.files)]
+    work = tempfile.mkdtemp(prefix="bench_layout_", dir=args.dir)
+    try:
+        print(f"{args.files} arquivos, {args.lookups} buscas em {work}")
+        print(
+            f"{'layout':<14}{'operação':<20}{'p50 (µs)':>10}{'p99 (µs)':>10}{'máx (µs)':>11}"
+        )
+        for name, path_for in (("plano", flat_path), ("particionado", shard_path)):
+            root = os.path.join(work, name)
+            os.makedirs(root)
+            for op, (p50, p99, worst) in bench(
+                root, path_for, ids, args.lookups
+            ).items():
+                print(
+                    f"{name:<14}{op:<20}{p50 * 1e6:>10.1f}{p99 * 1e6:>10.1f}"
+                    f"{worst * 1e6:>11.1f}"
+                )
+            shutil.rmtree(root)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
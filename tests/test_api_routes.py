@@ -1,6 +1,8 @@
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from app.adapters.driven.storage.local_storage import LocalStorage
 from app.adapters.driver.api.controllers import router as api_router
 import app.adapters.driver.api.controllers as routes_module
 from app.adapters.driver.api.dependencies import get_current_user
@@ -23,7 +25,7 @@ def test_enqueue_video_202(monkeypatch):
     calls = {}
 
     def fake_enqueue_service():
-        def _svc(user_id, file_stream, filename, fps):
+        def _svc(user_id, file_stream, filename, fps, archive_format, **options):
             calls["args"] = {
                 "user_id": user_id,
                 "filename": filename,
@@ -51,6 +53,32 @@ def test_enqueue_video_202(monkeypatch):
     assert calls["args"]["peek_bytes"] == b"\x00\x01\x02\x03"
 
 
+def test_enqueue_video_passes_spooled_stream_not_buffered_bytes(monkeypatch):
+    import io
+
+    calls = {}
+    payload = b"\xab" * (3 * 1024 * 1024)
+
+    def fake_enqueue_service():
+        def _svc(user_id, file_stream, filename, fps, archive_format, **options):
+            calls["is_bytesio"] = isinstance(file_stream, io.BytesIO)
+            calls["size"] = sum(
+                len(c) for c in iter(lambda: file_stream.read(65536), b"")
+            )
+            return "job-big"
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_enqueue_service", fake_enqueue_service)
+
+    client = TestClient(make_app())
+    resp = client.post("/videos", files={"file": ("big.mp4", payload, "video/mp4")})
+
+    assert resp.status_code == 202
+    assert calls["is_bytesio"] is False
+    assert calls["size"] == len(payload)
+
+
 def test_get_status_ok(monkeypatch):
     def fake_status_service():
         def _svc(job_id, user_id):
@@ -87,6 +115,30 @@ def test_get_status_not_found_404(monkeypatch):
     assert resp.json()["detail"] == "Process not found"
 
 
+def test_cancel_job_routes(monkeypatch):
+    def fake_cancel_service():
+        def _svc(job_id, user_id):
+            if job_id == "missing":
+                raise KeyError("Job not found")
+            if job_id == "done":
+                raise ValueError("Job already finished")
+            assert user_id == "u-1"
+            return {"job_id": job_id, "status": "cancelled"}
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_cancel_service", fake_cancel_service)
+    client = TestClient(make_app(user_id="u-1"))
+
+    resp = client.delete("/videos/job-1")
+    assert resp.status_code == 202
+    assert resp.json() == {"job_id": "job-1", "status": "cancelled"}
+    assert client.delete("/videos/missing").status_code == 404
+    resp = client.delete("/videos/done")
+    assert resp.status_code == 409
+    assert resp.json()["detail"] == "Job already finished"
+
+
 def test_list_jobs_ok(monkeypatch):
     def fake_list_jobs_service():
         def _svc(user_id):
@@ -146,12 +198,10 @@ def test_download_404_when_artifact_missing(tmp_path, monkeypatch):
 
         return _svc
 
-    class FakeStorage:
-        def resolve_path(self, ref: str) -> str:
-            return ref
-
     monkeypatch.setattr(routes_module, "get_status_service", fake_status_service)
-    monkeypatch.setattr(routes_module, "get_storage", lambda: FakeStorage())
+    monkeypatch.setattr(
+        routes_module, "get_storage", lambda: LocalStorage(str(tmp_path))
+    )
 
     app = make_app()
     client = TestClient(app)
@@ -172,12 +222,10 @@ def test_download_success(tmp_path, monkeypatch):
 
         return _svc
 
-    class FakeStorage:
-        def resolve_path(self, ref: str) -> str:
-            return ref
-
     monkeypatch.setattr(routes_module, "get_status_service", fake_status_service)
-    monkeypatch.setattr(routes_module, "get_storage", lambda: FakeStorage())
+    monkeypatch.setattr(
+        routes_module, "get_storage", lambda: LocalStorage(str(tmp_path))
+    )
 
     app = make_app(user_id="bob")
     client = TestClient(app)
@@ -188,3 +236,256 @@ def test_download_success(tmp_path, monkeypatch):
     assert 'filename="out.zip"' in cd or "filename=out.zip" in cd
     assert resp.headers.get("content-type") == "application/zip"
     assert resp.content == zip_bytes
+
+
+def test_download_streams_zip_built_from_frame_pack(tmp_path, monkeypatch):
+    import io
+    import zipfile
+
+    from app.adapters.driven.archive.framepack import FramePackWriter
+
+    pack_path = tmp_path / "frames_job-5.fpk"
+    with FramePackWriter(str(pack_path)) as pack:
+        pack.writestr("00000001.jpg", b"frame-1")
+        pack.writestr("00000002.jpg", b"frame-2")
+
+    def fake_status_service():
+        def _svc(job_id, user_id):
+            return {"artifact_ref": str(pack_path), "format": "zip-lazy"}
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_status_service", fake_status_service)
+    monkeypatch.setattr(
+        routes_module, "get_storage", lambda: LocalStorage(str(tmp_path))
+    )
+    client = TestClient(make_app())
+
+    resp = client.get("/download/job-5")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/zip"
+    assert resp.headers["content-length"] == str(len(resp.content))
+    assert 'filename="frames_job-5.zip"' in resp.headers["content-disposition"]
+    with zipfile.ZipFile(io.BytesIO(resp.content)) as zf:
+        assert zf.read("00000002.jpg") == b"frame-2"
+
+
+def test_frame_routes_map_service_results(monkeypatch):
+    class FakeStream:
+        size = 3
+
+        def iter_bytes(self):
+            yield b"PK!"
+
+    class FakeFramesService:
+        def __call__(self, job_id, user_id, number):
+            if number == 404:
+                raise KeyError("Frame not found")
+            if number == 400:
+                raise ValueError("Artifact not ready")
+            return b"jpeg-%d" % number
+
+        def range(self, job_id, user_id, start, end):
+            return FakeStream()
+
+    monkeypatch.setattr(routes_module, "get_frames_service", FakeFramesService)
+    client = TestClient(make_app())
+
+    resp = client.get("/videos/job-1/frames/7")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "image/jpeg"
+    assert resp.content == b"jpeg-7"
+    assert client.get("/videos/job-1/frames/404").json() == {
+        "detail": "Frame not found"
+    }
+    assert client.get("/videos/job-1/frames/400").status_code == 400
+
+    resp = client.get("/videos/job-1/frames?start=1&end=20")
+    assert resp.status_code == 200
+    assert resp.headers["content-length"] == "3"
+    assert 'filename="frames_job-1_1-20.zip"' in resp.headers["content-disposition"]
+
+
+def test_upload_session_routes(monkeypatch):
+    calls = []
+
+    def fake_create():
+        def _svc(user_id, filename, size, chunk_size, sha256):
+            calls.append(("create", user_id, filename, size, chunk_size, sha256))
+            return {"upload_id": "up1", "chunk_size": 4}
+
+        return _svc
+
+    def fake_chunk():
+        def _svc(upload_id, user_id, index, data):
+            calls.append(("chunk", upload_id, index, data))
+            return {"upload_id": upload_id, "complete": False}
+
+        return _svc
+
+    def fake_status():
+        def _svc(upload_id, user_id):
+            raise KeyError("nope")
+
+        return _svc
+
+    def fake_complete():
+        def _svc(upload_id, user_id, fps, archive_format, **options):
+            calls.append(("complete", upload_id, fps))
+            return "job-77"
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_create_upload_service", fake_create)
+    monkeypatch.setattr(routes_module, "get_upload_chunk_service", fake_chunk)
+    monkeypatch.setattr(routes_module, "get_upload_session_service", fake_status)
+    monkeypatch.setattr(routes_module, "get_complete_upload_service", fake_complete)
+
+    client = TestClient(make_app(user_id="alice"))
+
+    resp = client.post("/uploads", json={"filename": "v.mp4", "size": 10})
+    assert resp.status_code == 201
+    assert resp.json()["upload_id"] == "up1"
+
+    resp = client.put("/uploads/up1/chunks/2", content=b"IJ")
+    assert resp.status_code == 200
+
+    assert client.get("/uploads/up1").status_code == 404
+
+    resp = client.post("/uploads/up1/complete?fps=3")
+    assert resp.status_code == 202
+    assert resp.json() == {"job_id": "job-77", "status": "queued"}
+
+    assert calls == [
+        ("create", "alice", "v.mp4", 10, None, None),
+        ("chunk", "up1", 2, b"IJ"),
+        ("complete", "up1", 3),
+    ]
+
+
+def test_upload_chunk_errors_map_to_http(monkeypatch):
+    def fake_chunk():
+        def _svc(upload_id, user_id, index, data):
+            raise ValueError("Chunk 0 must have 4 bytes")
+
+        return _svc
+
+    def fake_complete():
+        def _svc(upload_id, user_id, fps, archive_format, **options):
+            raise ValueError("Upload incomplete")
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_upload_chunk_service", fake_chunk)
+    monkeypatch.setattr(routes_module, "get_complete_upload_service", fake_complete)
+    client = TestClient(make_app())
+
+    resp = client.put("/uploads/up1/chunks/0", content=b"x")
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Chunk 0 must have 4 bytes"
+
+    resp = client.post("/uploads/up1/complete")
+    assert resp.status_code == 409
+
+
+def test_upload_chunk_without_content_length_is_capped(monkeypatch):
+    monkeypatch.setattr(routes_module, "MAX_CHUNK_SIZE", 4)
+    monkeypatch.setattr(
+        routes_module, "get_upload_chunk_service", lambda: pytest.fail("not called")
+    )
+    client = TestClient(make_app())
+
+    def body():
+        # chunked transfer: nenhum Content-Length para conferir antes
+        yield b"abc"
+        yield b"def"
+
+    resp = client.put("/uploads/up1/chunks/0", content=body())
+    assert "content-length" not in resp.request.headers
+    assert resp.status_code == 413
+
+
+def test_enqueue_video_rejects_unknown_archive_format(monkeypatch):
+    monkeypatch.setattr(
+        routes_module, "get_enqueue_service", lambda: pytest.fail("not called")
+    )
+    client = TestClient(make_app())
+
+    resp = client.post(
+        "/videos?format=rar", files={"file": ("v.mp4", b"x", "video/mp4")}
+    )
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Unsupported archive format"
+
+
+def test_enqueue_video_passes_archive_format(monkeypatch):
+    seen = {}
+
+    def fake_enqueue_service():
+        def _svc(user_id, file_stream, filename, fps, archive_format, **options):
+            seen["archive_format"] = archive_format
+            return "job-1"
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_enqueue_service", fake_enqueue_service)
+    client = TestClient(make_app())
+
+    resp = client.post(
+        "/videos?format=zip-stored", files={"file": ("v.mp4", b"x", "video/mp4")}
+    )
+    assert resp.status_code == 202
+    assert seen["archive_format"] == "zip-stored"
+
+
+def test_enqueue_video_passes_scene_options(monkeypatch):
+    seen = {}
+
+    def fake_enqueue_service():
+        def _svc(user_id, file_stream, filename, fps, archive_format, **options):
+            seen.update(options)
+            return "job-1"
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_enqueue_service", fake_enqueue_service)
+    client = TestClient(make_app())
+    files = {"file": ("v.mp4", b"x", "video/mp4")}
+
+    resp = client.post("/videos?mode=scene&scene_threshold=0.4&max_fps=2", files=files)
+    assert resp.status_code == 202
+    assert seen == {
+        "mode": "scene",
+        "scene_threshold": 0.4,
+        "min_fps": None,
+        "max_fps": 2.0,
+        "output": "frames",
+    }
+
+    resp = client.post("/videos?mode=scene&min_fps=3&max_fps=1", files=files)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "min_fps must not exceed max_fps"
+    assert client.post("/videos?mode=bogus", files=files).status_code == 400
+    assert client.post("/videos?output=gif", files=files).status_code == 400
+
+
+def test_download_uses_media_type_of_job_format(tmp_path, monkeypatch):
+    tar_path = tmp_path / "frames_job-3.tar"
+    tar_path.write_bytes(b"TARDATA")
+
+    def fake_status_service():
+        def _svc(job_id, user_id):
+            return {"artifact_ref": str(tar_path), "format": "tar"}
+
+        return _svc
+
+    monkeypatch.setattr(routes_module, "get_status_service", fake_status_service)
+    monkeypatch.setattr(
+        routes_module, "get_storage", lambda: LocalStorage(str(tmp_path))
+    )
+    client = TestClient(make_app())
+
+    resp = client.get("/download/job-3")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-tar"
+    assert "frames_job-3.tar" in resp.headers["content-disposition"]
@@ -0,0 +1,146 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from app.adapters.driven.archive.framepack import FramePackWriter
+from app.adapters.driven.archive.index import ArchiveIndex
+from app.adapters.driven.storage.local_storage import LocalStorage
+from app.domain.ports.storage import StoredObject
+
+FRAMES = {f"{n:08d}.jpg": bytes([n]) * (500 + n) for n in range(1, 6)}
+
+
+def _zip(path, compression):
+    with zipfile.ZipFile(path, "w", compression=compression) as zf:
+        for name, data in FRAMES.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+class _Unseekable(io.RawIOBase):
+    def __init__(self, f):
+        self.f = f
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.f.write(data)
+
+
+def _zip_with_descriptors(path):
+    # sem seek o zipfile grava os tamanhos num descritor depois dos dados
+    with open(path, "wb") as f, zipfile.ZipFile(_Unseekable(f), "w") as zf:
+        for name, data in FRAMES.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+def _pack(path):
+    with FramePackWriter(str(path)) as pack:
+        for name, data in FRAMES.items():
+            pack.writestr(name, data)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "fmt,build",
+    [
+        ("zip", lambda p: _zip(p, zipfile.ZIP_DEFLATED)),
+        ("zip-stored", lambda p: _zip(p, zipfile.ZIP_STORED)),
+        ("zip-stored", _zip_with_descriptors),
+        ("zip-lazy", _pack),
+    ],
+)
+def test_reads_single_members_and_streams_subsets(tmp_path, fmt, build):
+    path = build(tmp_path / "frames")
+    index = ArchiveIndex(LocalStorage(str(tmp_path)))
+
+    assert index.read(path, fmt, "00000003.jpg") == FRAMES["00000003.jpg"]
+    assert index.read(path, fmt, "00000009.jpg") is None
+
+    stream = index.stream(path, fmt, ["00000002.jpg", "00000004.jpg"])
+    body = b"".join(stream.iter_bytes())
+    assert len(body) == stream.size
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["00000002.jpg", "00000004.jpg"]
+        assert zf.read("00000004.jpg") == FRAMES["00000004.jpg"]
+    # o índice foi lido uma única vez
+    assert index.stats() == {"archives": 1, "hits": 2, "misses": 1}
+
+
+def test_lru_is_bounded_by_number_of_archives(tmp_path):
+    index = ArchiveIndex(LocalStorage(str(tmp_path)), max_archives=2)
+    paths = [_pack(tmp_path / f"{i}.fpk") for i in range(3)]
+    for path in paths:
+        index.names(path, "zip-lazy")
+    index.names(paths[0], "zip-lazy")
+
+    assert index.stats()["archives"] == 2
+    assert index.stats()["misses"] == 4
+
+
+def test_rewritten_archive_is_reindexed(tmp_path):
+    path = _zip(tmp_path / "a.zip", zipfile.ZIP_STORED)
+    index = ArchiveIndex(LocalStorage(str(tmp_path)))
+    index.names(path, "zip-stored")
+
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("00000001.jpg", b"new")
+    os.utime(path, ns=(1, 1))
+
+    assert index.read(path, "zip-stored", "00000001.jpg") == b"new"
+
+
+class _RangedStorage:
+    """Storage remota: só ``stat`` e ``read_range``, e cada faixa é anotada."""
+
+    def __init__(self, data):
+        self.data = data
+        self.ranges = []
+
+    def stat(self, ref):
+        return StoredObject(len(self.data), 1) if ref == "outputs/a" else None
+
+    def read_range(self, ref, start, end):
+        self.ranges.append((start, end))
+        yield self.data[start:end]
+
+    def resolve_path(self, ref):
+        raise AssertionError("artifact downloaded")
+
+
+@pytest.mark.parametrize(
+    "fmt,build",
+    [
+        ("zip", lambda p: _zip(p, zipfile.ZIP_DEFLATED)),
+        ("zip-lazy", _pack),
+    ],
+)
+def test_remote_artifact_is_read_by_ranges(tmp_path, fmt, build):
+    with open(build(tmp_path / "frames"), "rb") as f:
+        storage = _RangedStorage(f.read())
+    index = ArchiveIndex(storage)
+    index.names("outputs/a", fmt)
+    storage.ranges.clear()
+
+    assert index.read("outputs/a", fmt, "00000003.jpg") == FRAMES["00000003.jpg"]
+    # um frame é uma única faixa, só com os bytes do membro
+    [(start, end)] = storage.ranges
+    assert end - start < len(FRAMES["00000003.jpg"]) + 64
+
+    body = b"".join(index.stream("outputs/a", fmt, ["00000002.jpg"]).iter_bytes())
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.read("00000002.jpg") == FRAMES["00000002.jpg"]
+    with pytest.raises(KeyError):
+        index.names("outputs/missing", fmt)
+
+
+def test_tar_formats_are_not_supported(tmp_path):
+    index = ArchiveIndex(LocalStorage(str(tmp_path)))
+    assert not index.supports("tar.zst")
+    with pytest.raises(ValueError):
+        index.names(str(tmp_path / "x.tar"), "tar")
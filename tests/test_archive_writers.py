@@ -0,0 +1,86 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+import zstandard
+
+from app.adapters.driven.archive.framepack import file_reader
+from app.adapters.driven.archive.writers import Archiver
+
+
+def _write_sample(archiver, fmt, tmp_path):
+    src = tmp_path / "00000001.jpg"
+    src.write_bytes(b"from-file")
+    path = tmp_path / f"out.{archiver.extension(fmt)}"
+    with archiver.open(fmt, str(path)) as archive:
+        archive.write(str(src), arcname="00000001.jpg")
+        archive.writestr("00000002.jpg", b"from-bytes")
+    return path
+
+
+def test_formats_and_metadata():
+    archiver = Archiver()
+    assert set(archiver.formats()) == {
+        "zip",
+        "zip-stored",
+        "tar",
+        "tar.zst",
+        "zip-lazy",
+    }
+    assert archiver.extension("zip-stored") == "zip"
+    assert archiver.media_type("tar") == "application/x-tar"
+    assert archiver.extension("tar.zst") == "tar.zst"
+    assert archiver.extension("zip-lazy") == "fpk"
+    assert archiver.media_type("zip-lazy") == "application/zip"
+
+
+@pytest.mark.parametrize(
+    "fmt,compress_type",
+    [("zip", zipfile.ZIP_DEFLATED), ("zip-stored", zipfile.ZIP_STORED)],
+)
+def test_zip_formats_roundtrip(tmp_path, fmt, compress_type):
+    path = _write_sample(Archiver(), fmt, tmp_path)
+
+    with zipfile.ZipFile(path) as zf:
+        assert zf.namelist() == ["00000001.jpg", "00000002.jpg"]
+        assert zf.read("00000002.jpg") == b"from-bytes"
+        assert {i.compress_type for i in zf.infolist()} == {compress_type}
+
+
+def test_tar_roundtrip(tmp_path):
+    path = _write_sample(Archiver(), "tar", tmp_path)
+
+    with tarfile.open(path) as tf:
+        assert tf.getnames() == ["00000001.jpg", "00000002.jpg"]
+        assert tf.extractfile("00000001.jpg").read() == b"from-file"
+
+
+def test_tar_zstd_roundtrip(tmp_path):
+    path = _write_sample(Archiver(), "tar.zst", tmp_path)
+
+    raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb")).read()
+    with tarfile.open(fileobj=io.BytesIO(raw)) as tf:
+        assert tf.getnames() == ["00000001.jpg", "00000002.jpg"]
+        assert tf.extractfile("00000002.jpg").read() == b"from-bytes"
+
+
+def test_unknown_format_raises_value_error(tmp_path):
+    with pytest.raises(ValueError):
+        Archiver().open("rar", str(tmp_path / "x.rar"))
+
+
+def test_zip_lazy_stores_pack_and_streams_zip(tmp_path):
+    archiver = Archiver()
+    path = _write_sample(archiver, "zip-lazy", tmp_path)
+
+    read, size = file_reader(str(path)), os.path.getsize(path)
+    assert archiver.stream("zip", read, size) is None
+    stream = archiver.stream("zip-lazy", read, size)
+    data = b"".join(stream.iter_bytes())
+    assert len(data) == stream.size
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["00000001.jpg", "00000002.jpg"]
+        assert zf.read("00000001.jpg") == b"from-file"
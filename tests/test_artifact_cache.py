@@ -0,0 +1,65 @@
+import json
+import os
+
+from app.adapters.driven.storage.artifact_cache import LocalArtifactCache
+
+
+def _artifact(tmp_path, name, size):
+    p = tmp_path / name
+    p.write_bytes(b"z" * size)
+    return str(p)
+
+
+def test_miss_then_put_then_hit_links_same_inode(tmp_path):
+    cache = LocalArtifactCache(str(tmp_path / "cache"), max_bytes=1000)
+    dest = str(tmp_path / "dest.zip")
+
+    assert cache.fetch("k1", dest) is None
+    assert not os.path.exists(dest)
+
+    src = _artifact(tmp_path, "a.zip", 10)
+    cache.put("k1", src, frame_count=7, dropped_frames=2)
+
+    assert cache.fetch("k1", dest) == (7, 2)
+    assert os.stat(dest).st_ino == os.stat(src).st_ino
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    cache = LocalArtifactCache(str(tmp_path / "cache"), max_bytes=250)
+
+    cache.put("old", _artifact(tmp_path, "1.zip", 100), 1)
+    cache.put("mid", _artifact(tmp_path, "2.zip", 100), 2)
+    art_old = os.path.join(cache.cache_dir, "old.art")
+    art_mid = os.path.join(cache.cache_dir, "mid.art")
+    os.utime(art_old, (1000, 1000))
+    os.utime(art_mid, (2000, 2000))
+
+    # acessar "old" o torna o mais recente
+    assert cache.fetch("old", str(tmp_path / "o.zip")) == (1, 0)
+
+    cache.put("new", _artifact(tmp_path, "3.zip", 100), 3)
+
+    assert cache.fetch("mid", str(tmp_path / "m.zip")) is None
+    assert cache.fetch("old", str(tmp_path / "o2.zip")) == (1, 0)
+    assert cache.fetch("new", str(tmp_path / "n.zip")) == (3, 0)
+    assert cache.evictions == 1
+
+
+def test_entry_without_dropped_frames_is_a_miss(tmp_path):
+    cache = LocalArtifactCache(str(tmp_path / "cache"), max_bytes=1000)
+    cache.put("k", _artifact(tmp_path, "a.zip", 10), 4)
+    with open(os.path.join(cache.cache_dir, "k.json"), "w") as f:
+        json.dump({"frame_count": 4}, f)
+
+    assert cache.fetch("k", str(tmp_path / "x.zip")) is None
+
+
+def test_eviction_does_not_break_existing_artifacts(tmp_path):
+    cache = LocalArtifactCache(str(tmp_path / "cache"), max_bytes=0)
+    src = _artifact(tmp_path, "job.zip", 10)
+
+    cache.put("k", src, 1)
+
+    assert cache.fetch("k", str(tmp_path / "x.zip")) is None
+    assert os.path.getsize(src) == 10
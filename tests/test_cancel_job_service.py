@@ -0,0 +1,77 @@
+import pytest
+
+from app.domain.entities import JobStatus
+from app.domain.services.cancel_job import CancelJobService
+
+
+class _Job:
+    def __init__(self, id, user_id, status=JobStatus.QUEUED):
+        self.id = id
+        self.user_id = user_id
+        self.status = status
+        self.eta_seconds = 12.0
+        self.updated_at = None
+
+
+class _JobRepo:
+    def __init__(self, *jobs):
+        self._by_id = {j.id: j for j in jobs}
+        self.updates = []
+
+    def get(self, job_id):
+        return self._by_id.get(job_id)
+
+    def update(self, j):
+        self.updates.append(j.id)
+
+
+class _UoW:
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_cancel_marks_job_cancelled():
+    uow = _UoW(_JobRepo(_Job("j1", "u1", JobStatus.RUNNING)))
+
+    out = CancelJobService(uow)(job_id="j1", user_id="u1")
+
+    assert out == {"job_id": "j1", "status": JobStatus.CANCELLED}
+    job = uow.jobs.get("j1")
+    assert job.eta_seconds is None and job.updated_at is not None
+    assert uow.commits == 1
+
+
+def test_cancel_is_idempotent():
+    uow = _UoW(_JobRepo(_Job("j1", "u1", JobStatus.CANCELLED)))
+
+    CancelJobService(uow)(job_id="j1", user_id="u1")
+
+    assert uow.jobs.updates == [] and uow.commits == 0
+
+
+def test_cancel_of_other_users_job_is_not_found():
+    uow = _UoW(_JobRepo(_Job("j1", "u1")))
+
+    with pytest.raises(KeyError):
+        CancelJobService(uow)(job_id="j1", user_id="u2")
+    with pytest.raises(KeyError):
+        CancelJobService(uow)(job_id="nope", user_id="u1")
+
+
+@pytest.mark.parametrize("status", [JobStatus.DONE, JobStatus.ERROR])
+def test_cancel_of_finished_job_is_rejected(status):
+    uow = _UoW(_JobRepo(_Job("j1", "u1", status)))
+
+    with pytest.raises(ValueError):
+        CancelJobService(uow)(job_id="j1", user_id="u1")
+    assert uow.jobs.get("j1").status == status
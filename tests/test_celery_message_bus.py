@@ -60,3 +60,69 @@ def test_enqueue_process_sends_correct_task_name_and_args():
     assert task_name == "process_video_job"
     assert args == [job_id]
     assert kwargs == {}
+
+
+class DummyProducerCelery(DummyCelery):
+    def __init__(self, name, broker=None, backend=None, **options):
+        super().__init__(name, broker=broker, backend=backend)
+        self.options = options
+        self.producers = 0
+
+    def producer_or_acquire(self):
+        import contextlib
+
+        self.producers += 1
+        return contextlib.nullcontext("producer")
+
+    def send_task(self, task_name, args=None, kwargs=None, producer=None):
+        if args == ["bad"]:
+            raise ConnectionError("channel closed")
+        self._sent.append((task_name, args, producer))
+
+
+def test_enqueue_many_uses_one_producer_and_reports_each_publish():
+    _patch_module_celery_symbol(DummyProducerCelery)
+    bus = CeleryMessageBus(broker_url="amqp://x//", confirm_publish=True)
+
+    errors = bus.enqueue_many(["j1", "bad", "j3"])
+
+    assert errors == [None, "ConnectionError: channel closed", None]
+    assert bus._celery.producers == 1
+    assert bus._celery._sent == [
+        ("process_video_job", ["j1"], "producer"),
+        ("process_video_job", ["j3"], "producer"),
+    ]
+    assert bus._celery.options == {
+        "broker_transport_options": {"confirm_publish": True}
+    }
+
+
+def test_bus_rebuilds_its_app_in_a_forked_child(monkeypatch):
+    mod = _patch_module_celery_symbol(DummyProducerCelery)
+    bus = CeleryMessageBus(broker_url="amqp://x//", pool_limit=4)
+    parent = bus._celery
+    bus.enqueue_process("j1")
+    assert bus._celery is parent
+    assert parent.options == {"broker_pool_limit": 4}
+
+    # o filho não herda o pool (nem os sockets) do pai
+    monkeypatch.setattr(mod.os, "getpid", lambda: -1)
+    bus.enqueue_process("j2")
+
+    assert bus._celery is not parent
+    assert [args for _, args, _ in parent._sent] == [["j1"]]
+    assert [args for _, args, _ in bus._celery._sent] == [["j2"]]
+
+
+def test_stats_reports_publish_counts_and_latency():
+    _patch_module_celery_symbol(DummyProducerCelery)
+    bus = CeleryMessageBus(broker_url="amqp://x//")
+    assert bus.stats() == {"published": 0, "errors": 0, "p50_ms": None, "p99_ms": None}
+
+    bus.enqueue_many(["j1", "bad", "j3"])
+    with pytest.raises(ConnectionError):
+        bus.enqueue_process("bad")
+
+    stats = bus.stats()
+    assert (stats["published"], stats["errors"]) == (2, 2)
+    assert 0 <= stats["p50_ms"] <= stats["p99_ms"]
@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import inspect
+
+from app.config import container
+from app.config.settings import settings
+from app.domain.entities import OutboxMessage
+
+
+@pytest.fixture()
+def fresh(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "database_url", f"sqlite:///{tmp_path}/app.db")
+    monkeypatch.setattr(settings, "storage_dir", str(tmp_path / "data"))
+    monkeypatch.setattr(settings, "storage_backend", "local")
+    for name in ("_engine", "_SessionLocal", "_object_storage", "_auth_gateway"):
+        monkeypatch.setattr(container, name, None)
+    yield tmp_path
+    container.shutdown()
+
+
+def test_import_opens_no_connection_and_touches_no_disk(tmp_path):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path}/app.db",
+        STORAGE_DIR=str(tmp_path / "data"),
+    )
+    code = "import app.config.container as c; assert c._engine is None"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
+    assert os.listdir(tmp_path) == []
+
+
+def test_dependencies_are_built_once_on_first_use(fresh):
+    assert container._engine is None
+
+    with container.get_uow() as uow:
+        assert uow.jobs is not None
+    engine = container.get_engine()
+    container.get_uow()
+
+    assert container.get_engine() is engine
+    assert container.get_storage() is container.get_storage()
+    assert container.get_archiver() is container.get_archiver()
+    assert container.get_processor() is container.get_processor()
+    assert container.get_auth_gateway() is container.get_auth_gateway()
+
+
+def test_startup_connects_and_shutdown_releases(fresh):
+    container.startup()
+    assert (fresh / "app.db").exists()
+    # o schema é das migrações: subir o processo não roda DDL
+    assert inspect(container.get_engine()).get_table_names() == []
+    assert (fresh / "data").is_dir()
+
+    client = container.get_auth_gateway().client
+    container.shutdown()
+    assert client.is_closed
+    assert container._auth_gateway is None
+
+
+def test_forked_child_drops_inherited_connections(fresh, monkeypatch):
+    calls = []
+
+    class _Engine:
+        def dispose(self, close=True):
+            calls.append(close)
+
+    monkeypatch.setattr(container, "_engine", _Engine())
+    storage = container.get_storage()
+
+    container._after_fork_in_child()
+
+    # close=False: fechar os sockets derrubaria as conexões do pai
+    assert calls == [False]
+    assert container.get_storage() is not storage
+
+
+def test_enqueue_relay_publishes_through_the_process_bus(fresh, monkeypatch):
+    class _Bus:
+        def enqueue_many(self, job_ids):
+            self.sent = job_ids
+            return [None] * len(job_ids)
+
+        def close(self):
+            pass
+
+        def stats(self):
+            return {"published": 1}
+
+    bus = _Bus()
+    monkeypatch.setattr(container, "_bus", bus)
+    relay = container.get_enqueue_relay()
+
+    assert relay.deliver([OutboxMessage("t", {"job_id": "j1"})]) == [None]
+    assert bus.sent == ["j1"] and container.get_bus() is bus
+    # as métricas do pool aparecem no log do relay
+    assert relay.stats() == {"published": 1}
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from app.domain.entities import JobStatus, Video, VideoJob
+from app.domain.entities import JobStatus, Video, VideoJob, UploadSession
 
 
 def _now_bounds():
@@ -14,11 +14,13 @@ def test_jobstatus_members_and_values():
         JobStatus.RUNNING,
         JobStatus.DONE,
         JobStatus.ERROR,
+        JobStatus.CANCELLED,
     ]
     assert JobStatus.QUEUED.value == "queued"
     assert JobStatus.RUNNING.value == "running"
     assert JobStatus.DONE.value == "done"
     assert JobStatus.ERROR.value == "error"
+    assert JobStatus.CANCELLED.value == "cancelled"
 
     assert JobStatus.QUEUED == "queued"
     assert f"{JobStatus.DONE}" == "JobStatus.DONE"
@@ -79,3 +81,46 @@ def test_videojob_mutation_and_status_transition():
 
     j.status = JobStatus.DONE
     assert j.status == JobStatus.DONE
+
+
+def test_upload_session_chunk_math_and_received_ranges():
+    s = UploadSession(
+        id="up",
+        user_id="u",
+        filename="v.mp4",
+        size=10,
+        chunk_size=4,
+        received_chunks=[2, 0],
+    )
+
+    assert s.total_chunks == 3
+    assert [s.chunk_length(i) for i in range(3)] == [4, 4, 2]
+    assert s.received_ranges() == [[0, 4], [8, 10]]
+    assert s.missing_chunks() == [1]
+    assert s.is_complete is False
+
+    s.received_chunks.append(1)
+    assert s.received_ranges() == [[0, 10]]
+    assert s.is_complete is True
+
+
+def test_validate_extraction_modes_and_bounds():
+    import pytest
+
+    from app.domain.entities import validate_extraction
+
+    validate_extraction("fps")
+    validate_extraction("scene")
+    validate_extraction("scene", 0.2, min_fps=0.5, max_fps=0.5)
+    validate_extraction("scene", output="sheet")
+    for args in [
+        ("slow",),
+        ("fps", None, None, None, "gif"),
+        ("fps", 0.3),
+        ("scene", 0),
+        ("scene", 1.0),
+        ("scene", None, -1),
+        ("scene", None, 2, 1),
+    ]:
+        with pytest.raises(ValueError):
+            validate_extraction(*args)
@@ -0,0 +1,137 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.adapters.driver.api.controllers as routes_module
+from app.adapters.driven.archive.framepack import FramePackWriter
+from app.adapters.driven.storage.local_storage import LocalStorage
+from app.adapters.driver.api.controllers import router as api_router
+from app.adapters.driver.api.dependencies import get_current_user
+from app.adapters.driver.api.ranges import parse_range
+
+BODY = bytes(range(256)) * 40  # 10240 bytes
+
+
+class _User:
+    user_id = "u-1"
+
+
+@pytest.fixture
+def client_for(tmp_path, monkeypatch):
+    def _make(path, fmt="zip"):
+        def fake_status_service():
+            return lambda job_id, user_id: {"artifact_ref": str(path), "format": fmt}
+
+        monkeypatch.setattr(routes_module, "get_status_service", fake_status_service)
+        monkeypatch.setattr(
+            routes_module, "get_storage", lambda: LocalStorage(str(tmp_path))
+        )
+        app = FastAPI()
+        app.include_router(api_router)
+        app.dependency_overrides[get_current_user] = lambda: _User()
+        return TestClient(app)
+
+    return _make
+
+
+@pytest.fixture
+def client(tmp_path, client_for):
+    path = tmp_path / "frames_j.zip"
+    path.write_bytes(BODY)
+    return client_for(path)
+
+
+def test_parse_range_forms():
+    assert parse_range("bytes=0-99", 1000) == [(0, 100)]
+    assert parse_range("bytes=900-", 1000) == [(900, 1000)]
+    assert parse_range("bytes=-100", 1000) == [(900, 1000)]
+    assert parse_range("bytes=990-2000", 1000) == [(990, 1000)]
+    # sobrepostas ou adjacentes viram uma só
+    assert parse_range("bytes=50-99,0-49,500-599", 1000) == [(0, 100), (500, 600)]
+    assert parse_range("bytes=1000-", 1000) == []
+    assert parse_range("bytes=5-2", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+    assert parse_range("bytes=" + ",".join(["0-1"] * 40), 1000) is None
+
+
+def test_full_download_advertises_ranges_and_validators(client):
+    resp = client.get("/download/j")
+
+    assert resp.status_code == 200
+    assert resp.content == BODY
+    assert resp.headers["accept-ranges"] == "bytes"
+    assert resp.headers["content-length"] == str(len(BODY))
+    assert resp.headers["etag"].startswith('"')
+    assert "last-modified" in resp.headers
+
+
+def test_single_range_returns_206(client):
+    resp = client.get("/download/j", headers={"Range": "bytes=100-299"})
+
+    assert resp.status_code == 206
+    assert resp.content == BODY[100:300]
+    assert resp.headers["content-range"] == f"bytes 100-299/{len(BODY)}"
+    assert resp.headers["content-length"] == "200"
+
+
+def test_multi_range_returns_multipart_byteranges(client):
+    resp = client.get("/download/j", headers={"Range": "bytes=0-9,-5"})
+
+    assert resp.status_code == 206
+    ctype = resp.headers["content-type"]
+    assert ctype.startswith("multipart/byteranges; boundary=")
+    boundary = ctype.split("boundary=")[1].encode()
+    assert resp.headers["content-length"] == str(len(resp.content))
+    parts = resp.content.split(b"--" + boundary)[1:-1]
+    assert len(parts) == 2
+    head, _, data = parts[1].partition(b"\r\n\r\n")
+    assert f"bytes {len(BODY) - 5}-{len(BODY) - 1}/{len(BODY)}".encode() in head
+    assert data == BODY[-5:] + b"\r\n"
+    assert parts[0].endswith(BODY[:10] + b"\r\n")
+
+
+def test_unsatisfiable_range_returns_416(client):
+    resp = client.get("/download/j", headers={"Range": f"bytes={len(BODY)}-"})
+
+    assert resp.status_code == 416
+    assert resp.headers["content-range"] == f"bytes */{len(BODY)}"
+
+
+def test_if_none_match_returns_304(client):
+    etag = client.get("/download/j").headers["etag"]
+
+    resp = client.get("/download/j", headers={"If-None-Match": f'"x", W/{etag}'})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == etag
+
+
+def test_if_range_only_resumes_the_same_representation(client):
+    first = client.get("/download/j")
+    etag, modified = first.headers["etag"], first.headers["last-modified"]
+
+    for validator in (etag, modified):
+        resp = client.get(
+            "/download/j", headers={"Range": "bytes=10-19", "If-Range": validator}
+        )
+        assert resp.status_code == 206 and resp.content == BODY[10:20]
+
+    resp = client.get(
+        "/download/j", headers={"Range": "bytes=10-19", "If-Range": '"stale"'}
+    )
+    assert resp.status_code == 200 and resp.content == BODY
+
+
+def test_ranges_on_lazy_zip_match_full_body(tmp_path, client_for):
+    path = tmp_path / "frames_j.fpk"
+    with FramePackWriter(str(path)) as pack:
+        for n in range(1, 4):
+            pack.writestr(f"{n:08d}.jpg", bytes([n]) * 3000)
+    client = client_for(path, fmt="zip-lazy")
+
+    full = client.get("/download/j").content
+    resp = client.get("/download/j", headers={"Range": "bytes=2000-6999"})
+
+    assert resp.status_code == 206
+    assert resp.content == full[2000:7000]
+    assert resp.headers["content-range"] == f"bytes 2000-6999/{len(full)}"
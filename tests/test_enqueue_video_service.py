@@ -2,6 +2,7 @@ import io
 
 from app.domain.services.enqueue_video import EnqueueVideoService
 from app.domain.entities import Video, VideoJob, JobStatus
+from app.domain.ports.storage import StoredUpload
 
 
 class FakeRepo:
@@ -47,7 +48,7 @@ class FakeStorage:
     def save_upload(self, file_stream, filename: str) -> str:
         data_peek = file_stream.read(0)
         self.calls.append(("save_upload", filename, data_peek))
-        return f"/uploads/{filename}"
+        return StoredUpload(f"/uploads/{filename}", "c0ffee", 4)
 
     def save_artifact(self, local_path: str) -> str:
         return f"/outputs/{local_path.rsplit('/', 1)[-1]}"
@@ -111,6 +112,7 @@ def test_enqueue_happy_path_with_custom_fps(monkeypatch):
     assert v.user_id == "user-1"
     assert v.filename == "video.mp4"
     assert v.storage_ref == "/uploads/video.mp4"
+    assert v.content_hash == "c0ffee"
 
     assert len(uow.jobs.added) == 1
     j = uow.jobs.added[0]
@@ -127,8 +129,9 @@ def test_enqueue_happy_path_with_custom_fps(monkeypatch):
 
     assert bus.enqueued == ["job-uuid"]
 
-    assert [e[0] for e in events] == ["enter", "commit", "exit", "enqueue"]
-    assert events[-1] == ("enqueue", "job-uuid")
+    # a publicação é registrada antes do commit, na mesma transação do job
+    assert [e[0] for e in events] == ["enter", "enqueue", "commit", "exit"]
+    assert events[1] == ("enqueue", "job-uuid")
 
 
 def test_enqueue_uses_default_fps_when_omitted(monkeypatch):
@@ -146,3 +149,83 @@ def test_enqueue_uses_default_fps_when_omitted(monkeypatch):
     assert job_id == "j2"
     job = uow.jobs.added[0]
     assert job.fps == 1
+
+
+def test_enqueue_stored_registers_existing_ref_without_saving(monkeypatch):
+    _patch_uuid4(monkeypatch, ["v3", "j3"])
+
+    events = []
+    uow = FakeUoW(events)
+    storage = FakeStorage()
+    bus = FakeBus(events)
+
+    svc = EnqueueVideoService(uow=uow, storage=storage, bus=bus)
+    job_id = svc.enqueue_stored(
+        user_id="u3", storage_ref="/uploads/abc_f.mp4", filename="f.mp4", fps=2
+    )
+
+    assert job_id == "j3"
+    assert storage.calls == []
+    assert uow.videos.added[0].storage_ref == "/uploads/abc_f.mp4"
+    assert uow.jobs.added[0].fps == 2
+    assert bus.enqueued == ["j3"]
+
+
+def test_enqueue_scene_mode_stores_options(monkeypatch):
+    _patch_uuid4(monkeypatch, ["v4", "j4"])
+    uow = FakeUoW([])
+
+    svc = EnqueueVideoService(uow=uow, storage=FakeStorage(), bus=FakeBus([]))
+    svc(
+        user_id="u4",
+        file_stream=io.BytesIO(b"x"),
+        filename="f.mp4",
+        mode="scene",
+        scene_threshold=0.45,
+        min_fps=0.1,
+        max_fps=2,
+    )
+
+    job = uow.jobs.added[0]
+    assert (job.mode, job.scene_threshold, job.min_fps, job.max_fps) == (
+        "scene",
+        0.45,
+        0.1,
+        2,
+    )
+
+
+def test_enqueue_rejects_invalid_scene_options_before_saving():
+    import pytest
+
+    storage = FakeStorage()
+    svc = EnqueueVideoService(uow=FakeUoW([]), storage=storage, bus=FakeBus([]))
+
+    with pytest.raises(ValueError):
+        svc(
+            user_id="u5",
+            file_stream=io.BytesIO(b"x"),
+            filename="f.mp4",
+            mode="scene",
+            scene_threshold=1.5,
+        )
+    with pytest.raises(ValueError):
+        svc(user_id="u5", file_stream=io.BytesIO(b"x"), filename="f.mp4", max_fps=2)
+    assert storage.calls == []
+
+
+def test_outbox_bus_commits_publish_intent_with_the_job(Session, monkeypatch):
+    from app.adapters.driven.broker.outbox_bus import OutboxMessageBus
+    from app.adapters.driven.db.sqlalchemy_uow import SQLAlchemyUnitOfWork
+    from app.domain.ports.message_bus import PROCESS_TOPIC
+
+    _patch_uuid4(monkeypatch, ["v-outbox", "j-outbox"])
+    uow = SQLAlchemyUnitOfWork(Session)
+    svc = EnqueueVideoService(uow=uow, storage=FakeStorage(), bus=OutboxMessageBus(uow))
+
+    job_id = svc.enqueue_stored(user_id="u", storage_ref="uploads/x", filename="f.mp4")
+
+    with uow:
+        assert uow.jobs.get(job_id).status == JobStatus.QUEUED
+        claimed = uow.outbox.claim(PROCESS_TOPIC, 100, lease=60)
+    assert {"job_id": "j-outbox"} in [m.payload for m in claimed]
@@ -1,3 +1,5 @@
+import json
+import shutil
 import subprocess
 import pytest
 
@@ -114,3 +116,597 @@ def test_extract_frames_raises_runtime_on_timeout(monkeypatch, tmp_path):
         proc.extract_frames("in.mp4", str(out_dir))
 
     assert "ffmpeg timeout após 7s" in str(exc.value)
+
+
+class PopenStub:
+    def __init__(self, stdout_bytes=b"", returncode=0, stderr_bytes=b""):
+        self.stdout_bytes = stdout_bytes
+        self.final_returncode = returncode
+        self.stderr_bytes = stderr_bytes
+        self.cmd = None
+        self.killed = False
+
+    def __call__(self, cmd, stdin=None, stdout=None, stderr=None, pass_fds=()):
+        import io
+
+        self.cmd = cmd
+        if hasattr(stderr, "write"):
+            stderr.write(self.stderr_bytes)
+        self.stdout = io.BytesIO(self.stdout_bytes)
+        self.returncode = None
+        return self
+
+    def communicate(self, timeout=None):
+        self.wait()
+        return self.stdout.read() if self.stdout else b"", self.stderr_bytes
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if self.returncode is None:
+            self.returncode = self.final_returncode
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+        self.returncode = -9
+
+
+def _fake_jpeg(payload: bytes) -> bytes:
+    sos = b"\xff\xda\x00\x08\x01\x01\x00\x00\x3f\x00"
+    return b"\xff\xd8" + sos + payload + b"\xff\xd9"
+
+
+def test_iter_frames_streams_jpegs_from_image2pipe(monkeypatch):
+    frames = [_fake_jpeg(b"a"), _fake_jpeg(b"bb")]
+    stub = PopenStub(stdout_bytes=b"".join(frames))
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    proc = FFmpegVideoProcessor(ffmpeg_bin="ffmpeg")
+    assert list(proc.iter_frames("in.mp4", fps=4)) == frames
+
+    cmd = stub.cmd
+    assert "-vf" in cmd and "fps=4" in cmd
+    assert cmd[cmd.index("-f") + 1] == "image2pipe"
+    assert cmd[-1] == "pipe:1"
+
+
+def test_iter_frames_raises_runtime_with_stderr_on_failure(monkeypatch):
+    stub = PopenStub(
+        stdout_bytes=b"\xff\xd8\xff", returncode=1, stderr_bytes=b"bad input"
+    )
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    with pytest.raises(RuntimeError) as exc:
+        list(FFmpegVideoProcessor().iter_frames("in.mp4"))
+    assert "bad input" in str(exc.value)
+
+
+def test_iter_frames_kills_ffmpeg_when_consumer_stops_early(monkeypatch):
+    stub = PopenStub(stdout_bytes=_fake_jpeg(b"a") * 3)
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    gen = FFmpegVideoProcessor().iter_frames("in.mp4")
+    next(gen)
+    gen.close()
+
+    assert stub.killed is True
+
+
+_PROBE_JSON = """{
+  "packets": [
+    {"pts": 0, "flags": "K__"}, {"pts": 512, "flags": "___"},
+    {"pts": 1536000, "flags": "K__"}, {"pts": 2560000, "flags": "K__"},
+    {"flags": "___"}, {"pts": 3839488, "flags": "___"}
+  ],
+  "streams": [{"time_base": "1/12800"}],
+  "format": {"start_time": "0.000000"}
+}"""
+
+
+def test_probe_parses_time_base_and_keyframes(monkeypatch):
+    def fake_run(cmd, **kwargs):
+        assert cmd[0] == "ffprobe" and cmd[-1] == "in.mp4"
+        return type("R", (), {"stdout": _PROBE_JSON, "stderr": ""})()
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    probe = FFmpegVideoProcessor().probe("in.mp4")
+
+    assert str(probe.time_base) == "1/12800"
+    assert probe.keyframes == [0, 1536000, 2560000]
+    assert (probe.first_pts, probe.last_pts) == (0, 3839488)
+    assert probe.ts_offset == 0
+
+
+class MultiPopenStub:
+    """Um PopenStub por processo, na ordem em que são criados."""
+
+    def __init__(self, outputs, returncodes=None):
+        self.outputs = list(outputs)
+        self.returncodes = returncodes or [0] * len(self.outputs)
+        self.procs = []
+
+    def __call__(self, cmd, stdin=None, stdout=None, stderr=None, pass_fds=()):
+        i = len(self.procs)
+        stub = PopenStub(
+            stdout_bytes=self.outputs[i],
+            returncode=self.returncodes[i],
+            stderr_bytes=b"segment %d failed" % i if self.returncodes[i] else b"",
+        )
+        stub(cmd, stdin=stdin, stdout=stdout, stderr=stderr)
+        if stdout is not subprocess.PIPE:
+            # saída redirecionada para arquivo: escreve e libera o stdout
+            if hasattr(stdout, "write"):
+                stdout.write(stub.stdout_bytes)
+            stub.stdout = None
+        self.procs.append(stub)
+        return stub
+
+
+def _parallel(monkeypatch, workers=3):
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda cmd, **kw: type("R", (), {"stdout": _PROBE_JSON, "stderr": ""})(),
+    )
+    return FFmpegVideoProcessor(workers=workers, min_segment_sec=0)
+
+
+def test_extract_frames_parallel_runs_one_ffmpeg_per_segment(tmp_path, monkeypatch):
+    stub = MultiPopenStub([b""] * 3)
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    _parallel(monkeypatch).extract_frames("in.mp4", str(tmp_path), fps=1)
+
+    cmds = [p.cmd for p in stub.procs]
+    assert len(cmds) == 3
+    assert "-ss" not in cmds[0]
+    assert cmds[1][cmds[1].index("-ss") + 1] == "120.000000"
+    assert cmds[2][cmds[2].index("-ss") + 1] == "200.000000"
+    assert [c[c.index("-start_number") + 1] for c in cmds] == ["1", "121", "201"]
+    assert cmds[0][cmds[0].index("-vf") + 1] == "setpts=PTS+0,fps=1,trim=end_pts=120"
+    assert cmds[2][cmds[2].index("-vf") + 1] == "setpts=PTS+0,fps=1"
+    assert all("-copyts" in c and "passthrough" in c for c in cmds)
+
+
+def test_iter_frames_parallel_merges_segments_in_order(monkeypatch):
+    frames = [_fake_jpeg(bytes([i])) for i in range(5)]
+    stub = MultiPopenStub([frames[0] + frames[1], frames[2], frames[3] + frames[4]])
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    assert list(_parallel(monkeypatch).iter_frames("in.mp4", fps=1)) == frames
+    assert all(p.cmd[-1] == "pipe:1" for p in stub.procs)
+
+
+def test_iter_frames_parallel_fails_if_any_segment_fails(monkeypatch):
+    stub = MultiPopenStub([_fake_jpeg(b"a")] * 3, returncodes=[0, 1, 0])
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    with pytest.raises(RuntimeError) as exc:
+        list(_parallel(monkeypatch).iter_frames("in.mp4", fps=1))
+    assert "segment 1 failed" in str(exc.value)
+
+
+def test_probe_failure_falls_back_to_serial(monkeypatch):
+    def boom(cmd, **kw):
+        raise FileNotFoundError("ffprobe")
+
+    monkeypatch.setattr(subprocess, "run", boom)
+    stub = PopenStub(stdout_bytes=_fake_jpeg(b"a"))
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    proc = FFmpegVideoProcessor(workers=4, min_segment_sec=0)
+    assert len(list(proc.iter_frames("in.mp4"))) == 1
+    assert "-ss" not in stub.cmd
+
+
+_INTRA_PROBE_JSON = json.dumps(
+    {
+        "packets": [
+            {"pts": i * 512, "duration": 512, "flags": "K__"} for i in range(250)
+        ],
+        "streams": [{"time_base": "1/12800"}],
+        "format": {"start_time": "0.000000"},
+    }
+)
+
+
+def _sparse(monkeypatch, probe_json=_INTRA_PROBE_JSON, workers=1):
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda cmd, **kw: type("R", (), {"stdout": probe_json, "stderr": ""})(),
+    )
+    return FFmpegVideoProcessor(workers=workers, sparse=True)
+
+
+def test_sparse_mode_seeks_one_ffmpeg_per_frame(tmp_path, monkeypatch):
+    stub = MultiPopenStub([_fake_jpeg(bytes([i])) for i in range(10)])
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    count = _sparse(monkeypatch).extract_frames("in.mp4", str(tmp_path), fps=1)
+
+    assert count == 10
+    assert (tmp_path / "00000010.jpg").read_bytes() == _fake_jpeg(bytes([9]))
+    cmd = stub.procs[3].cmd
+    # slot 3 = último frame antes de 3.5s; vídeo só com keyframes
+    assert cmd[cmd.index("-ss") + 1] == "3.480000"
+    assert cmd[cmd.index("-vf") + 1] == f"trim=start_pts={87 * 512}"
+    assert cmd[cmd.index("-frames:v") + 1] == "1"
+
+
+def test_sparse_mode_keeps_order_with_concurrent_workers(monkeypatch):
+    frames = [_fake_jpeg(bytes([i])) for i in range(10)]
+    stub = MultiPopenStub(frames)
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    proc = _sparse(monkeypatch, workers=4)
+    assert list(proc.iter_frames("in.mp4", fps=1)) == frames
+
+
+def test_cost_model_prefers_full_decode_for_long_gop(monkeypatch):
+    long_gop = json.loads(_INTRA_PROBE_JSON)
+    for i, packet in enumerate(long_gop["packets"]):
+        packet["flags"] = "K__" if i % 50 == 0 else "___"
+    stub = PopenStub(stdout_bytes=_fake_jpeg(b"a"))
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    proc = _sparse(monkeypatch, probe_json=json.dumps(long_gop))
+    assert len(list(proc.iter_frames("in.mp4", fps=1))) == 1
+    assert "fps=1" in stub.cmd and "-ss" not in stub.cmd
+
+
+@pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+    reason="ffmpeg/ffprobe indisponível",
+)
+def test_sparse_frames_match_serial_ffmpeg(tmp_path):
+    video = tmp_path / "intra.mkv"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=160x120:rate=30:duration=8",
+            "-c:v",
+            "mjpeg",
+            str(video),
+        ],
+        check=True,
+    )
+
+    serial = list(FFmpegVideoProcessor().iter_frames(str(video), fps=1))
+    sparse = FFmpegVideoProcessor(sparse=True, workers=2)
+    assert sparse._plan(str(video), 1)[0] == "sparse"
+    assert list(sparse.iter_frames(str(video), fps=1)) == serial
+
+
+@pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+    reason="ffmpeg/ffprobe indisponível",
+)
+@pytest.mark.parametrize("fps", [1, 3, 7])
+def test_parallel_frames_match_serial_ffmpeg(tmp_path, fps):
+    video = tmp_path / "in.mkv"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=160x120:rate=24000/1001:duration=12",
+            "-c:v",
+            "mpeg4",
+            "-g",
+            "29",
+            "-output_ts_offset",
+            "0.37",
+            str(video),
+        ],
+        check=True,
+    )
+
+    serial = list(FFmpegVideoProcessor().iter_frames(str(video), fps=fps))
+    parallel = FFmpegVideoProcessor(workers=4, min_segment_sec=0)
+    strategy, _, segments = parallel._plan(str(video), fps)
+    assert strategy == "segments" and len(segments) > 1
+    assert list(parallel.iter_frames(str(video), fps=fps)) == serial
+
+    parallel.extract_frames(str(video), str(tmp_path / "p"), fps=fps)
+    files = sorted((tmp_path / "p").iterdir())
+    assert [f.read_bytes() for f in files] == serial
+
+
+def test_iter_frames_reports_progress_from_progress_pipe(monkeypatch):
+    import os
+
+    frames = [_fake_jpeg(b"a"), _fake_jpeg(b"b")]
+
+    class ProgressPopen(PopenStub):
+        def __call__(self, cmd, stdin=None, stdout=None, stderr=None, pass_fds=()):
+            super().__call__(cmd, stdin=stdin, stdout=stdout, stderr=stderr)
+            self.pass_fds = pass_fds
+            fd = int(cmd[cmd.index("-progress") + 1].split(":")[1])
+            # o ffmpeg escreveria isto antes do primeiro frame chegar ao stdout
+            os.write(fd, b"frame=5\nprogress=continue\nframe=10\nprogress=end\n")
+            return self
+
+    stub = ProgressPopen(stdout_bytes=b"".join(frames))
+    monkeypatch.setattr(subprocess, "Popen", stub)
+    monkeypatch.setattr(
+        subprocess,
+        "run",
+        lambda cmd, **kw: type("R", (), {"stdout": "20.0\n", "stderr": ""})(),
+    )
+    calls = []
+
+    proc = FFmpegVideoProcessor()
+    got = list(
+        proc.iter_frames("in.mp4", fps=1, on_progress=lambda *a: calls.append(a))
+    )
+
+    assert got == frames
+    assert stub.cmd[1:3] == ["-progress", f"pipe:{stub.pass_fds[0]}"]
+    assert calls and calls[-1][0] == 50.0
+
+
+def test_iter_frames_without_callback_does_not_probe(monkeypatch):
+    def no_probe(*a, **kw):
+        raise AssertionError("ffprobe não deveria rodar")
+
+    monkeypatch.setattr(subprocess, "run", no_probe)
+    stub = PopenStub(stdout_bytes=_fake_jpeg(b"a"))
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    assert len(list(FFmpegVideoProcessor().iter_frames("in.mp4"))) == 1
+    assert "-progress" not in stub.cmd
+
+
+@pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+    reason="ffmpeg/ffprobe indisponível",
+)
+def test_extract_frames_reports_progress_with_real_ffmpeg(tmp_path):
+    video = tmp_path / "in.mkv"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=160x120:rate=25:duration=6",
+            "-c:v",
+            "mpeg4",
+            str(video),
+        ],
+        check=True,
+    )
+    calls = []
+
+    count = FFmpegVideoProcessor().extract_frames(
+        str(video), str(tmp_path / "f"), fps=2, on_progress=lambda *a: calls.append(a)
+    )
+
+    assert count == 12
+    assert calls[-1] == (100.0, 0.0)
+
+
+class _HangingPopen(PopenStub):
+    """ffmpeg que só termina quando é morto."""
+
+    def wait(self, timeout=None):
+        import time
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.killed:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(self.cmd, timeout)
+            time.sleep(0.01)
+        return self.returncode
+
+
+def test_cancel_event_kills_ffmpeg_and_raises_job_cancelled(tmp_path, monkeypatch):
+    import threading
+
+    from app.domain.errors import JobCancelled
+
+    stub = _HangingPopen()
+    monkeypatch.setattr(subprocess, "Popen", stub)
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+
+    with pytest.raises(JobCancelled):
+        FFmpegVideoProcessor().extract_frames(
+            "in.mp4", str(tmp_path / "f"), fps=1, cancel=cancel
+        )
+    assert stub.killed
+
+
+def test_sparse_mode_stops_between_frames_when_cancelled(monkeypatch):
+    import threading
+
+    from app.domain.errors import JobCancelled
+
+    stub = MultiPopenStub([_fake_jpeg(bytes([i])) for i in range(10)])
+    monkeypatch.setattr(subprocess, "Popen", stub)
+    cancel = threading.Event()
+
+    frames = _sparse(monkeypatch).iter_frames("in.mp4", fps=1, cancel=cancel)
+    next(frames)
+    cancel.set()
+    with pytest.raises(JobCancelled):
+        next(frames)
+
+
+def test_extract_frames_multi_splits_one_decode_into_fps_branches(
+    tmp_path, monkeypatch
+):
+    stub = PopenStub()
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    out = {1: str(tmp_path / "a"), 5: str(tmp_path / "b")}
+    counts = FFmpegVideoProcessor().extract_frames_multi("in.mp4", out)
+
+    assert counts == {1: 0, 5: 0}
+    cmd = stub.cmd
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph == "[0:v]split=2[s0][s1];[s0]fps=1[o0];[s1]fps=5[o1]"
+    assert cmd[cmd.index("[o1]") + 3] == str(tmp_path / "b" / "%08d.jpg")
+
+
+@pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+    reason="ffmpeg/ffprobe indisponível",
+)
+def test_extract_frames_multi_matches_one_run_per_fps(tmp_path):
+    video = tmp_path / "in.mkv"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc2=size=160x120:rate=25:duration=4",
+            "-c:v",
+            "mpeg4",
+            str(video),
+        ],
+        check=True,
+    )
+    proc = FFmpegVideoProcessor()
+    calls = []
+
+    counts = proc.extract_frames_multi(
+        str(video),
+        {1: str(tmp_path / "m1"), 3: str(tmp_path / "m3")},
+        on_progress=lambda *a: calls.append(a),
+    )
+
+    assert counts == {1: 4, 3: 12}
+    assert calls[-1] == (100.0, 0.0)
+    for fps in (1, 3):
+        single = list(proc.iter_frames(str(video), fps=fps))
+        files = sorted((tmp_path / f"m{fps}").iterdir())
+        assert [f.read_bytes() for f in files] == single
+
+
+def test_extract_scenes_builds_select_with_rate_bounds(tmp_path, monkeypatch):
+    stub = PopenStub()
+    monkeypatch.setattr(subprocess, "Popen", stub)
+
+    got = FFmpegVideoProcessor().extract_scenes(
+        "in.mp4", str(tmp_path), 0.4, min_fps=0.5, max_fps=4
+    )
+
+    assert got == []
+    vf = stub.cmd[stub.cmd.index("-vf") + 1]
+    select, _, meta = vf.partition(",metadata=")
+    assert select == (
+        "select='gt(isnan(prev_selected_t)+gte(t-prev_selected_t\\,2.000000)"
+        "+gt(scene\\,0.4)*gte(t-prev_selected_t\\,0.250000)\\,0)'"
+    )
+    assert meta.startswith("mode=print:file=")
+    assert stub.cmd[stub.cmd.index("-fps_mode") + 1] == "passthrough"
+
+
+@pytest.mark.skipif(
+    not (shutil.which("ffmpeg") and shutil.which("ffprobe")),
+    reason="ffmpeg/ffprobe indisponível",
+)
+def test_extract_scenes_picks_cuts_with_real_ffmpeg(tmp_path):
+    video = tmp_path / "cuts.mkv"
+    # três cenas estáticas de 2s: cortes em 2s e 4s
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=red:s=64x64:r=10:d=2",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=blue:s=64x64:r=10:d=2",
+            "-f",
+            "lavfi",
+            "-i",
+            "color=white:s=64x64:r=10:d=2",
+            "-filter_complex",
+            "[0:v][1:v][2:v]concat=n=3:v=1",
+            "-c:v",
+            "mpeg4",
+            str(video),
+        ],
+        check=True,
+    )
+    proc = FFmpegVideoProcessor()
+
+    cuts = proc.extract_scenes(str(video), str(tmp_path / "a"), 0.3)
+    assert cuts == [0.0, 2.0, 4.0]
+    assert len(list((tmp_path / "a").glob("*.jpg"))) == 3
+
+    # min_fps preenche trechos parados
+    filled = proc.extract_scenes(str(video), str(tmp_path / "b"), 0.3, min_fps=1)
+    assert filled == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    # max_fps descarta o corte de 2s, a menos de 4s do frame anterior
+    capped = proc.extract_scenes(str(video), str(tmp_path / "c"), 0.3, max_fps=0.25)
+    assert capped == [0.0, 4.0]
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg indisponível")
+def test_tile_frames_builds_sheets_from_sparse_frame_list(tmp_path):
+    from app.domain.entities import SheetLayout
+
+    frames = tmp_path / "frames"
+    frames.mkdir()
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            "testsrc=s=320x240:r=1:d=7",
+            str(frames / "%08d.jpg"),
+        ],
+        check=True,
+    )
+    # numeração com buracos, como depois do descarte de frames repetidos
+    paths = [str(frames / f"{n:08d}.jpg") for n in (1, 2, 4, 5, 7)]
+
+    count = FFmpegVideoProcessor().tile_frames(
+        paths, str(tmp_path / "sheets"), SheetLayout(2, 1, 100, 50)
+    )
+
+    assert count == 3
+    probe = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "stream=width,height",
+            "-of",
+            "csv=p=0",
+            str(tmp_path / "sheets" / "sheet_0003.jpg"),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert probe.stdout.strip() == "200,50"
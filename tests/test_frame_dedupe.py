@@ -0,0 +1,88 @@
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from app.adapters.driven.media.dedupe import (
+    PerceptualDeduplicator,
+    dhash,
+    hamming,
+    keep_mask,
+    phash,
+)
+
+
+def _gradient(n, h, w, reverse=False):
+    row = np.linspace(0, 255, w, dtype=np.float64)
+    if reverse:
+        row = row[::-1]
+    return np.broadcast_to(row, (n, h, w)).astype(np.uint8)
+
+
+def test_dhash_sets_bit_where_brightness_increases():
+    assert dhash(_gradient(1, 8, 9))[0] == np.uint64(2**64 - 1)
+    assert dhash(_gradient(1, 8, 9, reverse=True))[0] == 0
+
+
+def test_phash_ignores_uniform_brightness_change():
+    rng = np.random.default_rng(7)
+    base = rng.integers(0, 200, (1, 32, 32)).astype(np.uint8)
+    brighter = base + np.uint8(40)
+    other = rng.integers(0, 200, (1, 32, 32)).astype(np.uint8)
+    h = phash(np.concatenate([base, brighter, other]))
+
+    assert hamming(h[1:2], int(h[0]))[0] == 0
+    assert hamming(h[2:3], int(h[0]))[0] > 10
+
+
+def test_keep_mask_compares_with_last_kept_frame_across_batches():
+    hashes = np.array([0b0, 0b1, 0b11, 0b111, 0b1111111], dtype=np.uint64)
+
+    keep, last = keep_mask(hashes, threshold=1, last=None)
+    # 0b11 fica a 2 bits do 0b0 mantido; 0b111 a 1 bit do 0b11
+    assert keep == [True, False, True, False, True]
+    assert last == 0b1111111
+
+    keep, last = keep_mask(np.array([0b1111110], dtype=np.uint64), 1, last)
+    assert keep == [False] and last == 0b1111111
+
+
+def test_rejects_unknown_method_and_threshold():
+    with pytest.raises(ValueError):
+        PerceptualDeduplicator(method="ahash")
+    with pytest.raises(ValueError):
+        PerceptualDeduplicator(threshold=64)
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg indisponível")
+@pytest.mark.parametrize("method", ["dhash", "phash"])
+def test_filter_dir_drops_static_runs_in_small_batches(tmp_path, method):
+    # 3 frames vermelhos, 3 do padrão de teste, 3 vermelhos de novo
+    for n, source in enumerate(["red"] * 3 + ["pattern"] * 3 + ["red"] * 3, 1):
+        src = "color=red:s=64x48" if source == "red" else "testsrc=s=64x48:r=1"
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-v",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                src,
+                "-frames:v",
+                "1",
+                str(tmp_path / f"{n:08d}.jpg"),
+            ],
+            check=True,
+        )
+
+    dedupe = PerceptualDeduplicator(method=method, threshold=4, batch_size=2)
+    dropped = dedupe.filter_dir(str(tmp_path))
+
+    assert dropped == 6
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "00000001.jpg",
+        "00000004.jpg",
+        "00000007.jpg",
+    ]
@@ -0,0 +1,63 @@
+import io
+import zipfile
+import zlib
+
+import pytest
+
+from app.adapters.driven.archive import framepack
+from app.adapters.driven.archive.framepack import FramePackWriter, ZipStream, read_index
+
+
+def _pack(tmp_path, members):
+    path = tmp_path / "frames.fpk"
+    with FramePackWriter(str(path)) as pack:
+        for name, data in members:
+            pack.writestr(name, data)
+    return str(path)
+
+
+def test_index_records_offsets_sizes_and_crc(tmp_path):
+    path = _pack(tmp_path, [("a.jpg", b"aaaa"), ("b.jpg", b"bb")])
+
+    a, b = read_index(path)
+    assert (a.name, a.offset, a.size) == ("a.jpg", 0, 4)
+    assert (b.name, b.offset, b.size) == ("b.jpg", 4, 2)
+    assert b.crc == zlib.crc32(b"bb")
+
+
+def test_stream_size_is_exact_and_ranges_match_full_body(tmp_path):
+    members = [(f"{n:08d}.jpg", bytes([n]) * (1000 * n)) for n in range(1, 6)]
+    members.append(("índice.json", b"[]"))
+    stream = ZipStream.open(_pack(tmp_path, members))
+
+    body = b"".join(stream.iter_bytes())
+    assert len(body) == stream.size
+    for start, end in [(0, 10), (35, 4000), (stream.size - 22, None)]:
+        assert b"".join(stream.iter_bytes(start, end)) == body[start:end]
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.testzip() is None
+        assert [i.filename for i in zf.infolist()] == [m[0] for m in members]
+        assert zf.read("00000003.jpg") == members[2][1]
+
+
+def test_zip64_records_when_limits_are_exceeded(tmp_path, monkeypatch):
+    # limites reduzidos: exercita os registros Zip64 sem gerar 4 GiB
+    monkeypatch.setattr(framepack, "ZIP64_LIMIT", 1500)
+    monkeypatch.setattr(framepack, "ZIP_MAX_ENTRIES", 2)
+    members = [("big.jpg", b"x" * 2000), ("small.jpg", b"y" * 10), ("c", b"")]
+    stream = ZipStream.open(_pack(tmp_path, members))
+
+    body = b"".join(stream.iter_bytes())
+    assert len(body) == stream.size
+    assert b"PK\x06\x06" in body and b"PK\x06\x07" in body
+    with zipfile.ZipFile(io.BytesIO(body)) as zf:
+        assert zf.testzip() is None
+        assert zf.read("big.jpg") == b"x" * 2000
+        assert zf.read("small.jpg") == b"y" * 10
+
+
+def test_invalid_pack_raises_value_error(tmp_path):
+    path = tmp_path / "x.fpk"
+    path.write_bytes(b"PK\x03\x04 not a pack")
+    with pytest.raises(ValueError):
+        read_index(str(path))
@@ -0,0 +1,99 @@
+import pytest
+
+from app.domain.entities import JobStatus
+from app.domain.services.frames import GetFramesService
+
+
+class _Job:
+    def __init__(self, id, user_id, status=JobStatus.DONE, archive_format="zip"):
+        self.id = id
+        self.user_id = user_id
+        self.status = status
+        self.archive_format = archive_format
+        self.output = "frames"
+        self.artifact_ref = f"/outputs/frames_{id}.zip"
+
+
+class _JobRepo:
+    def __init__(self, *jobs):
+        self._by_id = {j.id: j for j in jobs}
+
+    def get(self, job_id):
+        return self._by_id.get(job_id)
+
+
+class _UoW:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Index:
+    def __init__(self, names):
+        self._names = names
+        self.streamed = None
+
+    def supports(self, fmt):
+        return fmt != "tar"
+
+    def names(self, ref, fmt):
+        return list(self._names)
+
+    def read(self, ref, fmt, name):
+        return name.encode() if name in self._names else None
+
+    def stream(self, ref, fmt, names):
+        self.streamed = (ref, fmt, names)
+        return "stream"
+
+
+def _svc(*jobs, names=("00000001.jpg", "00000003.jpg", "00000010.jpg", "x.json")):
+    index = _Index(names)
+    return GetFramesService(_UoW(_JobRepo(*jobs)), index), index
+
+
+def test_reads_frame_by_number():
+    svc, _ = _svc(_Job("j1", "u1"))
+
+    assert svc(job_id="j1", user_id="u1", number=3) == b"00000003.jpg"
+    with pytest.raises(KeyError):
+        svc(job_id="j1", user_id="u1", number=2)
+
+
+def test_range_selects_existing_frames_in_order():
+    svc, index = _svc(_Job("j1", "u1"))
+
+    assert svc.range(job_id="j1", user_id="u1", start=2, end=10) == "stream"
+    assert index.streamed == (
+        "/outputs/frames_j1.zip",
+        "zip",
+        ["00000003.jpg", "00000010.jpg"],
+    )
+    with pytest.raises(KeyError):
+        svc.range(job_id="j1", user_id="u1", start=4, end=9)
+    with pytest.raises(ValueError):
+        svc.range(job_id="j1", user_id="u1", start=5, end=4)
+
+
+@pytest.mark.parametrize(
+    "job",
+    [
+        _Job("j1", "u1", status=JobStatus.RUNNING),
+        _Job("j1", "u1", archive_format="tar"),
+    ],
+)
+def test_unready_or_unsupported_artifact_raises_value_error(job):
+    svc, _ = _svc(job)
+    with pytest.raises(ValueError):
+        svc(job_id="j1", user_id="u1", number=1)
+
+
+def test_other_users_job_is_not_found():
+    svc, _ = _svc(_Job("j1", "u1"))
+    with pytest.raises(KeyError):
+        svc(job_id="j1", user_id="u2", number=1)
@@ -0,0 +1,50 @@
+import io
+import pytest
+
+from app.adapters.driven.media.jpeg_stream import JPEGStreamSplitter, iter_jpeg_frames
+
+
+def _segment(marker: int, body: bytes) -> bytes:
+    return b"\xff" + bytes([marker]) + (len(body) + 2).to_bytes(2, "big") + body
+
+
+def _jpeg(scan: bytes, app: bytes = b"JFIF\x00") -> bytes:
+    return (
+        b"\xff\xd8"
+        + _segment(0xE0, app)
+        + _segment(0xDA, b"\x01\x01\x00\x00\x3f\x00")
+        + scan
+        + b"\xff\xd9"
+    )
+
+
+FRAMES = [
+    _jpeg(b"\x12\x34\x56"),
+    # byte stuffing (FF00) e marcador de restart (FFD0) dentro do scan
+    _jpeg(b"\x12\xff\x00\x34\xff\xd0\x56\xff\x00"),
+    # FFD9 dentro de um segmento APP (ex.: thumbnail EXIF) não encerra o frame
+    _jpeg(b"\x99", app=b"Exif\x00\x00\xff\xd8\xff\xd9"),
+]
+
+
+def test_splits_concatenated_frames_in_one_feed():
+    splitter = JPEGStreamSplitter()
+    assert splitter.feed(b"".join(FRAMES)) == FRAMES
+    assert splitter.pending == 0
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64])
+def test_splits_frames_across_arbitrary_read_boundaries(read_size):
+    stream = io.BytesIO(b"".join(FRAMES) * 3)
+    assert list(iter_jpeg_frames(stream, read_size=read_size)) == FRAMES * 3
+
+
+def test_truncated_stream_raises():
+    stream = io.BytesIO(FRAMES[0] + FRAMES[1][:-3])
+    with pytest.raises(ValueError):
+        list(iter_jpeg_frames(stream))
+
+
+def test_garbage_instead_of_soi_raises():
+    with pytest.raises(ValueError):
+        JPEGStreamSplitter().feed(b"not a jpeg")
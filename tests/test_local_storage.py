@@ -1,8 +1,10 @@
+import hashlib
 import io
 import os
 from pathlib import Path
 
-from app.adapters.driven.storage.local_storage import LocalStorage
+from app.adapters.driven.storage.local_storage import LocalStorage, shard_path
+from app.adapters.driven.storage.migrate_layout import migrate
 
 
 def test_init_creates_directories(tmp_path):
@@ -18,18 +20,42 @@ def test_init_creates_directories(tmp_path):
     assert Path(ls2.uploads_dir).is_dir()
 
 
-def test_save_upload_writes_file(tmp_path):
+def test_save_upload_writes_file_keyed_by_sha256(tmp_path):
     ls = LocalStorage(str(tmp_path))
     content = b"hello world"
-    filename = "up.bin"
+    digest = hashlib.sha256(content).hexdigest()
 
-    path = ls.save_upload(io.BytesIO(content), filename)
+    stored = ls.save_upload(io.BytesIO(content), "up.bin")
 
-    assert path == os.path.join(ls.uploads_dir, filename)
-    with open(path, "rb") as f:
+    assert stored.ref == f"uploads/{digest}"
+    assert ls.resolve_path(stored.ref) == shard_path(ls.uploads_dir, digest)
+    assert stored.content_hash == digest
+    assert stored.size == len(content)
+    assert stored.reused is False
+    with open(ls.resolve_path(stored.ref), "rb") as f:
         assert f.read() == content
 
 
+def test_save_upload_same_content_reuses_blob_and_different_names_do_not_clash(
+    tmp_path,
+):
+    ls = LocalStorage(str(tmp_path))
+
+    first = ls.save_upload(io.BytesIO(b"same"), "video.mp4")
+    mtime = os.stat(ls.resolve_path(first.ref)).st_mtime_ns
+    again = ls.save_upload(io.BytesIO(b"same"), "other.mp4")
+    other = ls.save_upload(io.BytesIO(b"different"), "video.mp4")
+
+    assert again.ref == first.ref
+    assert again.reused is True
+    assert os.stat(ls.resolve_path(first.ref)).st_mtime_ns == mtime
+    assert other.ref != first.ref
+    with open(ls.resolve_path(first.ref), "rb") as f:
+        assert f.read() == b"same"
+    blobs = [n for _, _, files in os.walk(ls.uploads_dir) for n in files]
+    assert sorted(blobs) == sorted([first.content_hash, other.content_hash])
+
+
 def test_save_artifact_moves_with_basename_and_preserves_content(tmp_path):
     ls = LocalStorage(str(tmp_path))
 
@@ -39,14 +65,25 @@ def test_save_artifact_moves_with_basename_and_preserves_content(tmp_path):
     payload = b"payload-123"
     src.write_bytes(payload)
 
-    dest = ls.save_artifact(str(src))
+    ref = ls.save_artifact(str(src))
 
-    assert dest == os.path.join(ls.outputs_dir, "artifact.txt")
+    assert ref == "outputs/artifact.txt"
+    dest = ls.resolve_path(ref)
+    assert dest == shard_path(ls.outputs_dir, "artifact.txt")
     assert not src.exists()
     with open(dest, "rb") as f:
         assert f.read() == payload
 
 
+def test_shard_path_uses_two_levels_of_hashed_prefixes(tmp_path):
+    path = shard_path("/root", "frames_1.zip")
+    first, second, name = path.split("/")[2:]
+    assert name == "frames_1.zip"
+    assert len(first) == len(second) == 2
+    assert shard_path("/root", "frames_1.zip") == path
+    assert shard_path("/root", "frames_2.zip") != path
+
+
 def test_make_temp_dir_creates_under_root_with_prefix(tmp_path):
     ls = LocalStorage(str(tmp_path))
     d = ls.make_temp_dir("job42")
@@ -57,7 +94,317 @@ def test_make_temp_dir_creates_under_root_with_prefix(tmp_path):
     assert p.name.startswith("job42_")
 
 
-def test_resolve_path_passthrough(tmp_path):
+def test_resolve_path_keeps_legacy_absolute_refs(tmp_path):
+    ls = LocalStorage(str(tmp_path))
+    legacy = os.path.join(ls.uploads_dir, "foo.bin")
+    # ainda no layout plano: o caminho antigo vale
+    Path(legacy).write_bytes(b"x")
+    assert ls.resolve_path(legacy) == legacy
+    # depois da migração o mesmo ref aponta para o shard
+    os.remove(legacy)
+    assert ls.resolve_path(legacy) == shard_path(ls.uploads_dir, "foo.bin")
+    # fora das áreas da storage: devolvido como veio
+    assert ls.resolve_path("/elsewhere/x.mp4") == "/elsewhere/x.mp4"
+
+
+def test_resolve_path_keeps_legacy_relative_refs(tmp_path, monkeypatch):
+    # o STORAGE_DIR padrão é relativo: o banco guarda ./data/uploads/<nome>
+    monkeypatch.chdir(tmp_path)
+    ls = LocalStorage("./data")
+    legacy = os.path.join("./data", "uploads", "foo.bin")
+    Path(legacy).write_bytes(b"x")
+    assert ls.resolve_path(legacy) == legacy
+
+    # processo rodando de outro diretório: o arquivo plano é achado no base_dir
+    ls = LocalStorage(str(tmp_path / "data"))
+    monkeypatch.chdir(tmp_path / "data")
+    assert ls.resolve_path(legacy) == str(tmp_path / "data" / "uploads" / "foo.bin")
+    assert ls.stat(legacy).size == 1
+
+    # depois da migração o mesmo ref aponta para o shard
+    os.remove(tmp_path / "data" / "uploads" / "foo.bin")
+    assert ls.resolve_path(legacy) == shard_path(ls.uploads_dir, "foo.bin")
+
+
+def test_resolve_path_rejects_malformed_refs(tmp_path):
+    import pytest
+
+    ls = LocalStorage(str(tmp_path))
+    for ref in (
+        "temp/x",
+        "uploads/",
+        "uploads/../etc",
+        "outputs/a/b",
+        "x",
+        "./data/temp/x",
+    ):
+        with pytest.raises(ValueError):
+            ls.resolve_path(ref)
+
+
+def test_migrate_moves_flat_files_into_shards(tmp_path):
+    base = tmp_path / "data"
+    for area, name, data in (
+        ("uploads", "a" * 64, b"video"),
+        ("outputs", "frames_1.zip", b"zip"),
+    ):
+        (base / area).mkdir(parents=True)
+        (base / area / name).write_bytes(data)
+    (base / "uploads" / ".upload_tmp").write_bytes(b"partial")
+    legacy_ref = str(base / "outputs" / "frames_1.zip")
+
+    assert migrate(str(base), dry_run=True)["moved"] == 2
+    assert (base / "outputs" / "frames_1.zip").exists()
+
+    counts = migrate(str(base))
+    ls = LocalStorage(str(base))
+
+    assert counts == {"moved": 2, "duplicates": 0, "conflicts": 0}
+    assert Path(ls.resolve_path("uploads/" + "a" * 64)).read_bytes() == b"video"
+    assert Path(ls.resolve_path("outputs/frames_1.zip")).read_bytes() == b"zip"
+    assert Path(ls.resolve_path(legacy_ref)).read_bytes() == b"zip"
+    assert (base / "uploads" / ".upload_tmp").exists()
+    # rodar de novo não faz nada
+    assert migrate(str(base))["moved"] == 0
+
+
+def test_migrate_drops_identical_duplicates_and_reports_conflicts(tmp_path):
     ls = LocalStorage(str(tmp_path))
-    ref = os.path.join(ls.uploads_dir, "foo.bin")
-    assert ls.resolve_path(ref) == ref
+    stored = ls.save_upload(io.BytesIO(b"same"), "a.mp4")
+    Path(ls.uploads_dir, stored.content_hash).write_bytes(b"same")
+    os.makedirs(os.path.dirname(shard_path(ls.outputs_dir, "f.zip")))
+    Path(shard_path(ls.outputs_dir, "f.zip")).write_bytes(b"new")
+    Path(ls.outputs_dir, "f.zip").write_bytes(b"old")
+
+    counts = migrate(str(tmp_path))
+
+    assert counts == {"moved": 0, "duplicates": 1, "conflicts": 1}
+    assert not Path(ls.uploads_dir, stored.content_hash).exists()
+    assert Path(ls.outputs_dir, "f.zip").read_bytes() == b"old"
+
+
+class _ZeroStream(io.RawIOBase):
+    """Stream que gera `size` bytes sob demanda, sem materializar o conteúdo."""
+
+    def __init__(self, size: int):
+        self.remaining = size
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = min(len(b), self.remaining)
+        b[:n] = bytes(n)
+        self.remaining -= n
+        return n
+
+
+def _peak_alloc_during_upload(ls, size):
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        stored = ls.save_upload(_ZeroStream(size), f"big_{size}.bin")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert os.path.getsize(ls.resolve_path(stored.ref)) == size
+    return peak
+
+
+def test_save_upload_memory_stays_flat_regardless_of_size(tmp_path):
+    ls = LocalStorage(str(tmp_path))
+
+    small = _peak_alloc_during_upload(ls, 4 * 1024 * 1024)
+    large = _peak_alloc_during_upload(ls, 64 * 1024 * 1024)
+    # pico limitado ao buffer de cópia, independente do tamanho do upload
+    assert large < 8 * 1024 * 1024
+    assert large < small * 1.5
+
+
+def test_save_upload_failure_leaves_no_partial_file(tmp_path):
+    ls = LocalStorage(str(tmp_path))
+
+    class _Broken(io.RawIOBase):
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            raise ConnectionResetError("client gone")
+
+    try:
+        ls.save_upload(_Broken(), "partial.bin")
+    except ConnectionResetError:
+        pass
+
+    assert [
+        n
+        for n in os.listdir(ls.uploads_dir)
+        if os.path.isfile(os.path.join(ls.uploads_dir, n))
+    ] == []
+
+
+def test_upload_session_preallocates_and_writes_chunks_in_place(tmp_path):
+    ls = LocalStorage(str(tmp_path))
+    session = ls.create_upload_session(
+        user_id="u1", filename="../clip.mp4", size=10, chunk_size=4
+    )
+
+    part = os.path.join(ls.sessions_dir, f"{session.id}.part")
+    assert os.path.getsize(part) == 10
+    assert session.filename == "clip.mp4"
+    assert session.total_chunks == 3
+
+    ls.write_upload_chunk(session.id, 2, b"IJ")
+    ls.write_upload_chunk(session.id, 0, b"ABCD")
+
+    loaded = ls.get_upload_session(session.id)
+    assert loaded.user_id == "u1"
+    assert loaded.received_chunks == [0, 2]
+    assert loaded.missing_chunks() == [1]
+
+    ls.write_upload_chunk(session.id, 1, b"EFGH")
+    inode = os.stat(part).st_ino
+    stored = ls.finalize_upload_session(session.id)
+
+    digest = hashlib.sha256(b"ABCDEFGHIJ").hexdigest()
+    assert stored.ref == f"uploads/{digest}"
+    assert stored.content_hash == digest
+    assert os.stat(ls.resolve_path(stored.ref)).st_ino == inode
+    with open(ls.resolve_path(stored.ref), "rb") as f:
+        assert f.read() == b"ABCDEFGHIJ"
+    assert os.listdir(ls.sessions_dir) == []
+    assert ls.get_upload_session(session.id) is None
+
+
+def test_upload_session_unknown_or_malformed_id(tmp_path):
+    ls = LocalStorage(str(tmp_path))
+    assert ls.get_upload_session("deadbeef") is None
+    assert ls.get_upload_session("../../etc/passwd") is None
+
+
+def test_upload_session_with_known_hash_still_needs_the_bytes(tmp_path):
+    ls = LocalStorage(str(tmp_path))
+    existing = ls.save_upload(io.BytesIO(b"ABCDEFGHIJ"), "a.mp4")
+
+    session = ls.create_upload_session(
+        user_id="u2",
+        filename="b.mp4",
+        size=10,
+        chunk_size=4,
+        content_hash=existing.content_hash,
+    )
+
+    assert ls.get_upload_session(session.id).missing_chunks() == [0, 1, 2]
+    for index, data in enumerate((b"ABCD", b"EFGH", b"IJ")):
+        ls.write_upload_chunk(session.id, index, data)
+    stored = ls.finalize_upload_session(session.id)
+    assert stored.ref == existing.ref
+    assert stored.reused is True
+
+
+def test_upload_session_hash_mismatch_is_rejected(tmp_path):
+    import pytest
+
+    ls = LocalStorage(str(tmp_path))
+    session = ls.create_upload_session(
+        user_id="u", filename="v.mp4", size=2, chunk_size=4, content_hash="0" * 64
+    )
+    ls.write_upload_chunk(session.id, 0, b"xy")
+
+    with pytest.raises(ValueError):
+        ls.finalize_upload_session(session.id)
+    assert ls.get_upload_session(session.id) is not None
+
+
+def _complete_session(ls, user_id="u1"):
+    session = ls.create_upload_session(
+        user_id=user_id, filename="v.mp4", size=6, chunk_size=4
+    )
+    ls.write_upload_chunk(session.id, 0, b"ABCD")
+    ls.write_upload_chunk(session.id, 1, b"EF")
+    return session
+
+
+def test_concurrent_completes_finalize_once(tmp_path):
+    import threading
+
+    ls = LocalStorage(str(tmp_path))
+    session = _complete_session(ls)
+    barrier = threading.Barrier(4)
+    results = []
+
+    def complete():
+        barrier.wait()
+        try:
+            results.append(ls.finalize_upload_session(session.id).ref)
+        except KeyError:
+            results.append("not found")
+
+    threads = [threading.Thread(target=complete) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results).count("not found") == 3
+    assert os.listdir(ls.sessions_dir) == []
+
+
+def test_chunk_during_or_after_complete_is_not_found(tmp_path):
+    import threading
+
+    import pytest
+
+    ls = LocalStorage(str(tmp_path))
+    session = _complete_session(ls)
+    errors = []
+
+    def late_chunk():
+        try:
+            ls.write_upload_chunk(session.id, 1, b"EF")
+        except KeyError as e:
+            errors.append(e)
+
+    # o chunk chega enquanto o complete segura a sessão
+    with ls._session_lock(session.id, exclusive=True):
+        writer = threading.Thread(target=late_chunk)
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive()
+        ls._remove_session(session.id, ("json", "map"))
+    writer.join()
+
+    assert len(errors) == 1
+    with pytest.raises(KeyError):
+        ls.write_upload_chunk(session.id, 0, b"ABCD")
+    with pytest.raises(KeyError):
+        ls.finalize_upload_session(session.id)
+
+
+def test_idle_sessions_expire_and_release_their_space(tmp_path):
+    ls = LocalStorage(str(tmp_path), session_ttl=60)
+    idle = _complete_session(ls)
+    for name in os.listdir(ls.sessions_dir):
+        os.utime(os.path.join(ls.sessions_dir, name), (1000, 1000))
+    active = ls.create_upload_session(
+        user_id="u1", filename="w.mp4", size=6, chunk_size=4
+    )
+
+    assert ls.get_upload_session(idle.id) is None
+    assert sorted(os.listdir(ls.sessions_dir)) == sorted(
+        f"{active.id}.{ext}" for ext in ("json", "map", "part")
+    )
+    assert ls.expire_upload_sessions() == 0
+
+
+def test_open_sessions_are_capped_per_user(tmp_path):
+    import pytest
+
+    ls = LocalStorage(str(tmp_path), max_sessions_per_user=2)
+    for _ in range(2):
+        ls.create_upload_session(user_id="u1", filename="v.mp4", size=6, chunk_size=4)
+
+    with pytest.raises(ValueError):
+        ls.create_upload_session(user_id="u1", filename="v.mp4", size=6, chunk_size=4)
+    ls.create_upload_session(user_id="u2", filename="v.mp4", size=6, chunk_size=4)
@@ -0,0 +1,170 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    func,
+    inspect,
+)
+
+from app.adapters.driven.db.models import Base
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _config(url):
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option(
+        "script_location", str(ROOT / cfg.get_main_option("script_location"))
+    )
+    cfg.set_main_option("sqlalchemy.url", url)
+    # não reconfigura o logging do pytest
+    cfg.attributes["configure_logger"] = False
+    return cfg
+
+
+def test_upgrade_head_matches_the_models(tmp_path):
+    url = f"sqlite:///{tmp_path}/m.db"
+    command.upgrade(_config(url), "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        # uma coluna ou índice novo nos models sem migração quebra aqui
+        assert compare_metadata(MigrationContext.configure(conn), Base.metadata) == []
+    engine.dispose()
+
+
+def test_downgrade_base_drops_everything(tmp_path):
+    url = f"sqlite:///{tmp_path}/m.db"
+    cfg = _config(url)
+    command.upgrade(cfg, "head")
+    command.downgrade(cfg, "base")
+
+    engine = create_engine(url)
+    assert inspect(engine).get_table_names() == ["alembic_version"]
+    engine.dispose()
+
+
+def _baseline_metadata():
+    """Schema que o ``create_all`` criava antes das migrações."""
+    metadata = MetaData()
+    Table(
+        "videos",
+        metadata,
+        Column("id", String(36), primary_key=True),
+        Column("user_id", String(64), index=True, nullable=False),
+        Column("filename", String(255), nullable=False),
+        Column("storage_ref", Text, nullable=False),
+        Column("duration", Float, nullable=True),
+        Column(
+            "created_at",
+            DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+        ),
+    )
+    Table(
+        "video_jobs",
+        metadata,
+        Column("id", String(36), primary_key=True),
+        Column(
+            "video_id",
+            String(36),
+            ForeignKey("videos.id", ondelete="CASCADE"),
+            index=True,
+            nullable=False,
+        ),
+        Column("user_id", String(64), index=True, nullable=False),
+        Column(
+            "status",
+            Enum("QUEUED", "RUNNING", "DONE", "ERROR", name="job_status"),
+            nullable=False,
+            index=True,
+        ),
+        Column("fps", Integer, nullable=False),
+        Column("frame_count", Integer, nullable=False),
+        Column("artifact_ref", Text, nullable=True),
+        Column("error", Text, nullable=True),
+        Column(
+            "created_at",
+            DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+            index=True,
+        ),
+        Column(
+            "updated_at",
+            DateTime(timezone=True),
+            server_default=func.now(),
+            nullable=False,
+        ),
+    )
+    return metadata
+
+
+def _schema(url):
+    engine = create_engine(url)
+    insp = inspect(engine)
+    schema = {
+        table: (
+            sorted(
+                (c["name"], str(c["type"]), c["nullable"], c["default"])
+                for c in insp.get_columns(table)
+            ),
+            sorted(
+                (i["name"], tuple(i["column_names"])) for i in insp.get_indexes(table)
+            ),
+            sorted(
+                (fk["referred_table"], tuple(fk["constrained_columns"]))
+                for fk in insp.get_foreign_keys(table)
+            ),
+        )
+        for table in insp.get_table_names()
+    }
+    engine.dispose()
+    return schema
+
+
+def test_stamped_baseline_upgrades_to_the_fresh_schema(tmp_path):
+    legacy = f"sqlite:///{tmp_path}/legacy.db"
+    engine = create_engine(legacy)
+    _baseline_metadata().create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO videos (id, user_id, filename, storage_ref) "
+            "VALUES ('v1', 'u1', 'a.mp4', 'uploads/v1')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO video_jobs (id, video_id, user_id, status, fps, frame_count) "
+            "VALUES ('j1', 'v1', 'u1', 'DONE', 1, 3)"
+        )
+    engine.dispose()
+
+    cfg = _config(legacy)
+    command.stamp(cfg, "0001")
+    command.upgrade(cfg, "head")
+    fresh = f"sqlite:///{tmp_path}/fresh.db"
+    command.upgrade(_config(fresh), "head")
+
+    assert _schema(legacy) == _schema(fresh)
+    engine = create_engine(legacy)
+    with engine.connect() as conn:
+        row = conn.exec_driver_sql(
+            "SELECT status, archive_format, mode, output, dropped_frames "
+            "FROM video_jobs"
+        ).one()
+    engine.dispose()
+    assert tuple(row) == ("DONE", "zip", "fps", "frames", 0)
@@ -0,0 +1,205 @@
+import threading
+import time
+from datetime import datetime
+
+import httpx
+
+from app.adapters.driven.gateway.notification_delivery_http import (
+    HttpNotificationDelivery,
+)
+from app.adapters.driven.gateway.notification_outbox import OutboxNotifier
+from app.domain.entities import OutboxMessage
+from app.domain.ports.notification import NOTIFICATION_TOPIC
+from app.domain.services.outbox import RelayOutboxService
+
+
+class _Outbox:
+    def __init__(self, messages=()):
+        self.rows = {}
+        for m in messages:
+            self.add(m)
+        self.claims = []
+
+    def add(self, message):
+        message.id = len(self.rows) + 1
+        self.rows[message.id] = message
+
+    def claim(self, topic, limit, lease):
+        self.claims.append((topic, limit, lease))
+        now = datetime.utcnow()
+        ready = [
+            m for m in self.rows.values() if m.topic == topic and m.available_at <= now
+        ][:limit]
+        return [OutboxMessage(**vars(m)) for m in ready]
+
+    def delete(self, ids):
+        for i in ids:
+            self.rows.pop(i, None)
+
+    def reschedule(self, message_id, attempts, available_at, error):
+        m = self.rows[message_id]
+        m.attempts, m.available_at, m.last_error = attempts, available_at, error
+
+
+class _UoW:
+    def __init__(self, outbox):
+        self.outbox = outbox
+        self.commits = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def commit(self):
+        self.commits += 1
+
+
+def test_outbox_notifier_stages_message_in_the_callers_uow():
+    uow = _UoW(_Outbox())
+    OutboxNotifier(uow).notify(
+        user_id="u1", job_id="j1", status="success", video_url="outputs/f.zip"
+    )
+    OutboxNotifier(uow).notify(
+        user_id="u1", job_id="j2", status="error", error_message="boom"
+    )
+
+    assert [(m.topic, m.payload) for m in uow.outbox.rows.values()] == [
+        (
+            NOTIFICATION_TOPIC,
+            {
+                "user_id": "u1",
+                "job_id": "j1",
+                "status": "success",
+                "video_url": "outputs/f.zip",
+            },
+        ),
+        (
+            NOTIFICATION_TOPIC,
+            {
+                "user_id": "u1",
+                "job_id": "j2",
+                "status": "error",
+                "error_message": "boom",
+            },
+        ),
+    ]
+    # quem faz o commit é o serviço, junto com o status do job
+    assert uow.commits == 0
+
+
+def test_relay_deletes_delivered_and_reschedules_failures_with_backoff():
+    outbox = _Outbox([OutboxMessage("t", {"n": n}) for n in range(3)])
+    delivered = []
+
+    def deliver(messages):
+        delivered.extend(m.payload["n"] for m in messages)
+        return [None, "HTTP 503", None]
+
+    relay = RelayOutboxService(
+        _UoW(outbox), "t", deliver, batch_size=10, retry_base=2, retry_max=5
+    )
+    before = datetime.utcnow()
+
+    assert relay() == 3
+    assert delivered == [0, 1, 2]
+    [left] = outbox.rows.values()
+    assert left.payload == {"n": 1}
+    assert left.attempts == 1 and left.last_error == "HTTP 503"
+    assert 1.5 <= (left.available_at - before).total_seconds() <= 3
+    # ainda não disponível: nada a fazer
+    assert relay() == 0
+    assert relay._delay(1) == 2 and relay._delay(2) == 4 and relay._delay(5) == 5
+
+
+def test_relay_drops_message_after_max_attempts_and_survives_delivery_crash():
+    outbox = _Outbox([OutboxMessage("t", {}, attempts=2)])
+
+    def deliver(messages):
+        raise ConnectionError("down")
+
+    assert RelayOutboxService(_UoW(outbox), "t", deliver, max_attempts=3)() == 1
+    assert outbox.rows == {}
+
+    outbox = _Outbox([OutboxMessage("t", {}, attempts=2)])
+    RelayOutboxService(_UoW(outbox), "t", deliver, max_attempts=None)()
+    assert outbox.rows[1].attempts == 3
+    assert outbox.rows[1].last_error == "ConnectionError: down"
+
+
+def test_relay_run_keeps_draining_full_batches_until_stopped():
+    outbox = _Outbox([OutboxMessage("t", {}) for _ in range(5)])
+    stop = threading.Event()
+    relay = RelayOutboxService(
+        _UoW(outbox), "t", lambda ms: [None] * len(ms), batch_size=2
+    )
+
+    runner = threading.Thread(target=relay.run, args=(stop, 60))
+    runner.start()
+    deadline = time.monotonic() + 5
+    while outbox.rows and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    runner.join(timeout=5)
+
+    assert outbox.rows == {}
+    # 2 + 2 + 1: só o lote incompleto leva à espera
+    assert len(outbox.claims) == 3
+
+
+def test_relay_run_logs_destination_stats_periodically(caplog):
+    stop = threading.Event()
+    calls = []
+
+    def stats():
+        calls.append(1)
+        if len(calls) >= 3:
+            stop.set()
+        return {"published": len(calls), "p99_ms": 1.5}
+
+    relay = RelayOutboxService(
+        _UoW(_Outbox()),
+        "t",
+        lambda ms: [],
+        stats=stats,
+        stats_interval=0.01,
+    )
+    with caplog.at_level("INFO", logger="app.domain.services.outbox"):
+        runner = threading.Thread(target=relay.run, args=(stop, 0.01))
+        runner.start()
+        runner.join(timeout=5)
+
+    assert len(calls) == 3
+    assert "outbox t: {'published': 3, 'p99_ms': 1.5}" in caplog.text
+
+
+def test_http_delivery_posts_batch_concurrently_over_one_client():
+    seen = []
+    barrier = threading.Barrier(3, timeout=5)
+
+    def handler(request):
+        barrier.wait()
+        seen.append((request.url.path, request.headers["Idempotency-Key"]))
+        if request.headers["Idempotency-Key"] == "outbox-2":
+            return httpx.Response(500)
+        return httpx.Response(202)
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    delivery = HttpNotificationDelivery("http://notify/", concurrency=3, client=client)
+    messages = [OutboxMessage("t", {"job_id": str(n)}, id=n) for n in (1, 2, 3)]
+
+    # a barreira só abre se os três POSTs estiverem em voo ao mesmo tempo
+    assert delivery.deliver(messages) == [None, "HTTP 500", None]
+    assert sorted(seen) == [("/notify", f"outbox-{n}") for n in (1, 2, 3)]
+
+
+def test_http_delivery_reports_transport_errors():
+    def handler(request):
+        raise httpx.ConnectError("refused")
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    delivery = HttpNotificationDelivery("http://notify", client=client)
+
+    [error] = delivery.deliver([OutboxMessage("t", {}, id=1)])
+    assert error.startswith("ConnectError")
@@ -2,28 +2,42 @@ import os
 import zipfile
 from datetime import datetime, timedelta
 
+import pytest
+
 from app.domain.services.process_video import ProcessVideoService
 from app.domain.entities import JobStatus
 
 
 class _Video:
-    def __init__(self, id, user_id, filename, storage_ref):
+    def __init__(self, id, user_id, filename, storage_ref, content_hash=None):
         self.id = id
         self.user_id = user_id
         self.filename = filename
         self.storage_ref = storage_ref
+        self.content_hash = content_hash
 
 
 class _Job:
-    def __init__(self, id, video_id, user_id, status=JobStatus.QUEUED, fps=1):
+    def __init__(
+        self, id, video_id, user_id, status=JobStatus.QUEUED, fps=1, archive_format="zip"
+    ):
         self.id = id
         self.video_id = video_id
         self.user_id = user_id
         self.status = status
         self.fps = fps
+        self.archive_format = archive_format
+        self.mode = "fps"
+        self.scene_threshold = None
+        self.min_fps = None
+        self.max_fps = None
+        self.output = "frames"
         self.frame_count = 0
+        self.dropped_frames = 0
         self.artifact_ref = None
         self.error = None
+        self.progress = 0.0
+        self.eta_seconds = None
         self.updated_at = None
 
 
@@ -41,6 +55,8 @@ class _VideoRepo:
 class _JobRepo:
     def __init__(self):
         self._by_id = {}
+        # cancelados "no banco" por fora do serviço (DELETE concorrente)
+        self.cancelled = set()
 
     def add(self, j):
         self._by_id[j.id] = j
@@ -49,13 +65,34 @@ class _JobRepo:
         return self._by_id.get(job_id)
 
     def update(self, j):
+        if j.id in self.cancelled and j.status != JobStatus.CANCELLED:
+            return False
         self._by_id[j.id] = j
+        return True
+
+    def claim(self, job_id):
+        j = self._by_id.get(job_id)
+        if j is None or j.status != JobStatus.QUEUED:
+            return False
+        j.status = JobStatus.RUNNING
+        return True
+
+    def list_queued_siblings(self, job_id, video_id, content_hash, limit):
+        return [
+            j
+            for j in self._by_id.values()
+            if j.id != job_id and j.video_id == video_id and j.status == JobStatus.QUEUED
+        ][:limit]
+
+    def update_progress(self, job_id, progress, eta_seconds):
+        pass
 
 
 class _UoW:
-    def __init__(self, videos: _VideoRepo, jobs: _JobRepo):
+    def __init__(self, videos: _VideoRepo, jobs: _JobRepo, leases=None):
         self.videos = videos
         self.jobs = jobs
+        self.leases = leases
         self.commits = 0
         self.enters = 0
         self.exits = 0
@@ -106,7 +143,9 @@ class _ProcessorOK:
         self.frame_count = frame_count
         self.calls = []
 
-    def extract_frames(self, input_path, out_dir, fps=1) -> int:
+    def extract_frames(
+        self, input_path, out_dir, fps=1, on_progress=None, cancel=None
+    ) -> int:
         self.calls.append((input_path, out_dir, fps))
         return self.frame_count
 
@@ -116,7 +155,9 @@ class _ProcessorBoom:
         self.exc = exc
         self.calls = []
 
-    def extract_frames(self, input_path, out_dir, fps=1) -> int:
+    def extract_frames(
+        self, input_path, out_dir, fps=1, on_progress=None, cancel=None
+    ) -> int:
         self.calls.append((input_path, out_dir, fps))
         raise self.exc
 
@@ -299,3 +340,928 @@ def test_processor_raises_exception_sets_error_with_message(tmp_path):
     assert notifier.calls[0]["error_message"] == "boom"
     assert notifier.calls[0]["job_id"] == "job4"
     assert notifier.calls[0]["user_id"] == "u1"
+
+
+class _Cache:
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.fetched = []
+        self.put_calls = []
+
+    def fetch(self, key, dest_path):
+        self.fetched.append(key)
+        if key not in self.entries:
+            return None
+        with zipfile.ZipFile(dest_path, "w") as zf:
+            zf.writestr("00000001.jpg", b"cached")
+        return self.entries[key]
+
+    def put(self, key, artifact_path, frame_count, dropped_frames=0):
+        self.put_calls.append((key, artifact_path, frame_count, dropped_frames))
+
+    def stats(self):
+        return {}
+
+
+def _setup_cached_job(tmp_path, content_hash="h" * 64):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job5", video_id="vid5", user_id="u1", fps=2))
+    videos.add(
+        _Video(
+            "vid5", "u1", "v.mp4", str(tmp_path / "v5.mp4"), content_hash=content_hash
+        )
+    )
+    return videos, jobs
+
+
+def test_cache_hit_skips_extraction_and_completes_with_cached_artifact(tmp_path):
+    videos, jobs = _setup_cached_job(tmp_path)
+    cache = _Cache({f"{'h' * 64}-fps2-zip": (42, 5)})
+    processor = _ProcessorOK(frame_count=3)
+    notifier = _Notifier()
+    storage = _Storage(tmp_path)
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=processor,
+        notifier=notifier,
+        cache=cache,
+    )
+    svc(job_id="job5")
+
+    j = jobs.get("job5")
+    assert processor.calls == []
+    assert j.status == JobStatus.DONE
+    # o acerto reporta o mesmo resultado do job que encheu o cache
+    assert (j.frame_count, j.dropped_frames) == (42, 5)
+    assert j.artifact_ref == os.path.join("/outputs", "frames_job5.zip")
+    assert storage.saved_zip_entries == ["00000001.jpg"]
+    assert cache.put_calls == []
+    assert notifier.calls[0]["status"] == "success"
+
+
+def test_cache_miss_processes_and_stores_artifact(tmp_path):
+    videos, jobs = _setup_cached_job(tmp_path)
+    cache = _Cache()
+    storage = _Storage(tmp_path)
+    storage._seed_files = ["00000001.jpg"]
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=_ProcessorOK(frame_count=1),
+        notifier=_Notifier(),
+        cache=cache,
+    )
+    svc(job_id="job5")
+
+    assert jobs.get("job5").status == JobStatus.DONE
+    assert cache.fetched == [f"{'h' * 64}-fps2-zip"]
+    assert cache.put_calls == [
+        (f"{'h' * 64}-fps2-zip", os.path.join("/outputs", "frames_job5.zip"), 1, 0)
+    ]
+
+
+def test_video_without_content_hash_bypasses_cache(tmp_path):
+    videos, jobs = _setup_cached_job(tmp_path, content_hash=None)
+    cache = _Cache()
+    storage = _Storage(tmp_path)
+    storage._seed_files = ["00000001.jpg"]
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=_ProcessorOK(frame_count=1),
+        notifier=_Notifier(),
+        cache=cache,
+    )
+    svc(job_id="job5")
+
+    assert jobs.get("job5").status == JobStatus.DONE
+    assert cache.fetched == []
+    assert cache.put_calls == []
+
+
+class _ProcessorStream:
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def extract_frames(
+        self, input_path, out_dir, fps=1, on_progress=None, cancel=None
+    ) -> int:
+        raise AssertionError("streaming mode must not write frame files")
+
+    def iter_frames(self, input_path, fps=1, on_progress=None, cancel=None):
+        self.calls.append((input_path, fps))
+        yield from self.frames
+
+
+def test_streaming_mode_writes_frames_straight_into_zip(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job6", video_id="vid6", user_id="u1", fps=2))
+    videos.add(_Video("vid6", "u1", "v.mp4", str(tmp_path / "v6.mp4")))
+    storage = _Storage(tmp_path)
+    processor = _ProcessorStream([b"jpeg-1", b"jpeg-2", b"jpeg-3"])
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=processor,
+        notifier=_Notifier(),
+        streaming=True,
+    )
+    svc(job_id="job6")
+
+    j = jobs.get("job6")
+    assert j.status == JobStatus.DONE
+    assert j.frame_count == 3
+    assert processor.calls == [(str(tmp_path / "v6.mp4"), 2)]
+    assert storage.saved_zip_entries == ["00000001.jpg", "00000002.jpg", "00000003.jpg"]
+    # o diretório temporário só conteve o ZIP, nunca JPEGs soltos
+    assert not (tmp_path / "job6_tmp").exists()
+
+
+def test_streaming_mode_without_frames_sets_error(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job7", video_id="vid7", user_id="u1"))
+    videos.add(_Video("vid7", "u1", "v.mp4", str(tmp_path / "v7.mp4")))
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=_Storage(tmp_path),
+        processor=_ProcessorStream([]),
+        notifier=_Notifier(),
+        streaming=True,
+    )
+    svc(job_id="job7")
+
+    assert jobs.get("job7").status == JobStatus.ERROR
+    assert jobs.get("job7").error == "No frames extracted"
+
+
+def test_archiver_selects_format_and_artifact_name_per_job(tmp_path):
+    from app.adapters.driven.archive.writers import Archiver
+
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job8", video_id="vid8", user_id="u1", archive_format="tar"))
+    videos.add(_Video("vid8", "u1", "v.mp4", str(tmp_path / "v8.mp4")))
+
+    class _TarStorage(_Storage):
+        def save_artifact(self, local_path):
+            import tarfile
+
+            with tarfile.open(local_path) as tf:
+                self.saved_zip_entries = tf.getnames()
+            return os.path.join("/outputs", os.path.basename(local_path))
+
+    storage = _TarStorage(tmp_path)
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=_ProcessorStream([b"a", b"b"]),
+        notifier=_Notifier(),
+        streaming=True,
+        archiver=Archiver(),
+    )
+    svc(job_id="job8")
+
+    j = jobs.get("job8")
+    assert j.status == JobStatus.DONE
+    assert j.artifact_ref == os.path.join("/outputs", "frames_job8.tar")
+    assert storage.saved_zip_entries == ["00000001.jpg", "00000002.jpg"]
+
+
+class _ProcessorProgress:
+    """Reporta progresso a cada frame, como o FFmpegVideoProcessor."""
+
+    def __init__(self, clock, steps):
+        self.clock = clock
+        self.steps = steps
+
+    def iter_frames(self, input_path, fps=1, on_progress=None, cancel=None):
+        for t, percent, eta in self.steps:
+            self.clock["now"] = t
+            yield b"jpeg"
+            on_progress(percent, eta)
+
+
+class _RecordingJobRepo(_JobRepo):
+    def __init__(self):
+        super().__init__()
+        self.progress_writes = []
+
+    def update_progress(self, job_id, progress, eta_seconds):
+        self.progress_writes.append((progress, eta_seconds))
+
+
+def test_progress_is_written_to_job_at_throttled_rate(tmp_path, monkeypatch):
+    import app.domain.services.process_video as module
+
+    clock = {"now": 0.0}
+    monkeypatch.setattr(module.time, "monotonic", lambda: clock["now"])
+    videos = _VideoRepo()
+    jobs = _RecordingJobRepo()
+    jobs.add(_Job(id="job9", video_id="vid9", user_id="u1"))
+    videos.add(_Video("vid9", "u1", "v.mp4", str(tmp_path / "v9.mp4")))
+    steps = [
+        (0.0, 10.0, 9.0),
+        (1.0, 20.0, 8.0),
+        (4.9, 30.0, 7.0),
+        (5.0, 40.0, 6.04),
+        (7.0, 50.0, 5.0),
+        (10.1, 60.0, 4.0),
+    ]
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=_Storage(tmp_path),
+        processor=_ProcessorProgress(clock, steps),
+        notifier=_Notifier(),
+        streaming=True,
+        progress_interval=5.0,
+    )
+    svc(job_id="job9")
+
+    # primeira gravação imediata + uma a cada 5s
+    assert jobs.progress_writes == [(10.0, 9.0), (40.0, 6.0), (60.0, 4.0)]
+    job = jobs.get("job9")
+    assert job.status == JobStatus.DONE
+    assert (job.progress, job.eta_seconds) == (100.0, 0.0)
+
+
+def test_cancelled_queued_job_is_skipped_without_decoding(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job10", video_id="vid10", user_id="u1", status=JobStatus.CANCELLED))
+    videos.add(_Video("vid10", "u1", "v.mp4", str(tmp_path / "v10.mp4")))
+    processor = _ProcessorOK(frame_count=3)
+    notifier = _Notifier()
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs), storage=_Storage(tmp_path), processor=processor, notifier=notifier
+    )
+    svc(job_id="job10")
+
+    assert jobs.get("job10").status == JobStatus.CANCELLED
+    assert processor.calls == []
+    assert notifier.calls == []
+
+
+class _ProcessorUntilCancel:
+    """Emite frames até o evento de cancelamento armar, como o ffmpeg morto."""
+
+    def __init__(self, jobs):
+        self.jobs = jobs
+        self.cancel = None
+
+    def iter_frames(self, input_path, fps=1, on_progress=None, cancel=None):
+        from app.domain.errors import JobCancelled
+
+        self.cancel = cancel
+        yield b"jpeg"
+        # usuário cancela enquanto o ffmpeg ainda roda
+        self.jobs.get("job11").status = JobStatus.CANCELLED
+        if not cancel.wait(5):
+            raise AssertionError("watcher did not notice the cancellation")
+        raise JobCancelled()
+
+
+def test_running_job_is_cancelled_by_watcher_and_temp_dir_removed(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job11", video_id="vid11", user_id="u1"))
+    videos.add(_Video("vid11", "u1", "v.mp4", str(tmp_path / "v11.mp4")))
+    storage = _Storage(tmp_path)
+    processor = _ProcessorUntilCancel(jobs)
+    notifier = _Notifier()
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=processor,
+        notifier=notifier,
+        streaming=True,
+        cancel_uow=_UoW(videos, jobs),
+        cancel_poll_interval=0.01,
+    )
+    svc(job_id="job11")
+
+    j = jobs.get("job11")
+    assert j.status == JobStatus.CANCELLED
+    assert processor.cancel.is_set()
+    assert storage.saved_zip_path is None
+    assert not (tmp_path / "job11_tmp").exists()
+    assert notifier.calls == []
+
+
+class _ProcessorMulti:
+    """Grava ``fps`` frames por fps pedido, como o ramo de cada fps do split."""
+
+    def __init__(self):
+        self.multi_calls = []
+
+    def extract_frames(self, *args, **kwargs):
+        raise AssertionError("siblings must share one decode")
+
+    def extract_frames_multi(self, input_path, outputs, on_progress=None, cancel=None):
+        self.multi_calls.append((input_path, sorted(outputs)))
+        for fps, out_dir in outputs.items():
+            os.makedirs(out_dir, exist_ok=True)
+            for i in range(fps):
+                with open(os.path.join(out_dir, f"{i + 1:08d}.jpg"), "wb") as f:
+                    f.write(b"jpeg")
+        return {fps: fps for fps in outputs}
+
+
+class _EntriesStorage(_Storage):
+    def __init__(self, tmp_path):
+        super().__init__(tmp_path)
+        self.entries = {}
+
+    def save_artifact(self, local_path):
+        with zipfile.ZipFile(local_path) as zf:
+            self.entries[os.path.basename(local_path)] = sorted(zf.namelist())
+        return os.path.join("/outputs", os.path.basename(local_path))
+
+
+def test_queued_siblings_are_served_by_one_decode(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    videos.add(_Video("vid12", "u1", "v.mp4", str(tmp_path / "v12.mp4")))
+    jobs.add(_Job(id="a", video_id="vid12", user_id="u1", fps=1))
+    jobs.add(_Job(id="b", video_id="vid12", user_id="u2", fps=3))
+    jobs.add(_Job(id="c", video_id="vid12", user_id="u3", fps=1))
+    jobs.add(_Job(id="other", video_id="vid99", user_id="u1", fps=2))
+    storage = _EntriesStorage(tmp_path)
+    processor = _ProcessorMulti()
+    notifier = _Notifier()
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=processor,
+        notifier=notifier,
+        fanout_max_variants=4,
+    )
+    svc(job_id="a")
+
+    assert processor.multi_calls == [(str(tmp_path / "v12.mp4"), [1, 3])]
+    for job_id, count in [("a", 1), ("b", 3), ("c", 1)]:
+        j = jobs.get(job_id)
+        assert j.status == JobStatus.DONE
+        assert j.frame_count == count
+        assert storage.entries[f"frames_{job_id}.zip"] == [
+            f"{i + 1:08d}.jpg" for i in range(count)
+        ]
+    assert jobs.get("other").status == JobStatus.QUEUED
+    assert sorted((c["job_id"], c["user_id"]) for c in notifier.calls) == [
+        ("a", "u1"),
+        ("b", "u2"),
+        ("c", "u3"),
+    ]
+
+    # a task de um irmão já servido não decodifica de novo
+    svc(job_id="b")
+    assert len(processor.multi_calls) == 1
+
+
+def test_fanout_failure_marks_every_claimed_job_as_error(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    videos.add(_Video("vid13", "u1", "v.mp4", str(tmp_path / "v13.mp4")))
+    jobs.add(_Job(id="a", video_id="vid13", user_id="u1", fps=1))
+    jobs.add(_Job(id="b", video_id="vid13", user_id="u1", fps=2))
+
+    class _Boom(_ProcessorMulti):
+        def extract_frames_multi(self, *args, **kwargs):
+            raise RuntimeError("decoder exploded")
+
+    notifier = _Notifier()
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=_Storage(tmp_path),
+        processor=_Boom(),
+        notifier=notifier,
+        fanout_max_variants=4,
+    )
+    svc(job_id="a")
+
+    assert [jobs.get(i).status for i in "ab"] == [JobStatus.ERROR] * 2
+    assert jobs.get("b").error == "decoder exploded"
+    assert [c["status"] for c in notifier.calls] == ["error", "error"]
+    assert not (tmp_path / "a_tmp").exists()
+
+
+class _LeaseRepo:
+    def __init__(self, clock):
+        self.clock = clock
+        self.rows = {}
+
+    def get(self, key):
+        from app.domain.entities import WorkLease
+
+        row = self.rows.get(key)
+        return WorkLease(key, *row) if row else None
+
+    def acquire(self, key, holder, ttl):
+        row = self.rows.get(key)
+        if row is None or row[1] <= self.clock["now"] or row[0] == holder:
+            self.rows[key] = (holder, self.clock["now"] + ttl)
+            return True
+        return False
+
+    def renew(self, key, holder, ttl):
+        return self.acquire(key, holder, ttl)
+
+    def release(self, key, holder):
+        if self.rows.get(key, (None,))[0] == holder:
+            del self.rows[key]
+
+
+class _ProcessorSingleOrMulti(_ProcessorMulti):
+    def extract_frames(self, input_path, out_dir, fps=1, on_progress=None, cancel=None):
+        return self.extract_frames_multi(input_path, {fps: out_dir})[fps]
+
+
+def _coalescing_setup(tmp_path, monkeypatch, on_sleep):
+    """Líder "L" já rodando com a lease; o serviço é chamado para o job
+    idêntico "F". ``on_sleep`` simula o que acontece com o líder enquanto F
+    espera."""
+    import app.domain.services.process_video as module
+
+    clock = {"now": 100.0}
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    leases = _LeaseRepo(clock)
+    videos.add(_Video("vid", "u1", "v.mp4", str(tmp_path / "v.mp4"), "h" * 64))
+    videos.add(_Video("vid2", "u2", "v.mp4", str(tmp_path / "v.mp4"), "h" * 64))
+    jobs.add(_Job(id="L", video_id="vid", user_id="u1", status=JobStatus.RUNNING))
+    jobs.add(_Job(id="F", video_id="vid2", user_id="u2"))
+    key = f"{'h' * 64}-fps1-zip"
+    leases.acquire(key, "L", 30)
+    sleeps = []
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        on_sleep(len(sleeps), jobs, leases, clock, key)
+
+    monkeypatch.setattr(module.time, "sleep", _sleep)
+    processor = _ProcessorSingleOrMulti()
+    notifier = _Notifier()
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs, leases),
+        storage=_EntriesStorage(tmp_path),
+        processor=processor,
+        notifier=notifier,
+        lease_uow=_UoW(videos, jobs, leases),
+    )
+    return svc, jobs, leases, processor, notifier, key
+
+
+def test_follower_finishes_with_leader_artifact(tmp_path, monkeypatch):
+    def leader_finishes(n, jobs, leases, clock, key):
+        leader = jobs.get("L")
+        leader.status = JobStatus.DONE
+        leader.artifact_ref = "/outputs/frames_L.zip"
+        leader.frame_count = 7
+        leases.release(key, "L")
+
+    svc, jobs, leases, processor, notifier, key = _coalescing_setup(
+        tmp_path, monkeypatch, leader_finishes
+    )
+    svc(job_id="F")
+
+    f = jobs.get("F")
+    assert f.status == JobStatus.DONE
+    assert (f.artifact_ref, f.frame_count) == ("/outputs/frames_L.zip", 7)
+    assert processor.multi_calls == []
+    assert notifier.calls == [
+        {
+            "user_id": "u2",
+            "job_id": "F",
+            "status": "success",
+            "video_url": "/outputs/frames_L.zip",
+        }
+    ]
+    assert key not in leases.rows
+
+
+def test_follower_takes_over_when_leader_fails(tmp_path, monkeypatch):
+    def leader_fails(n, jobs, leases, clock, key):
+        jobs.get("L").status = JobStatus.ERROR
+        leases.release(key, "L")
+
+    svc, jobs, leases, processor, notifier, key = _coalescing_setup(
+        tmp_path, monkeypatch, leader_fails
+    )
+    svc(job_id="F")
+
+    assert jobs.get("F").status == JobStatus.DONE
+    assert jobs.get("F").artifact_ref == os.path.join("/outputs", "frames_F.zip")
+    assert jobs.get("L").status == JobStatus.ERROR
+    assert len(processor.multi_calls) == 1
+    assert [c["job_id"] for c in notifier.calls] == ["F"]
+    assert key not in leases.rows
+
+
+def test_follower_takes_over_and_completes_job_of_dead_leader(tmp_path, monkeypatch):
+    def worker_dies(n, jobs, leases, clock, key):
+        # ninguém renova a lease: o relógio passa do ttl
+        clock["now"] += 10
+
+    svc, jobs, leases, processor, notifier, key = _coalescing_setup(
+        tmp_path, monkeypatch, worker_dies
+    )
+    svc(job_id="F")
+
+    assert [jobs.get(i).status for i in "FL"] == [JobStatus.DONE] * 2
+    assert jobs.get("L").artifact_ref == os.path.join("/outputs", "frames_L.zip")
+    # uma decodificação só para os dois
+    assert len(processor.multi_calls) == 1
+    assert sorted(c["job_id"] for c in notifier.calls) == ["F", "L"]
+    assert key not in leases.rows
+
+
+def test_follower_cancelled_while_waiting_stops_without_decoding(tmp_path, monkeypatch):
+    def user_cancels(n, jobs, leases, clock, key):
+        jobs.get("F").status = JobStatus.CANCELLED
+
+    svc, jobs, leases, processor, notifier, key = _coalescing_setup(
+        tmp_path, monkeypatch, user_cancels
+    )
+    svc(job_id="F")
+
+    assert jobs.get("F").status == JobStatus.CANCELLED
+    assert processor.multi_calls == [] and notifier.calls == []
+    assert leases.rows[key][0] == "L"
+
+
+def test_leader_holds_lease_only_while_running(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    leases = _LeaseRepo({"now": 0.0})
+    videos.add(_Video("vid", "u1", "v.mp4", str(tmp_path / "v.mp4")))
+    jobs.add(_Job(id="solo", video_id="vid", user_id="u1"))
+    seen = []
+
+    class _Spy(_ProcessorOK):
+        def extract_frames(self, input_path, out_dir, **kwargs):
+            seen.append(dict(leases.rows))
+            return super().extract_frames(input_path, out_dir)
+
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs, leases),
+        storage=_Storage(tmp_path),
+        processor=_Spy(frame_count=1),
+        notifier=_Notifier(),
+        lease_uow=_UoW(videos, jobs, leases),
+    )
+    svc(job_id="solo")
+
+    # sem content_hash a chave cai no id do vídeo
+    assert [{k: v[0] for k, v in s.items()} for s in seen] == [
+        {"video-vid-fps1-zip": "solo"}
+    ]
+    assert leases.rows == {}
+    assert jobs.get("solo").status == JobStatus.DONE
+
+
+class _ProcessorScenes:
+    def __init__(self, timestamps):
+        self.timestamps = timestamps
+        self.calls = []
+
+    def extract_scenes(
+        self,
+        input_path,
+        out_dir,
+        threshold,
+        min_fps=None,
+        max_fps=None,
+        on_progress=None,
+        cancel=None,
+    ):
+        self.calls.append((threshold, min_fps, max_fps))
+        os.makedirs(out_dir, exist_ok=True)
+        for n in range(1, len(self.timestamps) + 1):
+            with open(os.path.join(out_dir, f"{n:08d}.jpg"), "wb") as f:
+                f.write(b"jpeg")
+        return self.timestamps
+
+
+def test_scene_mode_archives_frames_with_their_timestamps(tmp_path):
+    import json
+
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    job = _Job(id="s1", video_id="vid", user_id="u1")
+    job.mode, job.max_fps = "scene", 2.0
+    jobs.add(job)
+    videos.add(_Video("vid", "u1", "v.mp4", str(tmp_path / "v.mp4")))
+    processor = _ProcessorScenes([0.0, 4.2, 9.75])
+
+    class _ScenesStorage(_Storage):
+        def save_artifact(self, local_path):
+            with zipfile.ZipFile(local_path) as zf:
+                self.saved_zip_entries = sorted(zf.namelist())
+                self.index = json.loads(zf.read("timestamps.json"))
+            return os.path.join("/outputs", os.path.basename(local_path))
+
+    storage = _ScenesStorage(tmp_path)
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=processor,
+        notifier=_Notifier(),
+        streaming=True,
+    )
+    svc(job_id="s1")
+
+    assert jobs.get("s1").status == JobStatus.DONE
+    assert jobs.get("s1").frame_count == 3
+    # limiar padrão quando o job não define
+    assert processor.calls == [(0.3, None, 2.0)]
+    assert storage.saved_zip_entries == [
+        "00000001.jpg",
+        "00000002.jpg",
+        "00000003.jpg",
+        "timestamps.json",
+    ]
+    assert storage.index[1] == {"file": "00000002.jpg", "time": 4.2}
+
+
+class _DropEven:
+    """Filtro que apaga os frames de número par."""
+
+    key = "even"
+
+    def __init__(self):
+        self.dirs = []
+
+    def filter_dir(self, frames_dir, cancel=None):
+        self.dirs.append(frames_dir)
+        dropped = 0
+        for name in sorted(os.listdir(frames_dir)):
+            if name.endswith(".jpg") and int(name[:8]) % 2 == 0:
+                os.remove(os.path.join(frames_dir, name))
+                dropped += 1
+        return dropped
+
+
+def test_frame_filter_runs_before_packaging_and_reports_dropped(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="d1", video_id="vid", user_id="u1"))
+    videos.add(_Video("vid", "u1", "v.mp4", str(tmp_path / "v.mp4")))
+    storage = _Storage(tmp_path)
+    storage._seed_files = [f"{n:08d}.jpg" for n in range(1, 6)]
+    frame_filter = _DropEven()
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=_ProcessorOK(frame_count=5),
+        notifier=_Notifier(),
+        # o filtro precisa dos frames em disco: streaming é ignorado
+        streaming=True,
+        frame_filter=frame_filter,
+    )
+    svc(job_id="d1")
+
+    j = jobs.get("d1")
+    assert j.status == JobStatus.DONE
+    assert (j.frame_count, j.dropped_frames) == (3, 2)
+    assert storage.saved_zip_entries == ["00000001.jpg", "00000003.jpg", "00000005.jpg"]
+    assert len(frame_filter.dirs) == 1
+
+
+def test_frame_filter_keeps_scene_timestamps_of_remaining_frames(tmp_path):
+    import json
+
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    job = _Job(id="s1", video_id="vid", user_id="u1")
+    job.mode = "scene"
+    jobs.add(job)
+    videos.add(_Video("vid", "u1", "v.mp4", str(tmp_path / "v.mp4")))
+
+    class _ScenesStorage(_Storage):
+        def save_artifact(self, local_path):
+            with zipfile.ZipFile(local_path) as zf:
+                self.index = json.loads(zf.read("timestamps.json"))
+            return os.path.join("/outputs", os.path.basename(local_path))
+
+    storage = _ScenesStorage(tmp_path)
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=_ProcessorScenes([0.0, 1.0, 2.5, 7.0]),
+        notifier=_Notifier(),
+        frame_filter=_DropEven(),
+    )
+    svc(job_id="s1")
+
+    assert (jobs.get("s1").frame_count, jobs.get("s1").dropped_frames) == (2, 2)
+    assert storage.index == [
+        {"file": "00000001.jpg", "time": 0.0},
+        {"file": "00000003.jpg", "time": 2.5},
+    ]
+
+
+def test_frame_filter_changes_cache_key(tmp_path):
+    svc = ProcessVideoService(
+        uow=None,
+        storage=None,
+        processor=None,
+        notifier=None,
+        cache=_Cache(),
+        frame_filter=_DropEven(),
+    )
+    video = _Video("vid", "u1", "v.mp4", "ref", content_hash="h")
+    job = _Job(id="j", video_id="vid", user_id="u1", fps=2)
+
+    assert svc._cache_key(video, job) == "h-fps2-even-zip"
+
+
+class _ProcessorSheets(_ProcessorOK):
+    def __init__(self, frame_count):
+        super().__init__(frame_count)
+        self.tiled = []
+
+    def tile_frames(self, frame_paths, out_dir, layout, cancel=None):
+        self.tiled.append([os.path.basename(p) for p in frame_paths])
+        os.makedirs(out_dir, exist_ok=True)
+        sheets = -(-len(frame_paths) // layout.cells)
+        for n in range(1, sheets + 1):
+            with open(os.path.join(out_dir, f"sheet_{n:04d}.jpg"), "wb") as f:
+                f.write(b"sheet")
+        return sheets
+
+
+def test_sheet_output_archives_mosaics_with_cell_index(tmp_path):
+    import json
+
+    from app.domain.entities import SheetLayout
+
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    job = _Job(id="m1", video_id="vid", user_id="u1", fps=2)
+    job.output = "sheet"
+    jobs.add(job)
+    videos.add(_Video("vid", "u1", "v.mp4", str(tmp_path / "v.mp4")))
+
+    class _SheetStorage(_Storage):
+        def save_artifact(self, local_path):
+            with zipfile.ZipFile(local_path) as zf:
+                self.saved_zip_entries = sorted(zf.namelist())
+                self.index = json.loads(zf.read("index.json"))
+            return os.path.join("/outputs", os.path.basename(local_path))
+
+    storage = _SheetStorage(tmp_path)
+    storage._seed_files = [f"{n:08d}.jpg" for n in range(1, 6)]
+    processor = _ProcessorSheets(frame_count=5)
+    svc = ProcessVideoService(
+        uow=_UoW(videos, jobs),
+        storage=storage,
+        processor=processor,
+        notifier=_Notifier(),
+        # mosaicos precisam dos frames em disco
+        streaming=True,
+        sheet_layout=SheetLayout(columns=2, rows=2, tile_width=100, tile_height=60),
+    )
+    svc(job_id="m1")
+
+    assert jobs.get("m1").status == JobStatus.DONE
+    assert jobs.get("m1").frame_count == 5
+    assert processor.tiled == [[f"{n:08d}.jpg" for n in range(1, 6)]]
+    assert storage.saved_zip_entries == [
+        "index.json",
+        "sheet_0001.jpg",
+        "sheet_0002.jpg",
+    ]
+    assert storage.index[3] == {
+        "frame": "00000004.jpg",
+        "time": 1.5,
+        "sheet": "sheet_0001.jpg",
+        "x": 100,
+        "y": 60,
+        "width": 100,
+        "height": 60,
+    }
+    assert storage.index[4]["sheet"] == "sheet_0002.jpg"
+    assert (storage.index[4]["x"], storage.index[4]["y"]) == (0, 0)
+
+
+class _OutboxUoW(_UoW):
+    """Só considera gravadas as mensagens que passaram por um commit."""
+
+    def __init__(self, videos, jobs):
+        super().__init__(videos, jobs)
+        self.staged = []
+        self.committed = []
+        self.outbox = self
+
+    def add(self, message):
+        self.staged.append(message)
+
+    def commit(self):
+        super().commit()
+        self.committed += [(m.payload["status"], self.jobs.get(m.payload["job_id"]).status) for m in self.staged]
+        self.staged = []
+
+
+def test_notification_is_committed_together_with_final_status(tmp_path):
+    from app.adapters.driven.gateway.notification_outbox import OutboxNotifier
+
+    for processor, expected in (
+        (_ProcessorOK(frame_count=1), ("success", JobStatus.DONE)),
+        (_ProcessorBoom(RuntimeError("boom")), ("error", JobStatus.ERROR)),
+    ):
+        videos, jobs = _VideoRepo(), _JobRepo()
+        jobs.add(_Job(id="j", video_id="v", user_id="u1", status=JobStatus.QUEUED, fps=1))
+        videos.add(_Video(id="v", user_id="u1", filename="v.mp4", storage_ref="v.mp4"))
+        uow = _OutboxUoW(videos, jobs)
+        storage = _Storage(tmp_path)
+        storage._seed_files = ["00000001.jpg"]
+
+        ProcessVideoService(uow=uow, storage=storage, processor=processor, notifier=OutboxNotifier(uow))(job_id="j")
+
+        assert uow.committed == [expected]
+        assert uow.staged == []
+
+
+def test_cancel_accepted_while_archiving_is_not_overwritten(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="job1", video_id="vid1", user_id="u1", status=JobStatus.QUEUED))
+    videos.add(_Video(id="vid1", user_id="u1", filename="v.mp4", storage_ref="v.mp4"))
+    storage = _Storage(tmp_path)
+    storage._seed_files = ["00000001.jpg"]
+    save_artifact = storage.save_artifact
+
+    def cancelled_during_upload(local_path):
+        jobs.cancelled.add("job1")
+        return save_artifact(local_path)
+
+    storage.save_artifact = cancelled_during_upload
+    notifier = _Notifier()
+
+    ProcessVideoService(uow=_UoW(videos, jobs), storage=storage, processor=_ProcessorOK(1), notifier=notifier)(job_id="job1")
+
+    assert notifier.calls == []
+
+
+def test_follower_past_max_wait_goes_back_to_the_queue(tmp_path, monkeypatch):
+    from app.domain.errors import JobDeferred
+
+    svc, jobs, leases, processor, notifier, key = _coalescing_setup(
+        tmp_path, monkeypatch, lambda *a: None
+    )
+    svc.coalesce_max_wait = 0
+
+    with pytest.raises(JobDeferred) as info:
+        svc(job_id="F")
+
+    # a task reagenda; o próximo claim acha o job na fila de novo
+    assert info.value.countdown == svc.lease_ttl
+    assert jobs.get("F").status == JobStatus.QUEUED
+    assert processor.multi_calls == [] and notifier.calls == []
+    assert leases.rows[key][0] == "L"
+
+
+def test_follower_interrupted_while_waiting_is_marked_error(tmp_path, monkeypatch):
+    class SoftTimeLimit(Exception):
+        pass
+
+    def time_limit(n, jobs, leases, clock, key):
+        raise SoftTimeLimit("soft time limit exceeded")
+
+    svc, jobs, leases, processor, notifier, key = _coalescing_setup(
+        tmp_path, monkeypatch, time_limit
+    )
+    svc(job_id="F")
+
+    assert jobs.get("F").status == JobStatus.ERROR
+    assert [(c["job_id"], c["status"]) for c in notifier.calls] == [("F", "error")]
+
+
+def test_abandon_fails_only_jobs_still_running(tmp_path):
+    videos = _VideoRepo()
+    jobs = _JobRepo()
+    jobs.add(_Job(id="r", video_id="v", user_id="u1", status=JobStatus.RUNNING))
+    jobs.add(_Job(id="d", video_id="v", user_id="u1", status=JobStatus.DONE))
+    notifier = _Notifier()
+    svc = ProcessVideoService(uow=_UoW(videos, jobs), storage=_Storage(tmp_path), processor=_ProcessorOK(1), notifier=notifier)
+
+    svc.abandon(job_id="r", reason="Time limit exceeded (600s)")
+    svc.abandon(job_id="d", reason="Time limit exceeded (600s)")
+
+    assert jobs.get("r").status == JobStatus.ERROR
+    assert jobs.get("r").error == "Time limit exceeded (600s)"
+    assert jobs.get("d").status == JobStatus.DONE
+    assert [c["job_id"] for c in notifier.calls] == ["r"]
@@ -0,0 +1,69 @@
+import io
+
+from app.adapters.driven.media.progress import ProgressTracker, read_progress
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_tracker_sums_sources_and_estimates_eta():
+    clock = _Clock()
+    tracker = ProgressTracker(total=100, clock=clock)
+    assert tracker.snapshot() == (0.0, None)
+
+    clock.now += 10
+    tracker.update("a", 15)
+    tracker.update("b", 10)
+
+    percent, eta = tracker.snapshot()
+    assert percent == 25.0
+    assert eta == 30.0
+
+
+def test_tracker_caps_at_100_percent():
+    tracker = ProgressTracker(total=10, clock=_Clock())
+    tracker.update(0, 12)
+    assert tracker.snapshot() == (100.0, 0.0)
+
+
+def test_report_only_calls_back_when_percent_changes():
+    calls = []
+    tracker = ProgressTracker(total=10, clock=_Clock())
+    tracker.update(0, 1)
+    tracker.report(lambda p, e: calls.append(p))
+    tracker.report(lambda p, e: calls.append(p))
+    tracker.update(0, 2)
+    tracker.report(lambda p, e: calls.append(p))
+    tracker.report(None)
+
+    assert calls == [10.0, 20.0]
+
+
+def test_read_progress_converts_frames_to_seconds():
+    tracker = ProgressTracker(total=60, clock=_Clock())
+    stream = io.StringIO(
+        "frame=0\nout_time_us=N/A\nprogress=continue\n"
+        "frame=30\nout_time_us=1000\nprogress=continue\n"
+        "frame=45\nprogress=end\n"
+    )
+
+    read_progress(stream, tracker, key=0, fps=3)
+
+    assert tracker.snapshot()[0] == 25.0
+
+
+def test_read_progress_uses_out_time_without_fixed_rate():
+    tracker = ProgressTracker(total=60, clock=_Clock())
+    stream = io.StringIO(
+        "frame=1\nout_time_us=N/A\nprogress=continue\n"
+        "frame=2\nout_time_us=15000000\nprogress=continue\n"
+    )
+
+    read_progress(stream, tracker, key=0, fps=None)
+
+    assert tracker.snapshot()[0] == 25.0
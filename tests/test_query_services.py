@@ -17,6 +17,10 @@ class _Job:
         error: str | None = None,
         created_at: datetime | None = None,
         updated_at: datetime | None = None,
+        archive_format: str = "zip",
+        mode: str = "fps",
+        progress: float = 0.0,
+        eta_seconds: float | None = None,
     ):
         self.id = id
         self.video_id = video_id
@@ -24,10 +28,16 @@ class _Job:
         self.status = status
         self.fps = fps
         self.frame_count = frame_count
+        self.dropped_frames = 0
+        self.output = "frames"
         self.artifact_ref = artifact_ref
         self.error = error
         self.created_at = created_at or datetime.utcnow()
         self.updated_at = updated_at or datetime.utcnow()
+        self.archive_format = archive_format
+        self.mode = mode
+        self.progress = progress
+        self.eta_seconds = eta_seconds
 
 
 class _JobsRepo:
@@ -81,6 +91,8 @@ def test_get_job_status_success_returns_dict_with_iso_dates():
         error=None,
         created_at=created,
         updated_at=updated,
+        progress=40.0,
+        eta_seconds=7.5,
     )
 
     repo = _JobsRepo(by_id={"j1": job})
@@ -93,7 +105,13 @@ def test_get_job_status_success_returns_dict_with_iso_dates():
         "job_id": "j1",
         "status": "RUNNING",
         "fps": 3,
+        "mode": "fps",
+        "output": "frames",
+        "format": "zip",
         "frames": 12,
+        "dropped_frames": 0,
+        "progress": 40.0,
+        "eta_seconds": 7.5,
         "artifact_ref": "/outputs/a.zip",
         "error": None,
         "created_at": created.isoformat(),
@@ -122,7 +140,17 @@ def test_get_job_status_raises_keyerror_when_missing_or_user_mismatch(job, user_
 
 def test_list_jobs_by_user_returns_sanitized_list_only_for_that_user():
     j1 = _Job("a", "v1", "carol", "QUEUED", 1, frame_count=0, artifact_ref=None)
-    j2 = _Job("b", "v1", "carol", "DONE", 2, frame_count=42, artifact_ref="/out.zip")
+    j2 = _Job(
+        "b",
+        "v1",
+        "carol",
+        "DONE",
+        2,
+        frame_count=42,
+        artifact_ref="/out.zip",
+        progress=100.0,
+        eta_seconds=0.0,
+    )
     j_other = _Job("z", "v2", "dave", "RUNNING", 1)
 
     repo = _JobsRepo(
@@ -141,14 +169,26 @@ def test_list_jobs_by_user_returns_sanitized_list_only_for_that_user():
             "job_id": "b",
             "status": "DONE",
             "fps": 2,
+            "mode": "fps",
+            "output": "frames",
+            "format": "zip",
             "frames": 42,
+            "dropped_frames": 0,
+            "progress": 100.0,
+            "eta_seconds": 0.0,
             "artifact_ref": "/out.zip",
         },
         {
             "job_id": "a",
             "status": "QUEUED",
             "fps": 1,
+            "mode": "fps",
+            "output": "frames",
+            "format": "zip",
             "frames": 0,
+            "dropped_frames": 0,
+            "progress": 0.0,
+            "eta_seconds": None,
             "artifact_ref": None,
         },
     ]
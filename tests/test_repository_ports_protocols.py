@@ -34,6 +34,17 @@ class GoodJobRepo:
         # sobrescreve por id
         self._store[getattr(j, "id", "jid")] = j
 
+    def update_progress(self, job_id, progress, eta_seconds):
+        job = self._store.get(job_id)
+        if job is not None:
+            job.progress, job.eta_seconds = progress, eta_seconds
+
+    def claim(self, job_id):
+        return job_id in self._store
+
+    def list_queued_siblings(self, job_id, video_id, content_hash, limit):
+        return []
+
     def list_by_user(self, user_id):
         return list(self._by_user.get(user_id, []))
 
@@ -0,0 +1,167 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from app.adapters.driven.storage.s3_storage import MIN_PART_SIZE, S3Storage  # noqa: E402
+
+BUCKET = "videos"
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+class _CountingClient:
+    """Repassa ao cliente real contando as chamadas por operação."""
+
+    def __init__(self, client):
+        self._client = client
+        self.calls = {}
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def _call(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return method(*args, **kwargs)
+
+        return _call
+
+
+def _storage(tmp_path, client, **kwargs):
+    return S3Storage(
+        str(tmp_path / "local"),
+        BUCKET,
+        client=client,
+        prefix="env1",
+        part_size=MIN_PART_SIZE,
+        **kwargs,
+    )
+
+
+def test_save_upload_puts_object_under_stable_ref(tmp_path, s3):
+    storage = _storage(tmp_path, s3)
+    digest = hashlib.sha256(b"video").hexdigest()
+
+    stored = storage.save_upload(io.BytesIO(b"video"), "v.mp4")
+    again = storage.save_upload(io.BytesIO(b"video"), "w.mp4")
+
+    assert stored.ref == f"uploads/{digest}"
+    assert stored.reused is False and again.reused is True
+    body = s3.get_object(Bucket=BUCKET, Key=f"env1/uploads/{digest}")["Body"]
+    assert body.read() == b"video"
+    # nada fica no disco local além dos diretórios
+    assert [n for _, _, files in os.walk(storage.uploads_dir) for n in files] == []
+
+
+def test_large_artifact_uses_parallel_multipart_and_ranged_reads(tmp_path, s3):
+    client = _CountingClient(s3)
+    storage = _storage(tmp_path, client, concurrency=3)
+    payload = os.urandom(2 * MIN_PART_SIZE + 1234)
+    src = tmp_path / "frames_j1.zip"
+    src.write_bytes(payload)
+
+    ref = storage.save_artifact(str(src))
+
+    assert ref == "outputs/frames_j1.zip"
+    assert client.calls["upload_part"] == 3
+    assert client.calls["complete_multipart_upload"] == 1
+    head = s3.head_object(Bucket=BUCKET, Key="env1/outputs/frames_j1.zip")
+    assert head["ContentLength"] == len(payload)
+    info = storage.stat(ref)
+    assert info.size == len(payload)
+    start, end = MIN_PART_SIZE - 10, MIN_PART_SIZE + 10
+    assert b"".join(storage.read_range(ref, start, end)) == payload[start:end]
+    # o artefato fica no cache local do worker: resolver não baixa de novo
+    gets = client.calls.get("get_object", 0)
+    with open(storage.resolve_path(ref), "rb") as f:
+        assert f.read() == payload
+    assert client.calls.get("get_object", 0) == gets
+
+
+def test_resolve_path_downloads_parts_into_cache_once(tmp_path, s3):
+    payload = os.urandom(MIN_PART_SIZE + 99)
+    s3.put_object(Bucket=BUCKET, Key="env1/uploads/abc", Body=payload)
+    client = _CountingClient(s3)
+    storage = _storage(tmp_path, client)
+
+    path = storage.resolve_path("uploads/abc")
+    again = storage.resolve_path("uploads/abc")
+
+    assert path == again and path.startswith(storage.cache_dir)
+    with open(path, "rb") as f:
+        assert f.read() == payload
+    assert client.calls["get_object"] == 2
+
+
+def test_cache_evicts_least_recently_used_copies(tmp_path, s3):
+    for name in ("a", "b", "c"):
+        s3.put_object(Bucket=BUCKET, Key=f"env1/uploads/{name}", Body=b"x" * 100)
+    storage = _storage(tmp_path, s3, cache_max_bytes=250)
+
+    a = storage.resolve_path("uploads/a")
+    b = storage.resolve_path("uploads/b")
+    os.utime(a, ns=(1, 1))
+    os.utime(b, ns=(2, 2))
+    c = storage.resolve_path("uploads/c")
+
+    assert not os.path.exists(a)
+    assert os.path.exists(b) and os.path.exists(c)
+
+
+def test_missing_object_and_failed_multipart(tmp_path, s3):
+    storage = _storage(tmp_path, s3)
+    assert storage.stat("outputs/nope.zip") is None
+    assert not storage._has_blob("0" * 64)
+    assert not os.path.exists(storage.resolve_path("outputs/nope.zip"))
+
+    class _FailingParts(_CountingClient):
+        def upload_part(self, **kwargs):
+            raise ConnectionError("network down")
+
+    client = _FailingParts(s3)
+    storage = _storage(tmp_path, client)
+    src = tmp_path / "big.zip"
+    src.write_bytes(b"\0" * (MIN_PART_SIZE + 1))
+
+    with pytest.raises(ConnectionError):
+        storage.save_artifact(str(src))
+    assert client.calls["abort_multipart_upload"] == 1
+    assert s3.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+
+
+def test_chunked_session_is_uploaded_on_finalize(tmp_path, s3):
+    storage = _storage(tmp_path, s3)
+    session = storage.create_upload_session(
+        user_id="u", filename="v.mp4", size=6, chunk_size=4
+    )
+    storage.write_upload_chunk(session.id, 0, b"ABCD")
+    storage.write_upload_chunk(session.id, 1, b"EF")
+
+    stored = storage.finalize_upload_session(session.id)
+
+    assert b"".join(storage.read_range(stored.ref, 0, 6)) == b"ABCDEF"
+    again = storage.create_upload_session(
+        user_id="u2", filename="w.mp4", size=6, chunk_size=4
+    )
+    storage.write_upload_chunk(again.id, 0, b"ABCD")
+    storage.write_upload_chunk(again.id, 1, b"EF")
+    # mesmo conteúdo recebido de novo: o objeto existente é reaproveitado
+    assert storage.finalize_upload_session(again.id).reused is True
+
+
+def test_rejects_parts_below_s3_minimum(tmp_path, s3):
+    with pytest.raises(ValueError):
+        S3Storage(str(tmp_path), BUCKET, client=s3, part_size=1024)
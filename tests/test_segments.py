@@ -0,0 +1,106 @@
+from fractions import Fraction
+
+from app.adapters.driven.media.segments import (
+    FrameTarget,
+    Segment,
+    VideoProbe,
+    frame_slot,
+    plan_segments,
+    plan_sparse,
+    rescale_us,
+)
+
+
+def _probe(seconds=100, gop=2, rate=25, tb=Fraction(1, 12800), start_us=0):
+    step = int(1 / (rate * tb))
+    frames = seconds * rate
+    first = rescale_us(start_us, tb)
+    return VideoProbe(
+        time_base=tb,
+        ts_offset=-first,
+        start_us=start_us,
+        first_pts=first,
+        last_pts=first + (frames - 1) * step,
+        keyframes=[first + i * step for i in range(0, frames, int(gop * rate))],
+        frame_pts=[first + i * step for i in range(frames)],
+        end_pts=first + frames * step,
+    )
+
+
+def test_single_worker_is_one_unbounded_segment():
+    assert plan_segments(_probe(), fps=1, workers=1) == [Segment(None, None, 1)]
+
+
+def test_segments_start_on_keyframes_and_cover_all_slots():
+    probe = _probe()
+    segments = plan_segments(probe, fps=3, workers=4)
+
+    assert len(segments) == 4
+    assert segments[0].seek_us is None and segments[0].first_number == 1
+    assert segments[-1].end_slot is None
+    keyframe_us = {int(k * probe.time_base * 1_000_000) for k in probe.keyframes}
+    for prev, seg in zip(segments, segments[1:]):
+        assert seg.seek_us in keyframe_us
+        # numeração contínua: o segmento seguinte começa onde o anterior termina
+        assert seg.first_number == prev.end_slot + 1
+
+
+def test_slots_follow_serial_timeline_with_start_offset():
+    probe = _probe(tb=Fraction(1, 1000), start_us=1_370_000)
+
+    assert probe.ts_offset == -1370
+    assert frame_slot(probe, probe.first_pts, 3) == 0
+    segments = plan_segments(probe, fps=3, workers=2)
+    # -ss é relativo ao início do arquivo, não ao pts bruto
+    assert segments[1].seek_us == 50_000_000
+    assert segments[1].first_number == 151
+
+
+def test_slot_rounding_matches_ffmpeg_near_inf():
+    probe = _probe(tb=Fraction(1, 1000))
+
+    assert frame_slot(probe, 166, 3) == 0  # 0.498
+    assert frame_slot(probe, 167, 3) == 1  # 0.501
+    assert frame_slot(probe, 500, 1) == 1  # empate arredonda para longe de zero
+
+
+def test_short_video_stays_serial_with_min_segment():
+    segments = plan_segments(_probe(seconds=40), fps=1, workers=8, min_segment_sec=30)
+    assert segments == [Segment(None, None, 1)]
+
+
+def test_keyframes_closer_than_one_slot_are_not_duplicated():
+    probe = _probe(seconds=10, gop=1)
+    segments = plan_segments(probe, fps=1, workers=50)
+
+    ends = [s.end_slot for s in segments[:-1]]
+    assert ends == sorted(set(ends))
+    assert len(segments) <= 10
+
+
+def test_sparse_picks_last_frame_of_each_slot_from_its_keyframe():
+    probe = _probe(seconds=10, gop=0.2, rate=25)
+    targets = plan_sparse(probe, fps=1, seek_overhead=0)
+
+    assert len(targets) == 10
+    # slot 3 cobre t < 3.5s: último frame é 3.48s, keyframe anterior 3.4s
+    assert targets[3] == FrameTarget(3_400_000, int(3.48 * 12800), 4)
+    assert targets[0] == FrameTarget(400_000, int(0.48 * 12800), 1)
+    assert [t.number for t in targets] == list(range(1, 11))
+
+
+def test_sparse_rejected_when_full_decode_is_cheaper():
+    # GOP de 2s a 1fps: cada alvo decodifica quase um GOP inteiro
+    assert plan_sparse(_probe(seconds=10, gop=2), fps=1, seek_overhead=15) is None
+    assert plan_sparse(_probe(seconds=10, gop=0.2), fps=1, seek_overhead=15)
+
+
+def test_sparse_never_chosen_when_fps_exceeds_source_rate():
+    # todo frame da fonte seria usado: seek nunca sai mais barato
+    probe = _probe(seconds=2, gop=0.04, rate=25)
+    assert plan_sparse(probe, fps=50, seek_overhead=0) is None
+
+
+def test_sparse_first_target_without_seek():
+    targets = plan_sparse(_probe(seconds=4, gop=1), fps=1, seek_overhead=0)
+    assert targets[0].seek_us is None
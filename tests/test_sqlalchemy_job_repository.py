@@ -114,6 +114,83 @@ def test_update_existing_and_noop_when_missing(session, uid):
     assert after_count == before_count
 
 
+def test_update_persists_progress_and_eta(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_id = uid()
+    _make_parent_video(session, video_id)
+    ent = _make_job_entity(uid(), video_id, status=JobStatus.RUNNING)
+    repo.add(ent)
+    session.commit()
+    assert repo.get(ent.id).progress == 0.0
+    assert repo.get(ent.id).eta_seconds is None
+
+    ent.progress = 42.5
+    ent.eta_seconds = 12.0
+    repo.update(ent)
+    session.commit()
+
+    got = repo.get(ent.id)
+    assert (got.progress, got.eta_seconds) == (42.5, 12.0)
+
+
+def test_update_persists_dropped_frames(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_id = uid()
+    _make_parent_video(session, video_id)
+    ent = _make_job_entity(uid(), video_id, status=JobStatus.RUNNING)
+    repo.add(ent)
+    session.commit()
+
+    ent.frame_count, ent.dropped_frames = 10, 7
+    repo.update(ent)
+    session.commit()
+    session.expire_all()
+
+    got = repo.get(ent.id)
+    assert (got.frame_count, got.dropped_frames) == (10, 7)
+
+
+def test_update_does_not_overwrite_a_cancellation(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_id = uid()
+    _make_parent_video(session, video_id)
+    ent = _make_job_entity(uid(), video_id, status=JobStatus.RUNNING)
+    repo.add(ent)
+    session.commit()
+    # DELETE /jobs/{id} aceito enquanto o worker arquivava
+    cancelled = _make_job_entity(ent.id, video_id, status=JobStatus.CANCELLED)
+    assert repo.update(cancelled) is True
+    session.commit()
+
+    ent.status, ent.artifact_ref = JobStatus.DONE, "outputs/a.zip"
+    assert repo.update(ent) is False
+    session.commit()
+    session.expire_all()
+
+    got = repo.get(ent.id)
+    assert got.status == JobStatus.CANCELLED and got.artifact_ref is None
+
+
+def test_update_progress_does_not_touch_status(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_id = uid()
+    _make_parent_video(session, video_id)
+    ent = _make_job_entity(uid(), video_id, status=JobStatus.RUNNING)
+    repo.add(ent)
+    session.commit()
+
+    # cancelado por outra sessão enquanto o worker grava progresso
+    session.get(JobModel, ent.id).status = JobStatus.CANCELLED
+    session.commit()
+    repo.update_progress(ent.id, 55.0, 3.0)
+    session.commit()
+    session.expire_all()
+
+    got = repo.get(ent.id)
+    assert got.status == JobStatus.CANCELLED
+    assert (got.progress, got.eta_seconds) == (55.0, 3.0)
+
+
 def test_list_by_user_returns_in_desc_created_at(session, uid):
     repo = SQLAlchemyJobRepository(session)
     video_id = uid()
@@ -143,3 +220,61 @@ def test_list_by_user_returns_in_desc_created_at(session, uid):
 def test_list_by_user_empty(session):
     repo = SQLAlchemyJobRepository(session)
     assert list(repo.list_by_user("nobody")) == []
+
+
+def test_claim_moves_queued_job_to_running_only_once(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_id = uid()
+    _make_parent_video(session, video_id)
+    ent = _make_job_entity(uid(), video_id)
+    repo.add(ent)
+    session.commit()
+
+    assert repo.claim(ent.id) is True
+    assert repo.claim(ent.id) is False
+    session.commit()
+    assert repo.get(ent.id).status == JobStatus.RUNNING
+
+
+def test_list_queued_siblings_matches_video_or_content(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_a, video_b, video_c = uid(), uid(), uid()
+    for vid, content in ((video_a, "h1"), (video_b, "h1"), (video_c, "h2")):
+        _make_parent_video(session, vid).content_hash = content
+    session.commit()
+    own = _make_job_entity(uid(), video_a)
+    same_video = _make_job_entity(uid(), video_a, fps=2)
+    same_content = _make_job_entity(uid(), video_b, fps=3)
+    running = _make_job_entity(uid(), video_a, status=JobStatus.RUNNING)
+    other = _make_job_entity(uid(), video_c)
+    for j in (own, same_video, same_content, running, other):
+        repo.add(j)
+    session.commit()
+
+    got = {j.id for j in repo.list_queued_siblings(own.id, video_a, "h1", 10)}
+    assert got == {same_video.id, same_content.id}
+    got = {j.id for j in repo.list_queued_siblings(own.id, video_a, None, 10)}
+    assert got == {same_video.id}
+    assert len(repo.list_queued_siblings(own.id, video_a, "h1", 1)) == 1
+
+
+def test_scene_options_roundtrip(session, uid):
+    repo = SQLAlchemyJobRepository(session)
+    video_id = uid()
+    _make_parent_video(session, video_id)
+    ent = _make_job_entity(uid(), video_id)
+    ent.mode, ent.scene_threshold, ent.max_fps = "scene", 0.25, 3.0
+    repo.add(ent)
+    session.commit()
+
+    got = repo.get(ent.id)
+    assert (got.mode, got.scene_threshold, got.min_fps, got.max_fps) == (
+        "scene",
+        0.25,
+        None,
+        3.0,
+    )
+    plain = _make_job_entity(uid(), video_id)
+    repo.add(plain)
+    session.commit()
+    assert repo.get(plain.id).mode == "fps"
@@ -0,0 +1,49 @@
+from app.adapters.driven.repositories.sqlalchemy_lease_repo import (
+    SQLAlchemyLeaseRepository,
+)
+
+
+def test_acquire_is_exclusive_until_released(session, uid):
+    repo = SQLAlchemyLeaseRepository(session)
+    key = uid()
+
+    assert repo.acquire(key, "leader", 30) is True
+    session.commit()
+    assert repo.acquire(key, "follower", 30) is False
+    # reentrante para o próprio dono
+    assert repo.acquire(key, "leader", 30) is True
+    session.commit()
+    assert repo.get(key).holder == "leader"
+
+    repo.release(key, "follower")  # não é dono: nada acontece
+    session.commit()
+    assert repo.get(key).holder == "leader"
+
+    repo.release(key, "leader")
+    session.commit()
+    assert repo.get(key) is None
+    assert repo.acquire(key, "follower", 30) is True
+
+
+def test_expired_lease_is_taken_over_and_old_holder_cannot_renew(session, uid):
+    repo = SQLAlchemyLeaseRepository(session)
+    key = uid()
+    assert repo.acquire(key, "dead", -1)
+    session.commit()
+
+    assert repo.acquire(key, "follower", 30) is True
+    session.commit()
+    assert repo.renew(key, "dead", 30) is False
+    assert repo.renew(key, "follower", 30) is True
+    session.commit()
+    assert repo.get(key).holder == "follower"
+
+
+def test_two_sessions_race_for_the_same_key(Session, uid):
+    key = uid()
+    with Session() as a, Session() as b:
+        won_a = SQLAlchemyLeaseRepository(a).acquire(key, "a", 30)
+        a.commit()
+        won_b = SQLAlchemyLeaseRepository(b).acquire(key, "b", 30)
+        b.commit()
+    assert (won_a, won_b) == (True, False)
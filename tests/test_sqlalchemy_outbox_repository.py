@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from app.adapters.driven.repositories.sqlalchemy_outbox_repo import (
+    SQLAlchemyOutboxRepository,
+)
+from app.domain.entities import OutboxMessage
+
+
+def test_claim_hides_batch_until_lease_expires(session, uid):
+    repo = SQLAlchemyOutboxRepository(session)
+    topic = uid()
+    for n in range(3):
+        repo.add(OutboxMessage(topic, {"n": n}))
+    session.commit()
+
+    first = repo.claim(topic, 2, lease=60)
+    session.commit()
+    assert [m.payload for m in first] == [{"n": 0}, {"n": 1}]
+    assert [m.payload for m in repo.claim(topic, 10, lease=60)] == [{"n": 2}]
+    session.commit()
+    assert repo.claim(topic, 10, lease=60) == []
+
+
+def test_expired_claim_is_visible_again(session, uid):
+    repo = SQLAlchemyOutboxRepository(session)
+    topic = uid()
+    repo.add(OutboxMessage(topic, {}))
+    session.commit()
+
+    [first] = repo.claim(topic, 10, lease=-1)
+    session.commit()
+    # lease vencida: o lote volta (relay morreu no meio da entrega)
+    [again] = repo.claim(topic, 10, lease=60)
+    assert again.id == first.id
+
+
+def test_delete_and_reschedule(session, uid):
+    repo = SQLAlchemyOutboxRepository(session)
+    topic = uid()
+    repo.add(OutboxMessage(topic, {"a": 1}))
+    repo.add(OutboxMessage(topic, {"b": 2}))
+    session.commit()
+    ok, failed = repo.claim(topic, 10, lease=-1)
+    session.commit()
+
+    repo.delete([ok.id])
+    repo.reschedule(failed.id, 1, datetime.utcnow() - timedelta(seconds=1), "HTTP 503")
+    session.commit()
+
+    [again] = repo.claim(topic, 10, lease=60)
+    assert again.id == failed.id
+    assert again.attempts == 1
+    assert again.last_error == "HTTP 503"
+
+
+def test_two_sessions_do_not_claim_the_same_message(Session, uid):
+    topic = uid()
+    with Session() as s:
+        SQLAlchemyOutboxRepository(s).add(OutboxMessage(topic, {}))
+        s.commit()
+    with Session() as a, Session() as b:
+        got_a = SQLAlchemyOutboxRepository(a).claim(topic, 10, lease=60)
+        a.commit()
+        got_b = SQLAlchemyOutboxRepository(b).claim(topic, 10, lease=60)
+        b.commit()
+    assert (len(got_a), len(got_b)) == (1, 0)
@@ -44,3 +44,22 @@ def test_add_and_get_roundtrip(session, uid):
 def test_get_returns_none_when_missing(session):
     repo = SQLAlchemyVideoRepository(session)
     assert repo.get("does-not-exist") is None
+
+
+def test_videos_sharing_content_keep_their_hash(session, uid):
+    repo = SQLAlchemyVideoRepository(session)
+    digest = "a" * 64
+
+    for user in ("alice", "bob"):
+        ent = _make_video_entity(uid(), user_id=user)
+        ent.content_hash = digest
+        repo.add(ent)
+    repo.add(_make_video_entity(uid()))
+    session.commit()
+
+    assert (
+        repo.get(
+            session.query(VideoModel).filter_by(user_id="bob").one().id
+        ).content_hash
+        == digest
+    )
@@ -0,0 +1,196 @@
+import os
+
+import pytest
+
+from app.adapters.driven.storage.local_storage import LocalStorage
+from app.domain.services.upload_session import (
+    CreateUploadSessionService,
+    GetUploadSessionService,
+    UploadChunkService,
+    CompleteUploadSessionService,
+    MIN_CHUNK_SIZE,
+)
+
+
+class FakeEnqueue:
+    def __init__(self):
+        self.calls = []
+
+    def enqueue_stored(self, **kwargs):
+        self.calls.append(kwargs)
+        return "job-1"
+
+
+def _create(storage, size, chunk_size=MIN_CHUNK_SIZE, user_id="u1"):
+    svc = CreateUploadSessionService(storage=storage)
+    return svc(user_id=user_id, filename="v.mp4", size=size, chunk_size=chunk_size)
+
+
+def test_create_session_reports_chunks_and_nothing_received(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    out = _create(storage, size=MIN_CHUNK_SIZE * 2 + 10)
+
+    assert out["total_chunks"] == 3
+    assert out["received_ranges"] == []
+    assert out["missing_chunks"] == [0, 1, 2]
+    assert out["complete"] is False
+
+
+@pytest.mark.parametrize("size,chunk_size", [(0, None), (10, 1), (10, 1 << 30)])
+def test_create_session_rejects_invalid_sizes(tmp_path, size, chunk_size):
+    storage = LocalStorage(str(tmp_path))
+    with pytest.raises(ValueError):
+        CreateUploadSessionService(storage=storage)(
+            user_id="u1", filename="v.mp4", size=size, chunk_size=chunk_size
+        )
+
+
+def test_create_session_rejects_size_over_limit_before_allocating(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    svc = CreateUploadSessionService(storage=storage, max_size=MIN_CHUNK_SIZE)
+
+    with pytest.raises(ValueError, match="at most"):
+        svc(user_id="u1", filename="v.mp4", size=1 << 62)
+    assert os.listdir(storage.sessions_dir) == []
+
+
+def test_chunks_out_of_order_then_complete_enqueues(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    size = MIN_CHUNK_SIZE + 100
+    upload_id = _create(storage, size=size)["upload_id"]
+    put = UploadChunkService(storage=storage)
+
+    out = put(upload_id=upload_id, user_id="u1", index=1, data=b"b" * 100)
+    assert out["received_ranges"] == [[MIN_CHUNK_SIZE, size]]
+
+    status = GetUploadSessionService(storage=storage)(upload_id=upload_id, user_id="u1")
+    assert status["missing_chunks"] == [0]
+
+    out = put(upload_id=upload_id, user_id="u1", index=0, data=b"a" * MIN_CHUNK_SIZE)
+    assert out["received_ranges"] == [[0, size]]
+    assert out["complete"] is True
+
+    enqueue = FakeEnqueue()
+    job_id = CompleteUploadSessionService(storage=storage, enqueue=enqueue)(
+        upload_id=upload_id, user_id="u1", fps=2
+    )
+
+    assert job_id == "job-1"
+    [call] = enqueue.calls
+    assert call["user_id"] == "u1"
+    assert call["filename"] == "v.mp4"
+    assert call["fps"] == 2
+    with open(storage.resolve_path(call["storage_ref"]), "rb") as f:
+        assert f.read() == b"a" * MIN_CHUNK_SIZE + b"b" * 100
+
+
+def test_chunk_with_wrong_length_or_index_is_rejected(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    upload_id = _create(storage, size=MIN_CHUNK_SIZE + 100)["upload_id"]
+    put = UploadChunkService(storage=storage)
+
+    with pytest.raises(ValueError):
+        put(upload_id=upload_id, user_id="u1", index=1, data=b"short")
+    with pytest.raises(ValueError):
+        put(upload_id=upload_id, user_id="u1", index=5, data=b"x")
+
+
+def test_complete_incomplete_upload_raises(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    upload_id = _create(storage, size=10)["upload_id"]
+    enqueue = FakeEnqueue()
+
+    with pytest.raises(ValueError):
+        CompleteUploadSessionService(storage=storage, enqueue=enqueue)(
+            upload_id=upload_id, user_id="u1"
+        )
+    assert enqueue.calls == []
+
+
+def test_complete_that_loses_the_race_is_not_found(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    upload_id = _create(storage, size=10)["upload_id"]
+    UploadChunkService(storage=storage)(
+        upload_id=upload_id, user_id="u1", index=0, data=b"x" * 10
+    )
+
+    class _Racing(LocalStorage):
+        def finalize_upload_session(self, upload_id):
+            # outro complete termina entre a checagem e o finalize
+            storage.finalize_upload_session(upload_id)
+            return super().finalize_upload_session(upload_id)
+
+    enqueue = FakeEnqueue()
+    with pytest.raises(KeyError):
+        CompleteUploadSessionService(storage=_Racing(str(tmp_path)), enqueue=enqueue)(
+            upload_id=upload_id, user_id="u1"
+        )
+    assert enqueue.calls == []
+
+
+def test_session_of_another_user_is_not_found(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    upload_id = _create(storage, size=10, user_id="alice")["upload_id"]
+
+    with pytest.raises(KeyError):
+        GetUploadSessionService(storage=storage)(upload_id=upload_id, user_id="bob")
+    with pytest.raises(KeyError):
+        UploadChunkService(storage=storage)(
+            upload_id=upload_id, user_id="bob", index=0, data=b"x" * 10
+        )
+
+
+def test_known_sha256_still_requires_the_bytes(tmp_path):
+    import io
+
+    storage = LocalStorage(str(tmp_path))
+    existing = storage.save_upload(io.BytesIO(b"x" * 10), "v.mp4")
+
+    # saber o hash não dá acesso ao conteúdo de outro usuário
+    out = CreateUploadSessionService(storage=storage)(
+        user_id="u2",
+        filename="again.mp4",
+        size=10,
+        sha256=existing.content_hash.upper(),
+    )
+    assert out["complete"] is False
+    assert out["sha256"] == existing.content_hash
+
+    enqueue = FakeEnqueue()
+    complete = CompleteUploadSessionService(storage=storage, enqueue=enqueue)
+    with pytest.raises(ValueError):
+        complete(upload_id=out["upload_id"], user_id="u2")
+
+    UploadChunkService(storage=storage)(
+        upload_id=out["upload_id"], user_id="u2", index=0, data=b"x" * 10
+    )
+    complete(upload_id=out["upload_id"], user_id="u2")
+    # dedupe pelo hash calculado no servidor: o blob existente é reaproveitado
+    assert enqueue.calls[0]["storage_ref"] == existing.ref
+    assert enqueue.calls[0]["content_hash"] == existing.content_hash
+
+
+def test_declared_sha256_that_does_not_match_the_bytes_is_rejected(tmp_path):
+    import io
+
+    storage = LocalStorage(str(tmp_path))
+    existing = storage.save_upload(io.BytesIO(b"x" * 10), "v.mp4")
+    out = CreateUploadSessionService(storage=storage)(
+        user_id="u2", filename="v.mp4", size=10, sha256=existing.content_hash
+    )
+    UploadChunkService(storage=storage)(
+        upload_id=out["upload_id"], user_id="u2", index=0, data=b"y" * 10
+    )
+
+    with pytest.raises(ValueError, match="mismatch"):
+        CompleteUploadSessionService(storage=storage, enqueue=FakeEnqueue())(
+            upload_id=out["upload_id"], user_id="u2"
+        )
+
+
+def test_create_session_rejects_malformed_sha256(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    with pytest.raises(ValueError):
+        CreateUploadSessionService(storage=storage)(
+            user_id="u1", filename="v.mp4", size=10, sha256="not-a-hash"
+        )
@@ -0,0 +1,38 @@
+import sys
+import types
+
+from celery.worker.request import Request
+
+from app.adapters.driver.worker.requests import ProcessVideoRequest
+
+
+class _Service:
+    def __init__(self):
+        self.abandoned = []
+
+    def abandon(self, *, job_id, reason):
+        self.abandoned.append((job_id, reason))
+
+
+def _request(args=(), kwargs=None):
+    req = ProcessVideoRequest.__new__(ProcessVideoRequest)
+    req._args, req._kwargs = args, kwargs or {}
+    return req
+
+
+def test_hard_time_limit_abandons_the_job(monkeypatch):
+    monkeypatch.setattr(Request, "on_timeout", lambda self, soft, timeout: None)
+    service = _Service()
+    container = types.ModuleType("app.config.container")
+    container.get_process_service = lambda: service
+    monkeypatch.setitem(sys.modules, "app.config.container", container)
+
+    _request(args=("j1",)).on_timeout(False, 600)
+    _request(kwargs={"job_id": "j2"}).on_timeout(False, 600)
+    # soft: o próprio serviço trata a exceção dentro da task
+    _request(args=("j3",)).on_timeout(True, 540)
+
+    assert service.abandoned == [
+        ("j1", "Time limit exceeded (600s)"),
+        ("j2", "Time limit exceeded (600s)"),
+    ]
@@ -62,3 +62,25 @@ def test_process_video_job_error_logs_and_reraises(caplog):
     msgs = [rec.getMessage() for rec in caplog.records]
     assert any("process_video_job: START job-999" in m for m in msgs)
     assert any("process_video_job: ERROR job-999" in m for m in msgs)
+
+
+def test_process_video_job_retries_deferred_job_with_countdown():
+    from app.domain.errors import JobDeferred
+
+    class Retry(Exception):
+        pass
+
+    class Task:
+        def retry(self, **kwargs):
+            self.kwargs = kwargs
+            return Retry()
+
+    def fake_service(*, job_id: str):
+        raise JobDeferred(30)
+
+    tasks = _prepare_modules(fake_service)
+    task = Task()
+
+    with pytest.raises(Retry):
+        tasks.process_video_job(task, job_id="job-1")
+    assert task.kwargs == {"countdown": 30, "max_retries": None}